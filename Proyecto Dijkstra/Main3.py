@@ -1,15 +1,23 @@
 import os
-import math
-import heapq
+import time
 import tkinter as tk
-from tkinter import messagebox
-from PIL import Image, ImageTk
-
-try:
-    import cv2
-    CV2_AVAILABLE = True
-except Exception:
-    CV2_AVAILABLE = False
+from tkinter import messagebox, simpledialog
+from PIL import ImageTk
+
+from grafo import MODE_MULT, INF, ALGORITHMS, default_graph, search, shortest_path
+from archivo_mapa import load_map
+from traza import StepTrace, TraceCursor, EXPLORE, RELAX, FINAL
+from tabla_rutas import load_route_table
+from jerarquia import load_hierarchy
+from dinamico import DynamicRoutes
+from render import CanvasRenderer
+from modelo import MapModel
+from fondo import BackgroundCache
+from video import DEFAULT_FPS, VideoDecoder, ClipCache, ClipPlayer
+from recursos import AssetLoader, import_cv2, load_image, load_fitted_image, load_sprite
+from animacion import FrameScheduler
+from muestreo import PathSampler
+from perfil import Profiler
 
 # -----------------------------
 # RUTAS A ARCHIVOS
@@ -20,6 +28,12 @@ MENU_VIDEO = os.path.join(ASSETS_DIR, "menu_fondo.mp4")
 TRANSITION_VIDEO = os.path.join(ASSETS_DIR, "transition.mp4")
 CUSTOM_FONT_PATH = os.path.join(ASSETS_DIR, "HyliaSerifBeta-Regular.otf")
 MENU_TITLE_IMG = os.path.join(ASSETS_DIR, "Titulo.png")  # imagen que subiste
+MAP_NODES = os.path.join(ASSETS_DIR, "mapa_nodos.csv")  # label,x,y (también .jsonl/.json)
+MAP_EDGES = os.path.join(ASSETS_DIR, "mapa_aristas.csv")  # u,v,w
+MAP_GRAPH = os.path.join(ASSETS_DIR, "mapa.grafo")  # binario generado desde las listas
+CACHE_DIR = "cache"  # tablas precalculadas (se regeneran si cambia el grafo)
+SPRITE_CACHE_DIR = os.path.join(CACHE_DIR, "sprites")
+PERF_LOG = os.path.join(CACHE_DIR, "perfil.jsonl")  # registros de tiempos del HUD de rendimiento
 
 CHAR_IMG = {
     "pie": os.path.join(ASSETS_DIR, "personaje_pie.png"),
@@ -40,10 +54,32 @@ NODE_VISITED = "#d0f0c0"
 EDGE_COLOR = "#c1934a"
 EDGE_HIGHLIGHT = "#66ff66"
 EDGE_PATH = "#1c8ff4"
+EDGE_CLOSED = "#7a7a7a"
+OVERLAY_NEAR = (64, 246, 228)  # colores de la capa de distancias: cerca -> lejos
+OVERLAY_FAR = (232, 58, 58)
 DIST_OFFSET = (0, -18)
 ANIM_DELAY_MS = 700
 MOVE_STEP_MS = 25
 MOVE_STEP_PX = 8
+ENTRY_ANIM_MS = 640
+PULSE_STEP_MS = 120
+FRAME_RATE = 60
+BG_SETTLE_MS = 150  # espera tras el último resize antes del reescalado LANCZOS
+BG_CACHE_SIZE = 6
+TRANSITION_CACHE_MB = 64  # memoria máxima para la transición precargada (0 = no precargar)
+CHAR_SIZE = (36, 36)
+ZOOM_MIN = 1.0   # 1 = mapa completo ajustado a la ventana
+ZOOM_MAX = 8.0
+ZOOM_STEP = 1.2
+VIEW_MARGIN_PX = 48  # se dibuja un poco más allá del borde para que el pan no muestre huecos
+LABEL_MIN_SCALE = 0.45  # por debajo de esta escala no se dibujan nombres, pesos ni distancias
+MAX_LABELED_ITEMS = 1500  # ni tampoco si hay más items que estos en pantalla
+MAX_DRAWN_ITEMS = 6000  # con más, solo se dibuja el fondo hasta que se acerque el zoom
+REPORT_STARTUP_TIMINGS = os.environ.get("HYRULE_TIMINGS") == "1"  # imprime en consola cuánto tardó cada recurso al arrancar
+ROUTE_TABLE_MAX_NODES = 2000  # con más nodos se usa la jerarquía de contracción (guardada junto al mapa)
+PERF_HUD = os.environ.get("HYRULE_PERF") == "1"  # HUD de rendimiento al arrancar (F3 lo alterna)
+PERF_HUD_MS = 500  # refresco del HUD de rendimiento
+ALGORITHM_NAMES = {"dijkstra": "Dijkstra", "astar": "A*", "bidireccional": "Bidireccional"}
 
 # colores solicitados
 MENU_BTN_BG = "#0260A8"
@@ -52,38 +88,72 @@ MENU_BTN_TEXT = "#87F5FF"
 ALGO_BTN_BG = "#02101D"
 ALGO_BTN_TEXT = "#87F5FF"
 
-MODE_MULT = {
-    "pie": 1.5,
-    "paravela": 1.1,
-    "caballo": 0.8
-}
-
-FIXED_NODES = [
-    ("Torre 1", 236, 335),  ("Torre 2", 390, 230),  ("Torre 3", 430, 360),
-    ("Torre 4", 707, 275),  ("Torre 5", 840, 280), ("Torre 6", 1086, 107),("Torre 7", 650, 435),
-    ("Torre 8", 960, 285), ("Torre 9", 850, 430), ("Torre 10", 530, 483),
-    ("Torre 11", 230, 625),("Torre 12", 380, 693),("Torre 13", 550, 620),
-    ("Torre 14", 610, 750),("Torre 15", 720, 620),("Torre 16", 760, 780),
-    ("Torre 17", 900, 676),("Torre 18", 1005, 658)
-]
-
-BASE_EDGES = [
-    ("Torre 1","Torre 2",10),("Torre 1","Torre 3",12),("Torre 3","Torre 2",8),("Torre 3","Torre 4",18),("Torre 4","Torre 9",12),("Torre 9","Torre 5",8),
-    ("Torre 9","Torre 8",7),("Torre 8","Torre 6",9),("Torre 5","Torre 6",15),("Torre 4","Torre 7",9),("Torre 3","Torre 10",8),("Torre 11","Torre 1",25),
-    ("Torre 10","Torre 7",5),("Torre 10","Torre 13",6),("Torre 7","Torre 15",7),("Torre 13","Torre 15",8),("Torre 15","Torre 17",9),
-    ("Torre 17","Torre 18",5),("Torre 17","Torre 16",7),("Torre 14","Torre 16",6),("Torre 14","Torre 13",10),("Torre 15","Torre 16",7),("Torre 13","Torre 12",9),("Torre 12","Torre 11",15)
-]
-
 # -----------------------------
-# Transform simple (sin pan/zoom)
+# Transform (encaje, pan y zoom)
 # -----------------------------
 class Transform:
+    """
+    Imagen -> canvas. fit() calcula la escala que muestra el mapa completo (contain);
+    zoom multiplica esa escala y el offset permite desplazarse (pan). Cuando el mapa
+    escalado es más chico que el canvas se centra; si es más grande no se deja ver
+    fuera de sus bordes.
+    """
     def __init__(self, scale=1.0, offset_x=0.0, offset_y=0.0):
         self.scale = scale
         self.offset_x = offset_x
         self.offset_y = offset_y
+        self.zoom = 1.0
+        self.fit_scale = scale
+        self.view_w = self.view_h = 0
+        self.img_w = self.img_h = 0
     def img_to_canvas(self, ix, iy):
         return ix * self.scale + self.offset_x, iy * self.scale + self.offset_y
+    def canvas_to_img(self, cx, cy):
+        return (cx - self.offset_x) / self.scale, (cy - self.offset_y) / self.scale
+    def fit(self, view_w, view_h, img_w, img_h):
+        """Ajusta al tamaño del canvas conservando el zoom y el punto del centro."""
+        if self.view_w and self.zoom > 1.0:
+            cx, cy = self.canvas_to_img(self.view_w / 2, self.view_h / 2)
+        else:
+            cx, cy = img_w / 2, img_h / 2
+        self.view_w = max(1, view_w); self.view_h = max(1, view_h)
+        self.img_w = img_w; self.img_h = img_h
+        self.fit_scale = min(self.view_w / img_w, self.view_h / img_h)
+        self.scale = self.fit_scale * self.zoom
+        self.offset_x = self.view_w / 2 - cx * self.scale
+        self.offset_y = self.view_h / 2 - cy * self.scale
+        self._clamp()
+    def zoom_at(self, factor, cx, cy):
+        """Zoom por factor dejando quieto el punto (cx, cy) del canvas."""
+        ix, iy = self.canvas_to_img(cx, cy)
+        self.zoom = min(ZOOM_MAX, max(ZOOM_MIN, self.zoom * factor))
+        self.scale = self.fit_scale * self.zoom
+        self.offset_x = cx - ix * self.scale
+        self.offset_y = cy - iy * self.scale
+        self._clamp()
+    def pan(self, dx, dy):
+        self.offset_x += dx
+        self.offset_y += dy
+        self._clamp()
+    def reset(self):
+        self.zoom = 1.0
+        self.fit(self.view_w, self.view_h, self.img_w, self.img_h)
+    def _clamp(self):
+        w = self.img_w * self.scale
+        h = self.img_h * self.scale
+        if w <= self.view_w:
+            self.offset_x = (self.view_w - w) / 2
+        else:
+            self.offset_x = min(0.0, max(self.view_w - w, self.offset_x))
+        if h <= self.view_h:
+            self.offset_y = (self.view_h - h) / 2
+        else:
+            self.offset_y = min(0.0, max(self.view_h - h, self.offset_y))
+    def visible_rect(self, margin_px=0):
+        """Zona visible del canvas en coordenadas de imagen: (x0, y0, x1, y1)."""
+        x0, y0 = self.canvas_to_img(-margin_px, -margin_px)
+        x1, y1 = self.canvas_to_img(self.view_w + margin_px, self.view_h + margin_px)
+        return x0, y0, x1, y1
 
 # -----------------------------
 # Aplicación principal
@@ -95,35 +165,72 @@ class DijkstraApp:
         self.root.geometry(f"{WIN_W}x{WIN_H}")
         self.root.minsize(800,600)
         self.fullscreen = False
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
         self.root.bind("<F11>", self._toggle_fullscreen)
         self.root.bind("<Escape>", lambda e: self._exit_fullscreen())
+        self.root.bind("<space>", self._toggle_pause)
+        self.root.bind("<plus>", lambda e: self._change_speed(2.0))
+        self.root.bind("<minus>", lambda e: self._change_speed(0.5))
+        self.root.bind("<F3>", self._toggle_perf_hud)
 
         self.transform = Transform(scale=1.0, offset_x=0.0, offset_y=0.0)
-        self.nodes = []
-        self.edges = []
+        self.graph = self._load_graph()
+        self.loader = AssetLoader()
+        self._trace_cache = {}
+        self._settled_cache = {}  # (inicio, destino, modo) -> texto de nodos asentados por algoritmo
+        # pesos cambiantes: mientras haya aristas modificadas las rutas salen de aquí
+        self.dynamic = DynamicRoutes(self.graph)
+        self.model = MapModel()
         self.mode = "idle"
         self.selected_mode = None
+        self.algorithm = "dijkstra"
         self.dijkstra_sel = []
         self.animating = False
         self.char_img_tk = None
         self.char_canvas_id = None
+        self._char_img_pos = None
 
-        self._move_frames = []
-        self._move_frame_idx = 0
+        # items dibujados (solo los de la zona visible) y nivel de detalle actual
+        self._shown_nodes = {}
+        self._shown_edges = {}
+        self._show_labels = True
+        self._fonts = {}
+        self._pan_last = None
 
-        self._counter_after_id = None
-        self._counter_current = 0.0
-        self._counter_target = 0.0
-        self._counter_duration_ms = 0
-        self._counter_start_time = None
-        self._counter_update_interval = 30
+        self._move_frames = []
+        self.path_sampler = PathSampler(MOVE_STEP_PX)
+        self._travel_cost = 0.0
+
+        # todas las animaciones avanzan con este reloj; un flush del canvas por fotograma
+        self.scheduler = FrameScheduler(self.root, fps=FRAME_RATE, flush=self._flush_canvas)
+
+        # perfilado opcional: solo se envuelven los métodos mientras el HUD está activo
+        self.profiler = Profiler(PERF_LOG)
+        self.profiler.watch_after(tk.Misc)
+        self.profiler.watch_frames(self.scheduler)
+        self.profiler.watch(self, "_draw_background", "_sync_viewport", "_update_visual_state",
+                            "_on_execute_dijkstra", "_exploration_trace", "_show_distance_overlay",
+                            "_set_edge_weight", "_prepare_move_frames", "_create_nodes_and_edges")
+        self.profiler.watch(VideoDecoder, "frame_at", prefix="VideoDecoder.")
+        self.profiler.watch(ClipPlayer, "frame_at", prefix="ClipPlayer.")
+        self.perf_var = tk.StringVar(value="")
+        self.perf_label = None
+        self._perf_after_id = None
 
         self._menu_title_tk = None
         self._menu_btn_imgs = {}
+        self.bg_id = None
+        self._bg_after_id = None
+        self._transition_clip = None
         self.custom_font_family = None
 
+        if PERF_HUD:
+            self._toggle_perf_hud()
         self._load_resources()
         self._build_menu()
+        self.loader.mark("menu visible")
+        if REPORT_STARTUP_TIMINGS:
+            self._report_startup_when_done()
 
     # -----------------------------
     # Recursos: imagenes, videos, fuente OTF
@@ -133,24 +240,25 @@ class DijkstraApp:
             messagebox.showerror("Error", f"No se encontró la imagen de fondo: {BACKGROUND_IMG}\nColócala en assets/ y renómbrala 'mapa.png'")
             self.root.destroy()
             return
-        self.img_orig = Image.open(BACKGROUND_IMG).convert("RGBA")
-        self.img_w, self.img_h = self.img_orig.size
-
-        self.menu_video_cap = None
-        self.transition_video_cap = None
-        if CV2_AVAILABLE and os.path.exists(MENU_VIDEO):
-            self.menu_video_cap = cv2.VideoCapture(MENU_VIDEO)
-        if CV2_AVAILABLE and os.path.exists(TRANSITION_VIDEO):
-            self.transition_video_cap = cv2.VideoCapture(TRANSITION_VIDEO)
 
-        self.char_imgs = {}
+        # todo se decodifica en paralelo en el pool; el menú solo espera el mapa y el título,
+        # los sprites, OpenCV y la tabla de rutas se recogen cuando se usan por primera vez
+        self.loader.submit("mapa.png", lambda: BackgroundCache(load_image(BACKGROUND_IMG), max_items=BG_CACHE_SIZE))
+        if os.path.exists(MENU_TITLE_IMG):
+            # conservar tamaño proporcional del texto original: escalar a ~560x64 si es mucho mayor
+            self.loader.submit("Titulo.png", load_fitted_image, MENU_TITLE_IMG, 760, 120)
         for key, path in CHAR_IMG.items():
             if os.path.exists(path):
-                img = Image.open(path).convert("RGBA")
-                img = img.resize((36,36), Image.LANCZOS)
-                self.char_imgs[key] = img
-            else:
-                self.char_imgs[key] = None
+                self.loader.submit(f"sprite:{key}", load_sprite, path, CHAR_SIZE, SPRITE_CACHE_DIR)
+        self.loader.submit("cv2", import_cv2)
+        # en hilo daemon: si se cierra la ventana a mitad del build no espera a que termine.
+        # Se construye sobre una copia de los pesos: editar aristas mientras tanto no debe
+        # colarse en la tabla/jerarquía que se guarda con la huella del mapa original
+        self.loader.submit("rutas", self._load_router, self.graph.snapshot(), daemon=True)
+
+        # los videos se abren y decodifican en un hilo (VideoDecoder) al reproducirse
+        self.menu_video_path = MENU_VIDEO if os.path.exists(MENU_VIDEO) else None
+        self.transition_video_path = TRANSITION_VIDEO if os.path.exists(TRANSITION_VIDEO) else None
 
         # registrar la fuente OTF personalizada (best-effort)
         try:
@@ -171,21 +279,63 @@ class DijkstraApp:
         except Exception:
             self.custom_font_family = None
 
-        # cargar imagen de título del menú si existe
-        if os.path.exists(MENU_TITLE_IMG):
-            try:
-                img = Image.open(MENU_TITLE_IMG).convert("RGBA")
-                # conservar tamaño proporcional del texto original: escalar a ~560x64 si es mucho mayor
-                max_w, max_h = 760, 120
-                iw, ih = img.size
-                scale = min(1.0, max_w / iw, max_h / ih)
-                tw, th = int(iw * scale), int(ih * scale)
-                img = img.resize((tw, th), Image.LANCZOS)
-                self._menu_title_tk = ImageTk.PhotoImage(img)
-            except Exception:
-                self._menu_title_tk = None
-        else:
-            self._menu_title_tk = None
+        self.bg_cache = self.loader.get("mapa.png")
+        self.img_orig = self.bg_cache.pyramid[0]
+        self.img_w, self.img_h = self.img_orig.size
+
+        title = self.loader.get("Titulo.png")
+        self._menu_title_tk = ImageTk.PhotoImage(title) if title is not None else None
+
+    def _load_graph(self):
+        # el mapa se lee del binario (mmap); si las listas CSV/JSON cambiaron se reimporta.
+        # Sin archivos de mapa se usa el de Hyrule incluido en grafo.py
+        try:
+            graph = load_map(MAP_NODES, MAP_EDGES, MAP_GRAPH)
+        except Exception as ex:
+            messagebox.showwarning("Mapa", f"No se pudo cargar el mapa ({ex}); se usa el mapa por defecto.")
+            graph = None
+        if graph is None:
+            graph = default_graph()
+        return graph
+
+    def _load_router(self, graph):
+        # tabla de todos los pares para mapas pequeños; jerarquía de contracción para los
+        # grandes (la tabla crece con n² y tardaría demasiado en construirse)
+        if len(graph) <= ROUTE_TABLE_MAX_NODES:
+            return load_route_table(graph, CACHE_DIR)
+        return load_hierarchy(graph, CACHE_DIR)
+
+    def _char_img(self, key):
+        # sprite ya escalado (bloquea solo si su carga en el pool aún no terminó)
+        return self.loader.get(f"sprite:{key}") if key else None
+
+    def _video_available(self, path):
+        # no espera a OpenCV: mientras se importa se usa el fondo estático
+        return bool(path) and self.loader.done("cv2") and self.loader.get("cv2") is not None
+
+    def _menu_video_when_ready(self, frame):
+        # el menú se armó sin video porque OpenCV aún cargaba: se rehace al terminar
+        # (solo si ese mismo menú sigue en pantalla)
+        if frame is not self.menu_frame or not frame.winfo_exists():
+            return
+        if not self.loader.done("cv2"):
+            self.root.after(100, self._menu_video_when_ready, frame)
+            return
+        if self._video_available(self.menu_video_path):
+            self._build_menu()
+
+    def _on_close(self):
+        # sin esto un build largo de la jerarquía en el pool mantiene vivo el proceso
+        self.loader.shutdown(cancel_futures=True)
+        self.profiler.disable()
+        self.root.destroy()
+
+    def _report_startup_when_done(self):
+        if not self.loader.all_done():
+            self.root.after(50, self._report_startup_when_done)
+            return
+        self.loader.mark("todo cargado")
+        print("Tiempos de arranque:\n" + self.loader.report())
 
     # -----------------------------
     # Menú principal (usa imagen de título si está)
@@ -198,16 +348,17 @@ class DijkstraApp:
         self.menu_frame.pack(fill="both", expand=True)
 
         overlay_parent = None
-        if self.menu_video_cap:
+        if self.menu_video_path and not self.loader.done("cv2"):
+            self.root.after(100, self._menu_video_when_ready, self.menu_frame)
+        if self._video_available(self.menu_video_path):
             lbl = tk.Label(self.menu_frame, bg="#001523")
             lbl.pack(fill="both", expand=True)
-            self._play_video_on_label(self.menu_video_cap, lbl, loop=True)
+            self._play_video_on_label(self.menu_video_path, lbl, loop=True)
             overlay_parent = self.menu_frame
         else:
             canvas = tk.Canvas(self.menu_frame, width=WIN_W, height=WIN_H, bg="#001523", highlightthickness=0)
             canvas.pack(fill="both", expand=True)
-            img = self.img_orig.copy().resize((WIN_W, WIN_H), Image.LANCZOS)
-            self.menu_bg_tk = ImageTk.PhotoImage(img)
+            self.menu_bg_tk = self.bg_cache.photo(WIN_W, WIN_H)
             canvas.create_image(0,0, anchor="nw", image=self.menu_bg_tk)
             canvas.create_rectangle(0,0,WIN_W,WIN_H, fill="#001523", stipple="gray50")
             overlay_parent = canvas
@@ -251,61 +402,89 @@ class DijkstraApp:
         hint = tk.Label(overlay_parent, text="(Selecciona modo — luego elige nodo inicio y destino en el mapa)", bg="#001523", fg="white", font=hint_font)
         hint.place(relx=0.5, rely=0.52, anchor="center")
 
-    def _play_video_on_label(self, cap, label_widget, loop=False):
+        # precargar la transición mientras el usuario está en el menú
+        self.root.after(200, self._precache_transition)
+
+    def _precache_transition(self):
+        if not self.transition_video_path or TRANSITION_CACHE_MB <= 0:
+            return
+        if not self.loader.done("cv2"):
+            self.root.after(200, self._precache_transition)
+            return
+        if self.loader.get("cv2") is None:
+            return
+        size = (max(1, self.root.winfo_width()), max(1, self.root.winfo_height()))
+        if size == (1, 1):
+            size = (WIN_W, WIN_H)
+        clip = self._transition_clip
+        if clip is not None and clip.matches(self.transition_video_path, size):
+            return
+        self._transition_clip = ClipCache(self.transition_video_path, size, TRANSITION_CACHE_MB * 1024 * 1024)
+
+    def _play_video_on_label(self, path, label_widget, loop=False, on_end=None):
+        # la decodificación va en un hilo; aquí solo se elige el fotograma según el reloj
+        # y el FPS real del archivo, y se cambia el PhotoImage del label
+        try:
+            size = (max(1, label_widget.winfo_width()), max(1, label_widget.winfo_height()))
+        except Exception:
+            size = (WIN_W, WIN_H)
+        if size == (1, 1):
+            size = (WIN_W, WIN_H)
+        return self._play_on_label(VideoDecoder(path, size, loop=loop), label_widget, on_end=on_end)
+
+    def _play_on_label(self, player, label_widget, on_end=None):
+        # player es un VideoDecoder (desde archivo) o un ClipPlayer (desde memoria).
+        # El reloj arranca cuando el player está listo: antes su fps es solo el de por defecto
+        start = None
+        delay = max(1, int(1000 / DEFAULT_FPS / 2))
         def update():
-            ret, frame = cap.read()
-            if not ret:
-                if loop:
-                    cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    ret, frame = cap.read()
-                    if not ret:
-                        return
-                else:
+            nonlocal start, delay
+            if not label_widget.winfo_exists():
+                player.stop()
+                return
+            if start is None:
+                if not player.ready:
+                    label_widget.after(delay, update)
                     return
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            try:
-                w = max(1, label_widget.winfo_width())
-                h = max(1, label_widget.winfo_height())
-            except Exception:
-                w, h = WIN_W, WIN_H
-            frame = cv2.resize(frame, (w, h))
-            img = ImageTk.PhotoImage(Image.fromarray(frame))
-            label_widget.imgtk = img
-            label_widget.configure(image=img)
-            label_widget.after(30, update)
+                start = time.perf_counter()
+                delay = max(1, int(1000 / player.fps / 2))
+            w = max(1, label_widget.winfo_width())
+            h = max(1, label_widget.winfo_height())
+            if w > 1 and h > 1:
+                player.set_size(w, h)
+            frame = player.frame_at(int((time.perf_counter() - start) * player.fps))
+            if frame is not None:
+                img = ImageTk.PhotoImage(frame)
+                label_widget.imgtk = img
+                label_widget.configure(image=img)
+            elif player.finished:
+                player.stop()
+                if on_end:
+                    on_end()
+                return
+            label_widget.after(delay, update)
         update()
+        return player
 
     def _start_transition_and_open(self, mode_key):
         self.selected_mode = mode_key
         for w in self.root.winfo_children():
             w.destroy()
-        if self.transition_video_cap:
+        if self._video_available(self.transition_video_path):
             lbl = tk.Label(self.root, bg="black")
             lbl.pack(fill="both", expand=True)
-            def update_tr():
-                ret, frame = self.transition_video_cap.read()
-                if not ret:
-                    self.transition_video_cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    lbl.destroy()
-                    self._build_main()
-                    return
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-                try:
-                    w = max(1, lbl.winfo_width())
-                    h = max(1, lbl.winfo_height())
-                except Exception:
-                    w, h = WIN_W, WIN_H
-                frame = cv2.resize(frame, (w, h))
-                img = ImageTk.PhotoImage(Image.fromarray(frame))
-                lbl.imgtk = img
-                lbl.configure(image=img)
-                lbl.after(30, update_tr)
-            update_tr()
+            def on_end():
+                lbl.destroy()
+                self._build_main()
+            clip = self._transition_clip
+            if clip is not None and clip.ready.is_set() and not clip.failed:
+                self._play_on_label(ClipPlayer(clip), lbl, on_end=on_end)
+            else:
+                self._play_video_on_label(self.transition_video_path, lbl, loop=False, on_end=on_end)
         else:
             lbl = tk.Label(self.root)
             lbl.pack(fill="both", expand=True)
-            img = self.img_orig.copy().resize((WIN_W, WIN_H), Image.LANCZOS)
-            tkimg = ImageTk.PhotoImage(img)
+            tkimg = self.bg_cache.photo(WIN_W, WIN_H)
             lbl.configure(image=tkimg)
             lbl.image = tkimg
             self.root.after(800, lambda: (lbl.destroy(), self._build_main()))
@@ -347,31 +526,46 @@ class DijkstraApp:
         }
         tk.Button(left, text="Reiniciar aristas", command=self._reset_edges, **algo_btn_cfg).pack(fill="x", padx=12, pady=6)
         tk.Button(left, text="Seleccionar inicio/destino", command=self._set_select_start_end, **algo_btn_cfg).pack(fill="x", padx=12, pady=6)
-        tk.Button(left, text="Ejecutar Dijkstra", command=self._on_execute_dijkstra, **algo_btn_cfg).pack(fill="x", padx=12, pady=6)
+        tk.Button(left, text="Ejecutar búsqueda", command=lambda: self._on_execute_dijkstra(), **algo_btn_cfg).pack(fill="x", padx=12, pady=6)
+        tk.Button(left, text="Distancias desde un nodo", command=self._set_select_overlay, **algo_btn_cfg).pack(fill="x", padx=12, pady=6)
+        tk.Button(left, text="Cambiar peso de arista", command=self._set_select_edge, **algo_btn_cfg).pack(fill="x", padx=12, pady=6)
         tk.Button(left, text="Volver al menú", command=self._back_to_menu, **algo_btn_cfg).pack(fill="x", padx=12, pady=6)
 
+        # algoritmo de búsqueda punto a punto (todos dan el mismo costo; cambia lo explorado)
+        self.algorithm_var = tk.StringVar(value=self.algorithm)
+        algo_box = tk.Frame(left, bg="#012428")
+        algo_box.pack(fill="x", padx=12, pady=(10, 0))
+        for key in ALGORITHMS:
+            tk.Radiobutton(algo_box, text=ALGORITHM_NAMES[key], value=key, variable=self.algorithm_var,
+                           command=lambda: setattr(self, "algorithm", self.algorithm_var.get()),
+                           bg="#012428", fg="white", selectcolor=ALGO_BTN_BG,
+                           activebackground="#012428", activeforeground="white",
+                           font=font_small, anchor="w").pack(fill="x")
+
         self.left_cost_var = tk.StringVar(value="Costo del viaje: --")
         tk.Label(left, textvariable=self.left_cost_var, bg="#012428", fg="white", font=font_result).pack(padx=8, pady=10)
 
+        self.settled_var = tk.StringVar(value="Nodos asentados: --")
+        tk.Label(left, textvariable=self.settled_var, bg="#012428", fg="white", wraplength=220, justify="left", font=font_small).pack(padx=8)
+
         self.info_var = tk.StringVar(value=f"Modo elegido: {self.selected_mode}  — selecciona inicio y destino")
         tk.Label(left, textvariable=self.info_var, bg="#012428", fg="white", wraplength=220, font=font_small).pack(padx=8, pady=14)
 
         self.canvas = tk.Canvas(right, width=WIN_W, height=WIN_H, bg="black", highlightthickness=0)
         self.canvas.pack(fill="both", expand=True)
+        self.renderer = CanvasRenderer(self.canvas)
+        # canvas nuevo: los ids de items anteriores ya no existen
+        self._shown_nodes = {}
+        self._shown_edges = {}
+        self.char_canvas_id = None
+        self.hud_title_id = None
 
         # forzar layout y obtener tamaños reales antes de calcular escala
         self.root.update_idletasks()
-        canvas_w = max(1, self.canvas.winfo_width())
-        canvas_h = max(1, self.canvas.winfo_height())
-
-        # usar contain (min) para evitar zoom/recorte
-        scale_x = canvas_w / self.img_w
-        scale_y = canvas_h / self.img_h
-        scale = min(scale_x, scale_y)
-        self.transform.scale = scale
-        self.transform.offset_x = (canvas_w - self.img_w * scale) / 2
-        self.transform.offset_y = (canvas_h - self.img_h * scale) / 2
+        self.transform.zoom = 1.0
+        self.transform.fit(max(1, self.canvas.winfo_width()), max(1, self.canvas.winfo_height()), self.img_w, self.img_h)
 
+        self.bg_id = None
         self._draw_background()
         self._create_nodes_and_edges()
         self._create_hud_title()
@@ -380,17 +574,8 @@ class DijkstraApp:
         # handler reducido: actualizar coords sin recrear todo
         def _on_canvas_config(event):
             try:
-                canvas_w = max(1, event.width)
-                canvas_h = max(1, event.height)
-                scale_x = canvas_w / self.img_w
-                scale_y = canvas_h / self.img_h
-                scale = min(scale_x, scale_y)
-                self.transform.scale = scale
-                self.transform.offset_x = (canvas_w - self.img_w * scale) / 2
-                self.transform.offset_y = (canvas_h - self.img_h * scale) / 2
-                self._draw_background()
-                self._update_node_positions()
-                self._update_edge_positions()
+                self.transform.fit(max(1, event.width), max(1, event.height), self.img_w, self.img_h)
+                self._on_view_changed()
                 self._create_hud_title()
                 self._place_hud_widgets()
             except Exception:
@@ -398,46 +583,73 @@ class DijkstraApp:
 
         self.canvas.bind("<Configure>", _on_canvas_config)
         self.canvas.bind("<Button-1>", self._on_left_click)
+        # zoom con la rueda (Windows/macOS: MouseWheel; Linux: Button-4/5) y pan arrastrando
+        # con el botón derecho o el central; Inicio vuelve al mapa completo
+        self.canvas.bind("<MouseWheel>", lambda e: self._zoom_view(ZOOM_STEP if e.delta > 0 else 1 / ZOOM_STEP, e.x, e.y))
+        self.canvas.bind("<Button-4>", lambda e: self._zoom_view(ZOOM_STEP, e.x, e.y))
+        self.canvas.bind("<Button-5>", lambda e: self._zoom_view(1 / ZOOM_STEP, e.x, e.y))
+        for button in (2, 3):
+            self.canvas.bind(f"<ButtonPress-{button}>", self._start_pan)
+            self.canvas.bind(f"<B{button}-Motion>", self._drag_pan)
+            self.canvas.bind(f"<ButtonRelease-{button}>", self._end_pan)
+        self.root.bind("<Home>", lambda e: self._reset_view())
 
         self.char_canvas_id = None
 
     # -----------------------------
     # Dibujar fondo (usando transform)
     # -----------------------------
-    def _draw_background(self):
-        w = max(1, int(self.img_w * self.transform.scale))
-        h = max(1, int(self.img_h * self.transform.scale))
-        img = self.img_orig.copy().resize((w, h), Image.LANCZOS)
-        self.tk_bg = ImageTk.PhotoImage(img)
+    def _draw_background(self, preview=False):
+        t = self.transform
+        w = max(1, int(self.img_w * t.scale))
+        h = max(1, int(self.img_h * t.scale))
+        box = None
+        ox = int(round(t.offset_x))
+        oy = int(round(t.offset_y))
+        if w > 2 * t.view_w or h > 2 * t.view_h:
+            # con zoom solo se escala la zona visible del mapa
+            x0, y0, x1, y1 = t.visible_rect()
+            x0 = max(0, int(x0)); y0 = max(0, int(y0))
+            x1 = min(self.img_w, int(x1) + 1); y1 = min(self.img_h, int(y1) + 1)
+            box = (x0, y0, x1, y1)
+            w = max(1, int(round((x1 - x0) * t.scale)))
+            h = max(1, int(round((y1 - y0) * t.scale)))
+            ox, oy = (int(round(c)) for c in t.img_to_canvas(x0, y0))
+        if preview and self.bg_cache.cached(w, h, box) is None:
+            # mientras se redimensiona: vista previa barata y LANCZOS cuando el tamaño se asiente
+            self.tk_bg = self.bg_cache.photo(w, h, preview=True, box=box)
+            self._schedule_background_refresh()
+        else:
+            self.tk_bg = self.bg_cache.photo(w, h, box=box)
+        if self.bg_id and self.canvas.type(self.bg_id) == "image":
+            self.canvas.itemconfig(self.bg_id, image=self.tk_bg)
+            self.canvas.coords(self.bg_id, ox, oy)
+        else:
+            self.bg_id = self.canvas.create_image(ox, oy, anchor="nw", image=self.tk_bg)
+        self.canvas.tag_lower(self.bg_id)
+
+    def _schedule_background_refresh(self):
+        if self._bg_after_id:
+            try:
+                self.root.after_cancel(self._bg_after_id)
+            except Exception:
+                pass
+        self._bg_after_id = self.root.after(BG_SETTLE_MS, self._settle_background)
+
+    def _settle_background(self):
+        self._bg_after_id = None
         try:
-            if hasattr(self, "bg_id") and self.bg_id:
-                self.canvas.delete(self.bg_id)
-        except:
+            self._draw_background()
+        except Exception:
             pass
-        ox = int(round(self.transform.offset_x))
-        oy = int(round(self.transform.offset_y))
-        self.bg_id = self.canvas.create_image(ox, oy, anchor="nw", image=self.tk_bg)
-        self.canvas.tag_lower(self.bg_id)
 
     # -----------------------------
     # Crear nodos y aristas (primera vez)
     # -----------------------------
     def _create_nodes_and_edges(self):
-        for e in list(self.edges):
-            try:
-                self.canvas.delete(e["line"])
-                self.canvas.delete(e["text_id"])
-            except:
-                pass
-        for n in list(self.nodes):
-            try:
-                self.canvas.delete(n["oval"])
-                self.canvas.delete(n["text"])
-                self.canvas.delete(n["dist"])
-            except:
-                pass
-        self.nodes = []
-        self.edges = []
+        self._delete_all_items()
+        self.model.clear()
+        self.renderer.clear()
 
         if self.custom_font_family:
             node_font = (self.custom_font_family, 9, "bold")
@@ -447,63 +659,172 @@ class DijkstraApp:
             node_font = ("Segoe UI", 9, "bold")
             dist_font = ("Segoe UI", 8, "bold")
             edge_font = ("Segoe UI", 10, "bold")
+        self._fonts = {"node": node_font, "dist": dist_font, "edge": edge_font}
 
-        for label, ix, iy in FIXED_NODES:
-            cx, cy = self.transform.img_to_canvas(ix, iy)
-            oval = self.canvas.create_oval(cx - NODE_RADIUS, cy - NODE_RADIUS, cx + NODE_RADIUS, cy + NODE_RADIUS,
-                                           fill=NODE_COLOR, outline=NODE_OUTLINE, width=2, tags=("node",))
-            txt = self.canvas.create_text(cx, cy, text=label, fill="black", font=node_font)
-            dist_id = self.canvas.create_text(cx + DIST_OFFSET[0], cy + DIST_OFFSET[1], text="∞", fill="white", font=dist_font)
-            node = {"label": label, "ix": ix, "iy": iy, "oval": oval, "text": txt, "dist": dist_id}
-            self.nodes.append(node)
-            self.canvas.tag_raise(oval)
-            self.canvas.tag_raise(txt)
-            self.canvas.tag_raise(dist_id)
-
-        for u,v,w in BASE_EDGES:
-            a = self._find_node_by_label(u)
-            b = self._find_node_by_label(v)
-            if a and b:
-                ax, ay = self.transform.img_to_canvas(a["ix"], a["iy"])
-                bx, by = self.transform.img_to_canvas(b["ix"], b["iy"])
-                line = self.canvas.create_line(ax, ay, bx, by, fill=EDGE_COLOR, width=2)
-                mx, my = (ax+bx)/2, (ay+by)/2
-                text_id = self.canvas.create_text(mx, my, text=str(w), fill="yellow", font=edge_font)
-                edge = {"u": u, "v": v, "line": line, "weight": w, "text_id": text_id, "base_weight": w}
-                self.edges.append(edge)
-                self.canvas.tag_raise(text_id)
+        # el modelo solo indexa el grafo; las entradas y los items del canvas se crean en
+        # _sync_viewport para lo que queda en pantalla
+        self.model.load(self.graph)
+        self._sync_viewport()
 
     def _find_node_by_label(self, label):
-        for n in self.nodes:
-            if n["label"] == label:
-                return n
-        return None
+        return self.model.node(label)
 
     # -----------------------------
-    # Actualizar posiciones (sin recrear objetos)
+    # Recorte a la zona visible y nivel de detalle
     # -----------------------------
-    def _update_node_positions(self):
-        for n in self.nodes:
-            cx, cy = self.transform.img_to_canvas(n["ix"], n["iy"])
-            self.canvas.coords(n["oval"], cx - NODE_RADIUS, cy - NODE_RADIUS, cx + NODE_RADIUS, cy + NODE_RADIUS)
+    def _sync_viewport(self):
+        # solo existen (y se reposicionan) los items que tocan la zona visible; con poco
+        # zoom o demasiados items en pantalla no se dibujan los textos
+        x0, y0, x1, y1 = self.transform.visible_rect(VIEW_MARGIN_PX)
+        found = self.model.visible(x0, y0, x1, y1, MAX_DRAWN_ITEMS)
+        nodes, edges = found or ([], [])
+        labels = (found is not None and self.transform.scale >= LABEL_MIN_SCALE
+                  and len(nodes) + len(edges) <= MAX_LABELED_ITEMS)
+        if labels != self._show_labels:
+            self._show_labels = labels
+            self._delete_all_items()
+
+        visible_nodes = {n["label"]: n for n in nodes}
+        visible_edges = {self._edge_key(e): e for e in edges}
+        for label in self._shown_nodes.keys() - visible_nodes.keys():
+            self._delete_node_items(self._shown_nodes[label])
+        for key in self._shown_edges.keys() - visible_edges.keys():
+            self._delete_edge_items(self._shown_edges[key])
+        self._shown_nodes = visible_nodes
+        self._shown_edges = visible_edges
+
+        created = False
+        for e in edges:
+            if e["line"] is None:
+                self._create_edge_items(e)
+                created = True
+            else:
+                self._place_edge(e)
+        for n in nodes:
+            if n["oval"] is None:
+                self._create_node_items(n)
+                created = True
+            else:
+                self._place_node(n)
+        if created:
+            for item in (self.char_canvas_id, getattr(self, "hud_title_id", None)):
+                if item:
+                    self.canvas.tag_raise(item)
+
+    def _edge_key(self, e):
+        return (e["u"], e["v"])
+
+    def _create_node_items(self, n):
+        cx, cy = self.transform.img_to_canvas(n["ix"], n["iy"])
+        n["oval"] = self.canvas.create_oval(cx - NODE_RADIUS, cy - NODE_RADIUS, cx + NODE_RADIUS, cy + NODE_RADIUS,
+                                            fill=NODE_COLOR, outline=NODE_OUTLINE, width=2, tags=("node",))
+        if self._show_labels:
+            n["text"] = self.canvas.create_text(cx, cy, text=n["label"], fill="black", font=self._fonts["node"], tags=("node",))
+            n["dist"] = self.canvas.create_text(cx + DIST_OFFSET[0], cy + DIST_OFFSET[1], text="∞", fill="white",
+                                                font=self._fonts["dist"], tags=("node",))
+        self._style_node(n)
+
+    def _create_edge_items(self, e):
+        a, b = self.model.endpoints(e)
+        ax, ay = self.transform.img_to_canvas(a["ix"], a["iy"])
+        bx, by = self.transform.img_to_canvas(b["ix"], b["iy"])
+        line = self.canvas.create_line(ax, ay, bx, by, fill=EDGE_COLOR, width=2, tags=("edge",))
+        self.model.set_line(e, line)
+        if self._shown_nodes:
+            try:
+                self.canvas.tag_lower(line, "node")  # las líneas van debajo de los nodos
+            except tk.TclError:
+                pass
+        if self._show_labels:
+            e["text_id"] = self.canvas.create_text((ax+bx)/2, (ay+by)/2, text=self._weight_text(e["weight"]), fill="yellow", font=self._fonts["edge"])
+        self._style_edge(e)
+
+    def _delete_node_items(self, n):
+        items = [i for i in (n["oval"], n["text"], n["dist"]) if i is not None]
+        if items:
+            self.canvas.delete(*items)
+            self.renderer.forget(*items)
+        n["oval"] = n["text"] = n["dist"] = None
+
+    def _delete_edge_items(self, e):
+        items = [i for i in (e["line"], e["text_id"]) if i is not None]
+        if items:
+            self.canvas.delete(*items)
+            self.renderer.forget(*items)
+        self.model.set_line(e, None)
+        e["text_id"] = None
+
+    def _delete_all_items(self):
+        for n in self._shown_nodes.values():
+            self._delete_node_items(n)
+        for e in self._shown_edges.values():
+            self._delete_edge_items(e)
+        self._shown_nodes = {}
+        self._shown_edges = {}
+
+    def _place_node(self, n):
+        cx, cy = self.transform.img_to_canvas(n["ix"], n["iy"])
+        self.canvas.coords(n["oval"], cx - NODE_RADIUS, cy - NODE_RADIUS, cx + NODE_RADIUS, cy + NODE_RADIUS)
+        if n["text"] is not None:
             self.canvas.coords(n["text"], cx, cy)
             self.canvas.coords(n["dist"], cx + DIST_OFFSET[0], cy + DIST_OFFSET[1])
 
-    def _update_edge_positions(self):
-        for e in self.edges:
-            a = self._find_node_by_label(e["u"]); b = self._find_node_by_label(e["v"])
-            if not a or not b:
-                continue
-            ax, ay = self.transform.img_to_canvas(a["ix"], a["iy"])
-            bx, by = self.transform.img_to_canvas(b["ix"], b["iy"])
-            self.canvas.coords(e["line"], ax, ay, bx, by)
-            mx, my = (ax+bx)/2, (ay+by)/2
-            self.canvas.coords(e["text_id"], mx, my)
+    def _place_edge(self, e):
+        a, b = self.model.endpoints(e)
+        ax, ay = self.transform.img_to_canvas(a["ix"], a["iy"])
+        bx, by = self.transform.img_to_canvas(b["ix"], b["iy"])
+        self.canvas.coords(e["line"], ax, ay, bx, by)
+        if e["text_id"] is not None:
+            self.canvas.coords(e["text_id"], (ax+bx)/2, (ay+by)/2)
+
+    # -----------------------------
+    # Zoom y desplazamiento
+    # -----------------------------
+    def _on_view_changed(self, preview=True):
+        self._draw_background(preview=preview)
+        self._sync_viewport()
+        # el personaje quieto se recoloca; durante el movimiento lo hace cada fotograma
+        if self.char_canvas_id and self._char_img_pos and not self.scheduler.running("movimiento"):
+            self._move_character(*self.transform.img_to_canvas(*self._char_img_pos))
+
+    def _view_ready(self):
+        canvas = getattr(self, "canvas", None)
+        return canvas is not None and canvas.winfo_exists() and self.transform.view_w > 0
+
+    def _zoom_view(self, factor, cx, cy):
+        if not self._view_ready():
+            return
+        self.transform.zoom_at(factor, cx, cy)
+        self._on_view_changed()
+
+    def _reset_view(self):
+        if not self._view_ready():
+            return
+        self.transform.reset()
+        self._on_view_changed()
+
+    def _start_pan(self, event):
+        self._pan_last = (event.x, event.y)
+
+    def _drag_pan(self, event):
+        if self._pan_last is None or not self._view_ready():
+            return
+        lx, ly = self._pan_last
+        self._pan_last = (event.x, event.y)
+        self.transform.pan(event.x - lx, event.y - ly)
+        self._on_view_changed()
+
+    def _end_pan(self, event):
+        self._pan_last = None
 
     # -----------------------------
     # Interacción: seleccionar inicio/destino
     # -----------------------------
     def _on_left_click(self, event):
+        if self.mode == "select_edge":
+            self.mode = "idle"
+            self._edit_edge_at(event.x, event.y)
+            return
         node = self._node_at_canvas(event.x, event.y)
         if node:
             if self.mode == "select_start_end":
@@ -520,16 +841,28 @@ class DijkstraApp:
                         self.info_var.set(f"Inicio: {self.dijkstra_sel[0]['label']}  —  Destino: {self.dijkstra_sel[1]['label']}")
                         self.mode = "idle"
                         self._place_character_on_node(self.dijkstra_sel[0])
+            elif self.mode == "select_overlay":
+                self.mode = "idle"
+                self._show_distance_overlay(node["label"])
             else:
                 self.info_var.set(f"Clic en nodo {node['label']}")
 
     def _node_at_canvas(self, cx, cy):
-        for n in self.nodes:
-            nx_c, ny_c = self.transform.img_to_canvas(n["ix"], n["iy"])
-            r = NODE_RADIUS
-            if (cx - nx_c) ** 2 + (cy - ny_c) ** 2 <= r * r:
-                return n
-        return None
+        # se pasa el clic a coordenadas de imagen y se consulta la rejilla del modelo
+        ix, iy = self.transform.canvas_to_img(cx, cy)
+        return self.model.node_near(ix, iy, NODE_RADIUS / max(1e-9, self.transform.scale))
+
+    def _set_select_overlay(self):
+        if self.animating:
+            return
+        self.mode = "select_overlay"
+        self.info_var.set("Haz clic en un nodo para ver la distancia desde él a todos los demás")
+
+    def _set_select_edge(self):
+        if self.animating:
+            return
+        self.mode = "select_edge"
+        self.info_var.set("Haz clic sobre una arista para cambiar su peso o cerrarla")
 
     def _set_select_start_end(self):
         self.mode = "select_start_end"
@@ -547,7 +880,7 @@ class DijkstraApp:
                 pass
             self.char_canvas_id = None
         key = self.selected_mode
-        img = self.char_imgs.get(key)
+        img = self._char_img(key)
         cx, cy = self.transform.img_to_canvas(node["ix"], node["iy"])
         if img is None:
             self.char_canvas_id = self.canvas.create_oval(cx-8, cy-8, cx+8, cy+8, fill="#ffcc66", outline="")
@@ -561,20 +894,12 @@ class DijkstraApp:
     def _character_entry_animation(self, start_node):
         tx, ty = self.transform.img_to_canvas(start_node["ix"], start_node["iy"])
         start_x, start_y = -80, -80
-        steps = 40
         def ease_out_quad(t): return 1 - (1 - t) * (1 - t)
-        frames = []
-        for i in range(1, steps+1):
-            t = i/steps
-            e = ease_out_quad(t)
-            nx = start_x + (tx - start_x) * e
-            ny = start_y + (ty - start_y) * e
-            frames.append((nx, ny))
         # crear imagen fallback si hace falta
         img = None
         key = self.selected_mode
         if key:
-            img = self.char_imgs.get(key)
+            img = self._char_img(key)
         if self.char_canvas_id:
             try:
                 self.canvas.delete(self.char_canvas_id)
@@ -585,23 +910,22 @@ class DijkstraApp:
             self.char_img_tk = ImageTk.PhotoImage(img)
             self.char_canvas_id = self.canvas.create_image(start_x, start_y, image=self.char_img_tk)
         else:
+            self.char_img_tk = None
             self.char_canvas_id = self.canvas.create_oval(start_x-8, start_y-8, start_x+8, start_y+8, fill="#ffcc66", outline="")
 
-        def _step(idx=0):
-            if idx >= len(frames):
-                if img:
-                    self.canvas.coords(self.char_canvas_id, tx, ty - NODE_RADIUS - 10)
-                else:
-                    self.canvas.coords(self.char_canvas_id, tx-8, ty-8, tx+8, ty+8)
-                return
-            x, y = frames[idx]
-            if img:
-                self.canvas.coords(self.char_canvas_id, x, y - NODE_RADIUS - 10)
-            else:
-                self.canvas.coords(self.char_canvas_id, x-8, y-8, x+8, y+8)
-            self.canvas.update()
-            self.root.after(16, lambda: _step(idx+1))
-        _step(0)
+        def _step(elapsed):
+            t = min(1.0, elapsed / ENTRY_ANIM_MS)
+            e = ease_out_quad(t)
+            self._move_character(start_x + (tx - start_x) * e, start_y + (ty - start_y) * e)
+            return t < 1.0
+        self.scheduler.start("entrada", _step)
+
+    def _move_character(self, x, y):
+        self._char_img_pos = self.transform.canvas_to_img(x, y)
+        if self.char_img_tk:
+            self.canvas.coords(self.char_canvas_id, x, y - NODE_RADIUS - 10)
+        else:
+            self.canvas.coords(self.char_canvas_id, x-8, y-8, x+8, y+8)
 
     # -----------------------------
     # Ejecutar Dijkstra y animar pasos + movimiento
@@ -617,234 +941,331 @@ class DijkstraApp:
         start_label = self.dijkstra_sel[0]["label"]
         end_label = self.dijkstra_sel[1]["label"]
 
-        mult = MODE_MULT.get(self.selected_mode, 1.0)
-        graph = {}
-        labels = [n["label"] for n in self.nodes]
-        for l in labels:
-            graph[l] = {}
-        for e in self.edges:
-            u = e["u"]; v = e["v"]
-            w = e["base_weight"] * mult
-            graph[u][v] = w
-            graph[v][u] = w
-
-        dist = {l: float("inf") for l in labels}
-        prev = {l: None for l in labels}
-        dist[start_label] = 0
-        pq = [(0, start_label)]
-        visited = set()
-        steps = []
-        while pq:
-            d,u = heapq.heappop(pq)
-            if u in visited:
-                continue
-            visited.add(u)
-            steps.append(("explore", u, dict(dist), set(visited)))
-            for v,w in graph[u].items():
-                if dist[u] + w < dist[v]:
-                    dist[v] = dist[u] + w
-                    prev[v] = u
-                    heapq.heappush(pq, (dist[v], v))
-                    steps.append(("relax", u, v, dict(dist), set(visited)))
-
-        if dist[end_label] == float("inf"):
+        tiempo, path = self._route(start_label, end_label)
+        if tiempo == INF:
             messagebox.showinfo("Resultado", f"No hay camino desde {start_label} hasta {end_label}")
             return
 
-        tiempo = dist[end_label]
-        path = []
-        cur = end_label
-        while cur is not None:
-            path.insert(0, cur)
-            cur = prev[cur]
-        steps.append(("final", path, dict(dist), set(visited)))
+        trace = self._exploration_trace(start_label, end_label, path)
+        self._show_settled_counts(start_label, end_label)
 
         self.left_cost_var.set(f"Costo del viaje: {tiempo:.1f} minutos")
+        self._travel_cost = tiempo
 
-        total_frames = self._estimate_total_frames_for_path(path)
-        total_move_time_ms = max(1, total_frames * MOVE_STEP_MS)
-
-        self._start_counter_animation(target=tiempo, duration_ms=total_move_time_ms)
+        # se muestrea ya el recorrido para que no haya pausa al terminar la exploración
+        self._prepare_move_frames(path)
 
         self.animating = True
-        self._animate_steps(steps, 0, path)
-
-    def _estimate_total_frames_for_path(self, path_labels):
-        frames = 0
-        for i in range(len(path_labels)-1):
-            a_label = path_labels[i]; b_label = path_labels[i+1]
-            a = self._find_node_by_label(a_label); b = self._find_node_by_label(b_label)
-            ax, ay = self.transform.img_to_canvas(a["ix"], a["iy"])
-            bx, by = self.transform.img_to_canvas(b["ix"], b["iy"])
-            dist_px = math.hypot(bx-ax, by-ay)
-            steps = max(1, int(dist_px / MOVE_STEP_PX))
-            frames += steps
-        return frames
-
-    def _animate_steps(self, steps, idx, final_path):
-        if idx >= len(steps):
-            self.animating = False
-            self._prepare_move_frames(final_path)
-            self._move_frame_idx = 0
-            self._animate_move_frame(final_path[-1] if final_path else None)
-            return
-        step = steps[idx]
-        typ = step[0]
-        if typ == "explore":
-            _, u, dists, visited = step
+        self.renderer.invalidate()
+        self._animate_steps(TraceCursor(trace), path)
+
+    def _route(self, start_label, end_label):
+        # costo y camino salen del preprocesado (tabla de rutas o jerarquía de contracción);
+        # si se cambió algún peso, de los árboles reparados de self.dynamic. Mientras el
+        # preprocesado no termina (o si falló) se busca directo en el grafo: nunca se
+        # espera al hilo de fondo desde el hilo de Tk
+        if self.dynamic.modified:
+            return self.dynamic.route(start_label, end_label, self.selected_mode)
+        router = self.loader.get("rutas") if self.loader.done("rutas") else None
+        if router is None:
+            return shortest_path(start_label, end_label, self.selected_mode, self.graph)
+        return router.route(start_label, end_label, self.selected_mode)
+
+    def _exploration_trace(self, start_label, end_label, path):
+        # la traza solo sirve para animar la exploración; se graba una vez por consulta
+        key = (start_label, end_label, self.selected_mode, self.algorithm)
+        trace = self._trace_cache.get(key)
+        if trace is None:
+            mult = MODE_MULT.get(self.selected_mode, 1.0)
+            src = self.graph.node_id(start_label)
+            if self.algorithm == "bidireccional":
+                src = (src, self.graph.node_id(end_label))
+            trace = StepTrace(self.graph.labels, src)
+            search(self.graph, start_label, end_label, mult, self.algorithm, trace=trace)
+            trace.final(None)
+            self._trace_cache[key] = trace
+        trace.path = path
+        return trace
+
+    def _show_settled_counts(self, start_label, end_label):
+        # nodos asentados por cada algoritmo para la misma consulta (para comparar); las tres
+        # búsquedas se hacen una vez por consulta y se guardan como las trazas
+        cache_key = (start_label, end_label, self.selected_mode)
+        counts = self._settled_cache.get(cache_key)
+        if counts is None:
+            mult = MODE_MULT.get(self.selected_mode, 1.0)
+            counts = {}
+            for key in ALGORITHMS:
+                stats = {}
+                search(self.graph, start_label, end_label, mult, key, stats=stats)
+                counts[key] = stats["settled"]
+            self._settled_cache[cache_key] = counts
+        parts = []
+        for key in ALGORITHMS:
+            mark = "▶ " if key == self.algorithm else ""
+            parts.append(f"{mark}{ALGORITHM_NAMES[key]}: {counts[key]}")
+        self.settled_var.set("Nodos asentados\n" + "\n".join(parts))
+
+    def _animate_steps(self, cursor, final_path):
+        # un paso de la traza cada ANIM_DELAY_MS; si un fotograma llega tarde se salta
+        # directamente al paso que toca (el cursor puede buscar en cualquier posición)
+        total = len(cursor.trace)
+        shown = [-1]
+        def _step(elapsed):
+            idx = min(int(elapsed // ANIM_DELAY_MS), total)
+            if idx >= total:
+                self.animating = False
+                self._prepare_move_frames(final_path)
+                self._animate_move(final_path[-1] if final_path else None)
+                return False
+            if idx != shown[0]:
+                shown[0] = idx
+                self._show_step(cursor, idx)
+            return True
+        self.scheduler.start("pasos", _step)
+
+    def _show_step(self, cursor, idx):
+        typ, u, v = cursor.seek(idx)
+        if typ == EXPLORE:
             self.info_var.set(f"Explorando: {u}")
-            self._update_visual_state(current=u, distances=dists, visited=visited, highlight_edge=None, path=None)
-        elif typ == "relax":
-            _, u, v, dists, visited = step
+            self._update_visual_state(current=u, cursor=cursor, highlight_edge=None, path=None)
+        elif typ == RELAX:
             self.info_var.set(f"Relajando: {u} → {v}")
-            line_id = None
-            for e in self.edges:
-                if (e["u"] == u and e["v"] == v) or (e["u"] == v and e["v"] == u):
-                    line_id = e["line"]
-                    break
-            self._update_visual_state(current=u, distances=dists, visited=visited, highlight_edge=line_id, path=None)
-        elif typ == "final":
-            _, path, dists, visited = step
+            e = self.model.edge(u, v)
+            key = self._edge_key(e) if e else None
+            self._update_visual_state(current=u, cursor=cursor, highlight_edge=key, path=None)
+        elif typ == FINAL:
+            path = cursor.trace.path
             self.info_var.set(f"Camino final: {' → '.join(path)}")
-            self._update_visual_state(current=None, distances=dists, visited=visited, highlight_edge=None, path=path)
-        self.root.after(ANIM_DELAY_MS, lambda: self._animate_steps(steps, idx+1, final_path))
-
-    def _update_visual_state(self, current=None, distances=None, visited=None, highlight_edge=None, path=None):
-        distances = distances or {}
-        visited = visited or set()
-        for n in self.nodes:
-            label = n["label"]
-            cx, cy = self.transform.img_to_canvas(n["ix"], n["iy"])
-            self.canvas.coords(n["oval"], cx - NODE_RADIUS, cy - NODE_RADIUS, cx + NODE_RADIUS, cy + NODE_RADIUS)
-            self.canvas.coords(n["text"], cx, cy)
-            self.canvas.coords(n["dist"], cx + DIST_OFFSET[0], cy + DIST_OFFSET[1])
-            fill = NODE_COLOR
-            if path and label in path:
-                fill = NODE_CURRENT
-            elif label == current:
-                fill = NODE_CURRENT
-            elif label in visited:
-                fill = NODE_VISITED
-            self.canvas.itemconfig(n["oval"], fill=fill)
+            self._update_visual_state(current=None, cursor=cursor, highlight_edge=None, path=path)
+
+    def _update_visual_state(self, current=None, cursor=None, highlight_edge=None, path=None):
+        # solo se repintan los items visibles cuyo estado pudo cambiar desde el fotograma
+        # anterior; los que entran en pantalla toman su estilo al crearse (_sync_viewport)
+        r = self.renderer
+        path_nodes = frozenset(path) if path else frozenset()
+        if path_nodes == r.path_nodes:
+            path_edges = r.path_edges
+        else:
+            edges = (self.model.edge(a, b) for a, b in zip(path[:-1], path[1:])) if path else ()
+            path_edges = frozenset(self._edge_key(e) for e in edges if e)
+
+        if r.full or cursor is None or cursor.changed is None:
+            dirty_nodes = list(self._shown_nodes)
+            dirty_edges = list(self._shown_edges)
+        else:
+            dirty_nodes = {self.graph.labels[i] for i in cursor.changed}
+            dirty_nodes.update((r.current, current))
+            dirty_nodes.update(r.path_nodes ^ path_nodes)
+            dirty_edges = {r.highlight, highlight_edge} | (r.path_edges ^ path_edges)
+
+        r.full = False
+        r.current = current
+        r.highlight = highlight_edge
+        r.path_nodes = path_nodes
+        r.path_edges = path_edges
+        r.cursor = cursor
+
+        for label in dirty_nodes:
+            n = self._shown_nodes.get(label)
+            if n:
+                self._style_node(n)
+        for key in dirty_edges:
+            e = self._shown_edges.get(key)
+            if e:
+                self._style_edge(e)
+
+    # -----------------------------
+    # Capa de distancias (uno a todos, sin animación)
+    # -----------------------------
+    def _show_distance_overlay(self, src_label):
+        # un solo árbol con pesos base (el de self.dynamic, que se repara al cambiar pesos);
+        # el modo solo escala las distancias
+        dist = self.dynamic.tree(src_label).dist
+        mult = MODE_MULT.get(self.selected_mode, 1.0)
+        finite = [d for d in dist if d != INF]
+        far = max(finite) * mult if finite else 0.0
+        r = self.renderer
+        r.invalidate()
+        r.overlay = (src_label, dist, mult, far)
+        r.current = src_label
+        for n in self._shown_nodes.values():
+            self._style_node(n)
+        for e in self._shown_edges.values():
+            self._style_edge(e)
+        r.full = False
+        unreachable = len(dist) - len(finite)
+        msg = f"Distancias desde {src_label} ({self.selected_mode}) — la más lejana: {far:.1f} minutos"
+        if unreachable:
+            msg += f" — {unreachable} sin camino"
+        self.info_var.set(msg)
+
+    def _overlay_color(self, t):
+        t = min(1.0, max(0.0, t))
+        return "#%02x%02x%02x" % tuple(int(a + (b - a) * t) for a, b in zip(OVERLAY_NEAR, OVERLAY_FAR))
+
+    def _style_node(self, n):
+        r = self.renderer
+        label = n["label"]
+        cursor = r.cursor
+        node_id = self.graph.index.get(label)
+        if r.overlay is not None and node_id is not None:
+            _, dist, mult, far = r.overlay
+            d = dist[node_id]
+            fill = NODE_CURRENT if label == r.current else (NODE_COLOR if d == INF else self._overlay_color(d * mult / far if far else 0.0))
+            r.itemconfig(n["oval"], fill=fill)
+            if n["dist"] is not None:
+                r.itemconfig(n["dist"], text="∞" if d == INF else f"{d * mult:.1f}")
+            return
+        fill = NODE_COLOR
+        if label in r.path_nodes or label == r.current:
+            fill = NODE_CURRENT
+        elif cursor and node_id is not None and cursor.is_visited(node_id):
+            fill = NODE_VISITED
+        r.itemconfig(n["oval"], fill=fill)
+        if n["dist"] is not None:
             txt = "∞"
-            if label in distances:
-                v = distances[label]
+            if cursor and node_id is not None:
+                v = cursor.distance(node_id)
                 txt = "∞" if v == float('inf') else f"{v:.1f}"
-            self.canvas.itemconfig(n["dist"], text=txt)
-        for e in self.edges:
-            a = self._find_node_by_label(e["u"]); b = self._find_node_by_label(e["v"])
-            ax, ay = self.transform.img_to_canvas(a["ix"], a["iy"])
-            bx, by = self.transform.img_to_canvas(b["ix"], b["iy"])
-            self.canvas.coords(e["line"], ax, ay, bx, by)
-            mx, my = (ax+bx)/2, (ay+by)/2
-            self.canvas.coords(e["text_id"], mx, my)
-            col = EDGE_COLOR; width = 2
-            if highlight_edge and e["line"] == highlight_edge:
-                col = EDGE_HIGHLIGHT; width = 4
-            if path:
-                pairs = list(zip(path[:-1], path[1:]))
-                if (e["u"], e["v"]) in pairs or (e["v"], e["u"]) in pairs:
-                    col = EDGE_PATH; width = 4
-            self.canvas.itemconfig(e["line"], fill=col, width=width)
-        self.canvas.update()
+            r.itemconfig(n["dist"], text=txt)
+
+    def _style_edge(self, e):
+        r = self.renderer
+        key = self._edge_key(e)
+        col = EDGE_COLOR; width = 2
+        if key == r.highlight:
+            col = EDGE_HIGHLIGHT; width = 4
+        if key in r.path_edges:
+            col = EDGE_PATH; width = 4
+        closed = e["weight"] == INF
+        if closed:
+            col = EDGE_CLOSED; width = 2
+        r.itemconfig(e["line"], fill=col, width=width, dash=(6, 4) if closed else "")
+
+    def _weight_text(self, w):
+        return "✕" if w == INF else f"{w:g}"
 
-    def _prepare_move_frames(self, path_labels):
-        frames = []
-        for i in range(len(path_labels)-1):
-            a_label = path_labels[i]; b_label = path_labels[i+1]
-            a = self._find_node_by_label(a_label); b = self._find_node_by_label(b_label)
-            ax, ay = self.transform.img_to_canvas(a["ix"], a["iy"])
-            bx, by = self.transform.img_to_canvas(b["ix"], b["iy"])
-            dist_px = math.hypot(bx-ax, by-ay)
-            steps = max(1, int(dist_px / MOVE_STEP_PX))
-            for s in range(1, steps+1):
-                t = s / steps
-                nx = ax + (bx-ax) * t
-                ny = ay + (by-ay) * t
-                frames.append((nx, ny))
-            frames.append((bx, by))
-        self._move_frames = frames
-
-    def _animate_move_frame(self, final_label=None):
-        if not self._move_frames or self._move_frame_idx >= len(self._move_frames):
-            self.info_var.set("Movimiento completado — camino mostrado")
-            if final_label:
-                self._pulse_node(final_label)
+    # -----------------------------
+    # Cambios de peso (cierres, clima)
+    # -----------------------------
+    def _set_edge_weight(self, u, v, w):
+        # cambia el peso base de u–v (INF = cerrada): se reparan los árboles de rutas en vez
+        # de recalcularlos y en el canvas solo se tocan la línea y la etiqueta de esa arista
+        self.dynamic.set_weight(u, v, w)
+        self._trace_cache.clear()
+        self._settled_cache.clear()
+        e = self.model.edge(u, v)
+        if e:
+            e["weight"] = w
+            if e["line"] is not None:
+                self._style_edge(e)
+            if e["text_id"] is not None:
+                self.renderer.itemconfig(e["text_id"], text=self._weight_text(w))
+        if self.renderer.overlay is not None:
+            self._show_distance_overlay(self.renderer.overlay[0])
+
+    def _edit_edge_at(self, cx, cy):
+        items = self.canvas.find_overlapping(cx - 4, cy - 4, cx + 4, cy + 4)
+        edge = next((e for e in map(self.model.edge_by_line, reversed(items)) if e), None)
+        if not edge:
+            self.info_var.set("No hay ninguna arista ahí")
             return
-        nx, ny = self._move_frames[self._move_frame_idx]
-        if self.char_img_tk:
-            self.canvas.coords(self.char_canvas_id, nx, ny - NODE_RADIUS - 10)
+        u, v = edge["u"], edge["v"]
+        original = self.dynamic.modified.get(edge["ends"], edge["weight"])
+        answer = simpledialog.askstring(
+            "Peso de arista",
+            f"Nuevo peso para {u} – {v} (actual: {self._weight_text(edge['weight'])}, original: {self._weight_text(original)}).\n"
+            "Escribe 'cerrar' para cerrarla.",
+            parent=self.root)
+        if answer is None or not answer.strip():
+            return
+        answer = answer.strip().lower()
+        if answer in ("cerrar", "x"):
+            w = INF
         else:
-            self.canvas.coords(self.char_canvas_id, nx-8, ny-8, nx+8, ny+8)
-        self._move_frame_idx += 1
-        self.canvas.update()
-        self.root.after(MOVE_STEP_MS, lambda: self._animate_move_frame(final_label))
+            try:
+                w = float(answer.replace(",", "."))
+            except ValueError:
+                w = -1
+            if not w > 0:
+                messagebox.showerror("Peso no válido", "El peso debe ser un número mayor que 0.")
+                return
+        self._set_edge_weight(u, v, w)
+        self.info_var.set(f"Arista {u} – {v}: {'cerrada' if w == INF else f'peso {w:g}'}")
+
+    def _prepare_move_frames(self, path_labels):
+        # muestras en coordenadas de imagen (cacheadas por camino y escala); se pasan a
+        # canvas en cada fotograma, así un resize durante el movimiento no las invalida
+        points = [(n["ix"], n["iy"]) for n in map(self._find_node_by_label, path_labels)]
+        count, samples = self.path_sampler.sample(tuple(path_labels), points, self.transform.scale)
+        self._move_frames = samples
+        return count
+
+    def _animate_move(self, final_label=None):
+        # el contador arranca junto con el movimiento y dura lo mismo, así terminan a la vez
+        frames = self._move_frames
+        count = len(frames)
+        self._start_counter_animation(target=self._travel_cost, duration_ms=max(1, count * MOVE_STEP_MS))
+        def _step(elapsed):
+            idx = int(elapsed // MOVE_STEP_MS)
+            if idx >= count:
+                self.info_var.set("Movimiento completado — camino mostrado")
+                if final_label:
+                    self._pulse_node(final_label)
+                return False
+            self._move_character(*self.transform.img_to_canvas(*frames[idx]))
+            return True
+        self.scheduler.start("movimiento", _step)
 
     # -----------------------------
     # Contador progresivo interno (solo lectura)
     # -----------------------------
     def _start_counter_animation(self, target, duration_ms):
-        if self._counter_after_id:
-            try:
-                self.root.aftercancel(self._counter_after_id)
-            except:
-                pass
-            self._counter_after_id = None
-        self._counter_current = 0.0
-        self._counter_target = float(target)
-        self._counter_duration_ms = max(1, int(duration_ms))
-        self._counter_start_time = None
-        self._counter_update_interval = 30
-        self._counter_tick()
-
-    def _counter_tick(self):
-        import time
-        now = int(round(time.time() * 1000))
-        if self._counter_start_time is None:
-            self._counter_start_time = now
-            elapsed = 0
+        target = float(target)
+        duration_ms = max(1, int(duration_ms))
+        def _step(elapsed):
+            t = min(1.0, elapsed / duration_ms)
+            eased = 1 - (1 - t) * (1 - t)
+            self.info_var.set(f"Contador: {eased * target:.1f} minutos")
+            return t < 1.0
+        self.scheduler.start("contador", _step)
+
+    # -----------------------------
+    # Reloj de animaciones: flush, pausa y velocidad
+    # -----------------------------
+    def _flush_canvas(self):
+        canvas = getattr(self, "canvas", None)
+        if canvas is not None and canvas.winfo_exists():
+            canvas.update_idletasks()
+
+    def _toggle_pause(self, event=None):
+        if self.scheduler.paused:
+            self.scheduler.resume()
         else:
-            elapsed = now - self._counter_start_time
-        t = min(1.0, elapsed / max(1, self._counter_duration_ms))
-        eased = 1 - (1 - t) * (1 - t)
-        value = eased * self._counter_target
-        self._counter_current = value
-        self.info_var.set(f"Contador: {self._counter_current:.1f} minutos")
-        if t >= 1.0:
-            self._counter_after_id = None
-            self.info_var.set(f"Contador: {self._counter_target:.1f} minutos")
-            return
-        self._counter_after_id = self.root.after(self._counter_update_interval, self._counter_tick)
+            self.scheduler.pause()
+
+    def _change_speed(self, factor):
+        self.scheduler.set_speed(min(8.0, max(0.125, self.scheduler.speed * factor)))
 
     # -----------------------------
     # Utilities: reset, volver, fullscreen
     # -----------------------------
     def _reset_edges(self):
-        for e in list(self.edges):
-            try:
-                self.canvas.delete(e["line"])
-                self.canvas.delete(e["text_id"])
-            except:
-                pass
-        self.edges = []
-        edge_font = (self.custom_font_family, 10, "bold") if self.custom_font_family else ("Segoe UI", 10, "bold")
-        for u,v,w in BASE_EDGES:
-            a = self._find_node_by_label(u)
-            b = self._find_node_by_label(v)
-            if a and b:
-                ax, ay = self.transform.img_to_canvas(a["ix"], a["iy"])
-                bx, by = self.transform.img_to_canvas(b["ix"], b["iy"])
-                line = self.canvas.create_line(ax, ay, bx, by, fill=EDGE_COLOR, width=2)
-                mx, my = (ax+bx)/2, (ay+by)/2
-                text_id = self.canvas.create_text(mx, my, text=str(w), fill="yellow", font=edge_font)
-                edge = {"u": u, "v": v, "line": line, "weight": w, "text_id": text_id, "base_weight": w}
-                self.edges.append(edge)
-        self._draw_background()
-        self._update_edge_positions()
+        # solo se restauran las aristas cambiadas y se quita el resaltado de las líneas
+        for a, b in list(self.dynamic.modified):
+            original = self.dynamic.modified[(a, b)]
+            self._set_edge_weight(self.graph.labels[a], self.graph.labels[b], original)
+        r = self.renderer
+        r.highlight = None
+        r.path_edges = frozenset()
+        for e in self._shown_edges.values():
+            self._style_edge(e)
         self.info_var.set("Aristas reiniciadas")
 
     def _back_to_menu(self):
         if messagebox.askyesno("Volver", "¿Volver al menú y elegir otro modo?"):
+            self.scheduler.cancel_all()
             for w in self.root.winfo_children():
                 w.destroy()
             self.selected_mode = None
@@ -854,17 +1275,8 @@ class DijkstraApp:
         self.fullscreen = not self.fullscreen
         self.root.attributes("-fullscreen", self.fullscreen)
         try:
-            canvas_w = max(1, self.canvas.winfo_width())
-            canvas_h = max(1, self.canvas.winfo_height())
-            scale_x = canvas_w / self.img_w
-            scale_y = canvas_h / self.img_h
-            scale = min(scale_x, scale_y)
-            self.transform.scale = scale
-            self.transform.offset_x = (canvas_w - self.img_w * scale) / 2
-            self.transform.offset_y = (canvas_h - self.img_h * scale) / 2
-            self._draw_background()
-            self._update_node_positions()
-            self._update_edge_positions()
+            self.transform.fit(max(1, self.canvas.winfo_width()), max(1, self.canvas.winfo_height()), self.img_w, self.img_h)
+            self._on_view_changed()
             self._create_hud_title()
             self._place_hud_widgets()
         except Exception:
@@ -874,17 +1286,8 @@ class DijkstraApp:
         self.fullscreen = False
         self.root.attributes("-fullscreen", False)
         try:
-            canvas_w = max(1, self.canvas.winfo_width())
-            canvas_h = max(1, self.canvas.winfo_height())
-            scale_x = canvas_w / self.img_w
-            scale_y = canvas_h / self.img_h
-            scale = min(scale_x, scale_y)
-            self.transform.scale = scale
-            self.transform.offset_x = (canvas_w - self.img_w * scale) / 2
-            self.transform.offset_y = (canvas_h - self.img_h * scale) / 2
-            self._draw_background()
-            self._update_node_positions()
-            self._update_edge_positions()
+            self.transform.fit(max(1, self.canvas.winfo_width()), max(1, self.canvas.winfo_height()), self.img_w, self.img_h)
+            self._on_view_changed()
             self._create_hud_title()
             self._place_hud_widgets()
         except Exception:
@@ -919,6 +1322,48 @@ class DijkstraApp:
 
         tk.Label(self.hud_frame, text="Viaje por Hyrule", bg="#012428", fg="white", font=font_title).pack(anchor="w", padx=8, pady=(6,2))
         tk.Label(self.hud_frame, textvariable=self.info_var, bg="#012428", fg="white", font=font_small, wraplength=300, justify="left").pack(anchor="w", padx=8, pady=(0,6))
+        self.perf_label = tk.Label(self.hud_frame, textvariable=self.perf_var, bg="#012428", fg="#87F5FF", font=("Consolas", 9), justify="left")
+        if self.profiler.enabled:
+            self.perf_label.pack(anchor="w", padx=8, pady=(0,6))
+
+    # -----------------------------
+    # HUD de rendimiento (F3)
+    # -----------------------------
+    def _toggle_perf_hud(self, event=None):
+        if self._perf_after_id:
+            try:
+                self.root.after_cancel(self._perf_after_id)
+            except Exception:
+                pass
+            self._perf_after_id = None
+        if self.profiler.toggle():
+            self.perf_var.set("midiendo...")
+            self._perf_after_id = self.root.after(PERF_HUD_MS, self._refresh_perf_hud)
+        if self.perf_label is not None and self.perf_label.winfo_exists():
+            if self.profiler.enabled:
+                self.perf_label.pack(anchor="w", padx=8, pady=(0,6))
+            else:
+                self.perf_label.pack_forget()
+
+    def _refresh_perf_hud(self):
+        self._perf_after_id = None
+        if not self.profiler.enabled:
+            return
+        lines = []
+        canvas = getattr(self, "canvas", None)
+        try:
+            if canvas is not None and canvas.winfo_exists():
+                items = len(canvas.find_all())
+                lines.append(f"items canvas: {items} (nodos {len(self._shown_nodes)}, aristas {len(self._shown_edges)})")
+                self.profiler.record("items", "canvas", count=items, nodes=len(self._shown_nodes), edges=len(self._shown_edges))
+        except tk.TclError:
+            pass
+        report = self.profiler.report()
+        if report:
+            lines.append(report)
+        self.perf_var.set("\n".join(lines))
+        self.profiler.flush()
+        self._perf_after_id = self.root.after(PERF_HUD_MS, self._refresh_perf_hud)
 
     # -----------------------------
     # Pulso final sobre nodo
@@ -927,14 +1372,16 @@ class DijkstraApp:
         node = self._find_node_by_label(node_label)
         if not node: return
         orig_width = 2
-        def _pulse_once(i=0, growing=True):
-            w = 6 if growing else orig_width
-            self.canvas.itemconfig(node["oval"], width=w)
-            if i >= pulses*2 - 1:
+        def _step(elapsed):
+            i = int(elapsed // PULSE_STEP_MS)
+            if node["oval"] is None:
+                return False  # el nodo salió de la pantalla
+            if i >= pulses*2:
                 self.canvas.itemconfig(node["oval"], width=orig_width)
-                return
-            self.root.after(120, lambda: _pulse_once(i+1, not growing))
-        _pulse_once(0, True)
+                return False
+            self.canvas.itemconfig(node["oval"], width=6 if i % 2 == 0 else orig_width)
+            return True
+        self.scheduler.start("pulso", _step)
 
 # -----------------------------
 # Run app
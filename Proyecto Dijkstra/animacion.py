@@ -0,0 +1,88 @@
+import time
+
+# -----------------------------
+# Reloj único de animaciones
+# -----------------------------
+class FrameScheduler:
+    """
+    Un solo bucle root.after a ritmo de pantalla para todas las animaciones. Cada
+    animación es una función step(elapsed_ms) que dibuja su estado para el tiempo
+    transcurrido y devuelve False al terminar; así todas avanzan con el mismo reloj de
+    pared aunque un fotograma llegue tarde. Tras llamar a todas se hace un único flush
+    (p. ej. canvas.update_idletasks) por fotograma.
+    speed multiplica el tiempo de todas; cada animación puede tener además la suya.
+    """
+    def __init__(self, root, fps=60, flush=None):
+        self.root = root
+        self.interval_ms = max(1, int(1000 / fps))
+        self.flush = flush
+        self.speed = 1.0
+        self.paused = False
+        self._anims = {}
+        self._after_id = None
+        self._ticking = False
+        self._last = None
+
+    def start(self, name, step, speed=1.0):
+        """Arranca (o reemplaza) la animación `name`; step(0) se dibuja en el próximo fotograma."""
+        self._anims[name] = {"step": step, "elapsed": 0.0, "speed": speed, "fresh": True}
+        self._ensure_running()
+
+    def cancel(self, name):
+        self._anims.pop(name, None)
+
+    def cancel_all(self):
+        self._anims.clear()
+        if self._after_id:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._last = None
+
+    def running(self, name):
+        return name in self._anims
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def set_speed(self, speed, name=None):
+        if name is None:
+            self.speed = max(0.0, speed)
+        elif name in self._anims:
+            self._anims[name]["speed"] = max(0.0, speed)
+
+    def _ensure_running(self):
+        if self._after_id is None and not self._ticking:
+            self._last = time.perf_counter()
+            self._after_id = self.root.after(0, self._tick)
+
+    def _tick(self):
+        self._after_id = None
+        self._ticking = True
+        now = time.perf_counter()
+        dt = (now - self._last) * 1000.0
+        self._last = now
+        if self.paused:
+            dt = 0.0
+        for name, anim in list(self._anims.items()):
+            if self._anims.get(name) is not anim:
+                continue  # cancelada o reemplazada por otra animación en este fotograma
+            if anim["fresh"]:
+                anim["fresh"] = False
+            else:
+                anim["elapsed"] += dt * self.speed * anim["speed"]
+            if not anim["step"](anim["elapsed"]) and self._anims.get(name) is anim:
+                del self._anims[name]
+        if self.flush:
+            try:
+                self.flush()
+            except Exception:
+                pass
+        self._ticking = False
+        if self._anims:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
@@ -0,0 +1,320 @@
+import os
+import sys
+import csv
+import json
+import mmap
+import struct
+from array import array
+
+from grafo import Graph
+
+MAGIC = b"GRAF"
+FORMAT_VERSION = 1
+# magic, versión, nodos, entradas CSR (2 por arista), bytes de la tabla de etiquetas
+_HEADER = struct.Struct("<4sIQQQ")
+
+# -----------------------------
+# Formato binario del mapa
+# -----------------------------
+# Cabecera y después, alineadas a 8 bytes y en little-endian:
+#   coords        float64[2n]   (ix, iy) por nodo
+#   offsets       int64[n+1]    vecinos de u en targets[offsets[u]:offsets[u+1]]
+#   targets       int32[m]
+#   weights       float64[m]
+#   label_offsets int64[n+1]    etiqueta de u en labels[label_offsets[u]:label_offsets[u+1]]
+#   label_order   int32[n]      ids ordenados por etiqueta (búsqueda binaria sin diccionario)
+#   labels        utf-8
+def _layout(n, m, label_bytes):
+    """Desplazamiento de cada sección y tamaño total del archivo."""
+    sections = (("coords", 16 * n), ("offsets", 8 * (n + 1)), ("targets", 4 * m), ("weights", 8 * m),
+                ("label_offsets", 8 * (n + 1)), ("label_order", 4 * n), ("labels", label_bytes))
+    pos = _HEADER.size
+    layout = {}
+    for name, size in sections:
+        pos = (pos + 7) & ~7
+        layout[name] = (pos, size)
+        pos += size
+    return layout, pos
+
+
+_TYPECODES = {"coords": "d", "offsets": "q", "targets": "i", "weights": "d",
+              "label_offsets": "q", "label_order": "i", "labels": "B"}
+
+
+def _views(buf, layout):
+    """memoryviews tipados sobre cada sección (sin copiar)."""
+    mv = memoryview(buf)
+    views = {}
+    for name, (pos, size) in layout.items():
+        view = mv[pos:pos + size]
+        if sys.byteorder != "little" and _TYPECODES[name] != "B":
+            # en máquinas big-endian se copia y se invierte; el resto del código no cambia
+            arr = array(_TYPECODES[name], view.tobytes())
+            arr.byteswap()
+            views[name] = arr
+        else:
+            views[name] = view.cast(_TYPECODES[name])
+    return views
+
+
+class StringTable:
+    """Secuencia de etiquetas leída bajo demanda de la tabla de strings del archivo."""
+    def __init__(self, data, offsets, order):
+        self._data = data
+        self._offsets = offsets
+        self._order = order
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return bytes(self._data[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def _raw(self, i):
+        return bytes(self._data[self._offsets[i]:self._offsets[i + 1]])
+
+    def find(self, label):
+        """Id de la etiqueta (búsqueda binaria en label_order) o -1."""
+        key = label.encode("utf-8")
+        order = self._order
+        lo, hi = 0, len(order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._raw(order[mid]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(order) and self._raw(order[lo]) == key:
+            return order[lo]
+        return -1
+
+
+class _LabelIndex:
+    """Vista etiqueta -> id con la interfaz de dict que usa Graph.index."""
+    def __init__(self, table):
+        self._table = table
+
+    def get(self, label, default=None):
+        i = self._table.find(label)
+        return default if i < 0 else i
+
+    def __getitem__(self, label):
+        i = self._table.find(label)
+        if i < 0:
+            raise KeyError(label)
+        return i
+
+    def __contains__(self, label):
+        return self._table.find(label) >= 0
+
+    def __len__(self):
+        return len(self._table)
+
+
+class _Pairs:
+    """coords[i] -> (ix, iy) sobre el array plano de coordenadas."""
+    def __init__(self, flat):
+        self._flat = flat
+
+    def __len__(self):
+        return len(self._flat) // 2
+
+    def __getitem__(self, i):
+        return self._flat[2 * i], self._flat[2 * i + 1]
+
+    def __iter__(self):
+        flat = self._flat
+        for i in range(0, len(flat), 2):
+            yield flat[i], flat[i + 1]
+
+
+class MappedGraph(Graph):
+    """
+    Graph leído de un archivo .grafo con mmap: las listas CSR, las coordenadas y las
+    etiquetas son vistas sobre el archivo, así que abrirlo no depende del tamaño del mapa
+    y el sistema solo carga las páginas que se usan.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n, m, label_bytes = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self._mm.close()
+            raise ValueError(f"Archivo de mapa no válido: {path}")
+        layout, size = _layout(n, m, label_bytes)
+        if len(self._mm) < size:
+            self._mm.close()
+            raise ValueError(f"Archivo de mapa truncado: {path}")
+        v = _views(self._mm, layout)
+        self.labels = StringTable(v["labels"], v["label_offsets"], v["label_order"])
+        self.coords = _Pairs(v["coords"])
+        self.offsets = v["offsets"]
+        self.targets = v["targets"]
+        self.weights = v["weights"]
+        self._scaled = {}
+        self._cost_per_px = None
+
+    @property
+    def index(self):
+        return _LabelIndex(self.labels)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def node_id(self, label):
+        i = self.labels.find(label)
+        if i < 0:
+            raise ValueError(f"Nodo desconocido: {label}")
+        return i
+
+    def _writable_weights(self):
+        # el archivo se abre de solo lectura: al primer cambio de peso se copian a memoria
+        if isinstance(self.weights, memoryview):
+            self.weights = array("d", self.weights)
+        return self.weights
+
+    def scaled_weights(self, mult):
+        if mult == 1.0:
+            return self.weights
+        ws = self._scaled.get(mult)
+        if ws is None:
+            ws = array("d", (w * mult for w in self.weights))
+            self._scaled[mult] = ws
+        return ws
+
+
+def open_graph(path):
+    return MappedGraph(path)
+
+
+# -----------------------------
+# Importador en streaming (CSV / JSON)
+# -----------------------------
+def _rows(path, fields):
+    """
+    Filas (tuplas con `fields`) de un CSV, JSON Lines (.jsonl/.ndjson) o JSON (.json,
+    lista de objetos o de listas). CSV y JSON Lines se leen línea a línea; el CSV puede
+    tener cabecera.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson", ".json"):
+        with open(path, encoding="utf-8") as f:
+            if ext == ".json":
+                items = json.load(f)
+            else:
+                items = (json.loads(line) for line in f if line.strip())
+            for item in items:
+                if isinstance(item, dict):
+                    yield tuple(item[k] for k in fields)
+                else:
+                    yield tuple(item[:len(fields)])
+        return
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        first = True
+        for row in reader:
+            if not row or row[0].startswith("#"):
+                continue
+            if first:
+                first = False
+                if [c.strip().lower() for c in row[:len(fields)]] == list(fields):
+                    continue
+            yield tuple(c.strip() for c in row[:len(fields)])
+
+
+def import_graph(nodes_path, edges_path, out_path):
+    """
+    Convierte una lista de nodos (label, x, y) y una de aristas (u, v, w) al formato
+    binario. Las aristas se leen dos veces en streaming (grados y luego colocación) y se
+    escriben directamente en el archivo mapeado, sin listas intermedias por arista.
+    Devuelve (nodos, aristas).
+    """
+    if sys.byteorder != "little":
+        raise ValueError("El importador de mapas necesita una máquina little-endian")
+    index = {}
+    coords = array("d")
+    for label, x, y in _rows(nodes_path, ("label", "x", "y")):
+        label = str(label)
+        if label in index:
+            raise ValueError(f"Nodo repetido: {label}")
+        index[label] = len(index)
+        coords.append(float(x)); coords.append(float(y))
+    n = len(index)
+
+    def node(label):
+        try:
+            return index[str(label)]
+        except KeyError:
+            raise ValueError(f"Arista con nodo desconocido: {label}") from None
+
+    degree = array("q", [0]) * n
+    edges = 0
+    for u, v, _ in _rows(edges_path, ("u", "v", "w")):
+        degree[node(u)] += 1
+        degree[node(v)] += 1
+        edges += 1
+    m = 2 * edges
+
+    labels = [label.encode("utf-8") for label in index]
+    label_bytes = sum(len(b) for b in labels)
+    layout, size = _layout(n, m, label_bytes)
+
+    tmp = out_path + ".tmp"
+    with open(tmp, "w+b") as f:
+        f.truncate(size)
+        with mmap.mmap(f.fileno(), size) as mm:
+            _HEADER.pack_into(mm, 0, MAGIC, FORMAT_VERSION, n, m, label_bytes)
+            sec = _views(mm, layout)
+            sec["coords"][:] = coords
+            offsets = sec["offsets"]
+            pos = 0
+            for u in range(n):
+                offsets[u] = pos
+                pos += degree[u]
+            offsets[n] = pos
+            cursor = degree  # se reutiliza como posición de escritura de cada nodo
+            for u in range(n):
+                cursor[u] = offsets[u]
+            targets = sec["targets"]; weights = sec["weights"]
+            for u, v, w in _rows(edges_path, ("u", "v", "w")):
+                a = node(u); b = node(v); w = float(w)
+                targets[cursor[a]] = b; weights[cursor[a]] = w; cursor[a] += 1
+                targets[cursor[b]] = a; weights[cursor[b]] = w; cursor[b] += 1
+            label_offsets = sec["label_offsets"]; data = sec["labels"]
+            pos = 0
+            for i, b in enumerate(labels):
+                label_offsets[i] = pos
+                data[pos:pos + len(b)] = b
+                pos += len(b)
+            label_offsets[n] = pos
+            sec["label_order"][:] = array("i", sorted(range(n), key=labels.__getitem__))
+            # las vistas deben soltarse antes de cerrar el mmap
+            del sec, offsets, targets, weights, label_offsets, data
+            mm.flush()
+    os.replace(tmp, out_path)
+    return n, edges
+
+
+def load_map(nodes_path, edges_path, graph_path):
+    """
+    Grafo del mapa: abre graph_path si está al día con las listas de origen; si no
+    existe o es más viejo, lo regenera desde ellas. None si no hay listas ni archivo.
+    """
+    sources = [p for p in (nodes_path, edges_path) if os.path.exists(p)]
+    if len(sources) == 2:
+        try:
+            fresh = os.path.getmtime(graph_path) >= max(os.path.getmtime(p) for p in sources)
+        except OSError:
+            fresh = False
+        if not fresh:
+            import_graph(nodes_path, edges_path, graph_path)
+    if os.path.exists(graph_path):
+        return open_graph(graph_path)
+    return None
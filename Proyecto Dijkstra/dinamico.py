@@ -0,0 +1,158 @@
+import heapq
+from collections import OrderedDict
+
+from grafo import MODE_MULT, INF, dijkstra
+
+# -----------------------------
+# Árbol de caminos mínimos reparable
+# -----------------------------
+class ShortestPathTree:
+    """
+    Árbol de caminos mínimos desde un origen (pesos base) que se repara al cambiar el
+    peso de una arista en vez de recalcularse:
+    - si la arista baja, se propaga la mejora desde sus extremos;
+    - si sube (o se cierra) y era del árbol, solo se recalcula el subárbol que colgaba
+      de ella, partiendo de sus vecinos no afectados.
+    """
+    def __init__(self, graph, src):
+        self.graph = graph
+        self.src = graph.node_id(src)
+        self.dist, self.prev = dijkstra(graph, src)
+
+    def update_edge(self, a, b, old, new):
+        """Repara el árbol tras cambiar el peso de la arista a–b (ids). Devuelve los ids cuya distancia cambió."""
+        dist = self.dist; prev = self.prev
+        if new < old:
+            seeds = []
+            for x, y in ((a, b), (b, a)):
+                nd = dist[x] + new
+                if nd < dist[y]:
+                    dist[y] = nd
+                    prev[y] = x
+                    seeds.append((nd, y))
+            return self._propagate(seeds)
+        changed = set()
+        if new > old:
+            for x, y in ((a, b), (b, a)):
+                if prev[y] == x:
+                    changed |= self._repair_subtree(y)
+        return changed
+
+    def _propagate(self, seeds):
+        # Dijkstra desde los nodos que mejoraron; solo avanza mientras haya mejoras
+        g = self.graph
+        offsets = g.offsets; targets = g.targets; weights = g.weights
+        dist = self.dist; prev = self.prev
+        changed = {v for _, v in seeds}
+        heapq.heapify(seeds)
+        while seeds:
+            d, u = heapq.heappop(seeds)
+            if d > dist[u]:
+                continue
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                nd = d + weights[k]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    prev[v] = u
+                    changed.add(v)
+                    heapq.heappush(seeds, (nd, v))
+        return changed
+
+    def _repair_subtree(self, root):
+        g = self.graph
+        offsets = g.offsets; targets = g.targets; weights = g.weights
+        dist = self.dist; prev = self.prev
+        # los hijos de u en el árbol son vecinos suyos con prev == u: el subárbol se
+        # recorre por las filas CSR de sus propios nodos, sin mirar el resto del grafo
+        affected = [root]
+        aff = {root}
+        for u in affected:
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                if prev[v] == u and v not in aff:
+                    aff.add(v)
+                    affected.append(v)
+        old = {v: dist[v] for v in affected}
+        for v in affected:
+            dist[v] = INF
+            prev[v] = -1
+        # cada nodo afectado parte del mejor vecino que conserva su distancia
+        seeds = []
+        for v in affected:
+            for k in range(offsets[v], offsets[v + 1]):
+                x = targets[k]
+                if x not in aff:
+                    nd = dist[x] + weights[k]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        prev[v] = x
+            if dist[v] < INF:
+                seeds.append((dist[v], v))
+        self._propagate(seeds)
+        return {v for v in affected if dist[v] != old[v]}
+
+    def path(self, dst_id):
+        """Lista de etiquetas desde el origen hasta dst_id ([] si no hay camino)."""
+        if self.dist[dst_id] == INF:
+            return []
+        labels = self.graph.labels
+        path = []
+        cur = dst_id
+        while cur != -1:
+            path.append(labels[cur])
+            cur = self.prev[cur]
+        path.reverse()
+        return path
+
+
+# -----------------------------
+# Rutas con pesos cambiantes
+# -----------------------------
+class DynamicRoutes:
+    """
+    Rutas sobre un grafo cuyos pesos cambian (cierres, clima). Guarda un árbol por
+    origen consultado (LRU) y los repara en cada set_weight. modified tiene las aristas
+    que difieren de su peso original, así se sabe si las tablas precalculadas siguen
+    valiendo.
+    """
+    def __init__(self, graph, max_trees=32):
+        self.graph = graph
+        self.max_trees = max_trees
+        self.modified = {}  # (id menor, id mayor) -> peso original
+        self._trees = OrderedDict()
+
+    def tree(self, src):
+        t = self._trees.get(src)
+        if t is None:
+            t = ShortestPathTree(self.graph, src)
+            self._trees[src] = t
+            while len(self._trees) > self.max_trees:
+                self._trees.popitem(last=False)
+        else:
+            self._trees.move_to_end(src)
+        return t
+
+    def set_weight(self, u, v, w):
+        """
+        Cambia el peso base de la arista u–v (INF = cerrada) y repara los árboles
+        guardados. Devuelve {origen: ids con distancia nueva}.
+        """
+        a = self.graph.node_id(u); b = self.graph.node_id(v)
+        old = self.graph.set_weight(u, v, w)
+        key = (min(a, b), max(a, b))
+        original = self.modified.get(key, old)
+        if w == original:
+            self.modified.pop(key, None)
+        else:
+            self.modified[key] = original
+        return {src: t.update_edge(a, b, old, w) for src, t in self._trees.items()}
+
+    def route(self, src, dst, mode="pie"):
+        """(costo, camino) igual que RouteTable.route; (inf, []) si no hay camino."""
+        t = self.tree(src)
+        d = self.graph.node_id(dst)
+        cost = t.dist[d]
+        if cost == INF:
+            return INF, []
+        return cost * MODE_MULT.get(mode, 1.0), t.path(d)
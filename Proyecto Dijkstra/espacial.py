@@ -0,0 +1,98 @@
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    NUMPY_AVAILABLE = False
+
+# -----------------------------
+# Índice espacial (rejilla uniforme en coordenadas de imagen)
+# -----------------------------
+class PackedGrid:
+    """
+    Rejilla de solo lectura para puntos identificados por enteros (ids del grafo). En
+    vez de listas por celda guarda los ids ordenados por celda en arrays planos, así un
+    mapa grande no crea un objeto por punto: cada columna de celdas queda contigua y
+    consultar un rectángulo son dos búsquedas binarias por columna. Se arma de una vez
+    con build() (vectorizado con numpy si está instalado).
+    """
+    def __init__(self, cell=64):
+        self.cell = float(cell)
+        self.clear()
+
+    def __len__(self):
+        return len(self.order)
+
+    def clear(self):
+        self.keys = array("q")         # clave de cada celda no vacía, ordenadas
+        self.starts = array("q", [0])  # ids de la celda keys[i] en order[starts[i]:starts[i+1]]
+        self.order = array("q")
+        self._gx0 = self._gy0 = 0
+        self._gx1 = self._gy1 = -1
+        self._rows = 1
+
+    def build(self, xs, ys, ids):
+        """Indexa ids[i] en (xs[i], ys[i]); las tres secuencias (o arrays de numpy) del mismo largo."""
+        self.clear()
+        if not len(ids):
+            return
+        if NUMPY_AVAILABLE:
+            gx = np.floor(np.asarray(xs, dtype=np.float64) / self.cell).astype(np.int64)
+            gy = np.floor(np.asarray(ys, dtype=np.float64) / self.cell).astype(np.int64)
+            self._gx0, self._gx1 = int(gx.min()), int(gx.max())
+            self._gy0, self._gy1 = int(gy.min()), int(gy.max())
+            self._rows = self._gy1 - self._gy0 + 1
+            keys = (gx - self._gx0) * self._rows + (gy - self._gy0)
+            perm = np.argsort(keys, kind="stable")
+            keys = keys[perm]
+            uniq, first = np.unique(keys, return_index=True)
+            self.keys.frombytes(uniq.astype(np.int64).tobytes())
+            self.starts = array("q", first.astype(np.int64).tobytes())
+            self.starts.append(len(keys))
+            self.order.frombytes(np.asarray(ids, dtype=np.int64)[perm].tobytes())
+            return
+        cell = self.cell
+        cells = [(math.floor(x / cell), math.floor(y / cell), i) for x, y, i in zip(xs, ys, ids)]
+        self._gx0 = min(c[0] for c in cells); self._gx1 = max(c[0] for c in cells)
+        self._gy0 = min(c[1] for c in cells); self._gy1 = max(c[1] for c in cells)
+        self._rows = self._gy1 - self._gy0 + 1
+        keyed = sorted(((gx - self._gx0) * self._rows + (gy - self._gy0), i) for gx, gy, i in cells)
+        del cells
+        self.starts = array("q")
+        last = None
+        for pos, (key, i) in enumerate(keyed):
+            if key != last:
+                self.keys.append(key)
+                self.starts.append(pos)
+                last = key
+            self.order.append(i)
+        self.starts.append(len(keyed))
+
+    def ranges(self, x0, y0, x1, y1):
+        """Tramos (inicio, fin) de order con los ids de las celdas que toca el rectángulo."""
+        if not self.order:
+            return
+        c = self.cell
+        gx0 = max(self._gx0, math.floor(x0 / c)); gx1 = min(self._gx1, math.floor(x1 / c))
+        gy0 = max(self._gy0, math.floor(y0 / c)); gy1 = min(self._gy1, math.floor(y1 / c))
+        if gx0 > gx1 or gy0 > gy1:
+            return
+        keys = self.keys; starts = self.starts
+        for gx in range(gx0, gx1 + 1):
+            base = (gx - self._gx0) * self._rows - self._gy0
+            i0 = bisect_left(keys, base + gy0)
+            i1 = bisect_right(keys, base + gy1)
+            if i0 < i1:
+                yield starts[i0], starts[i1]
+
+    def in_rect(self, x0, y0, x1, y1):
+        """
+        Ids de las celdas que toca el rectángulo [x0, x1] x [y0, y1]. Son candidatos: la
+        prueba exacta la hace quien consulta. Es un generador, así se puede cortar antes.
+        """
+        order = self.order
+        for a, b in self.ranges(x0, y0, x1, y1):
+            yield from order[a:b]
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+# -----------------------------
+# Caché del fondo (pirámide + LRU de PhotoImage)
+# -----------------------------
+class BackgroundCache:
+    """
+    Guarda la imagen del mapa a varias resoluciones (cada nivel la mitad del anterior)
+    y un LRU de PhotoImage por tamaño final. Escalar siempre parte del nivel más pequeño
+    que sigue siendo >= al tamaño pedido, así que nunca se re-escala el original completo.
+    preview=True usa BILINEAR (barato, para mientras se arrastra la ventana); el resto
+    usa LANCZOS y queda en el LRU, por lo que volver a un tamaño ya visto no cuesta nada.
+    Con zoom se pide solo la zona visible (box, en coordenadas del original).
+    """
+    def __init__(self, img, max_items=6, min_level_size=256):
+        self.max_items = max_items
+        self.pyramid = [img]
+        while min(self.pyramid[-1].size) // 2 >= min_level_size:
+            self.pyramid.append(self.pyramid[-1].reduce(2))
+        self._photos = OrderedDict()
+
+    def _source_for(self, w, h):
+        src = self.pyramid[0]
+        for level in self.pyramid[1:]:
+            lw, lh = level.size
+            if lw < w or lh < h:
+                break
+            src = level
+        return src
+
+    def cached(self, w, h, box=None):
+        key = (w, h, box)
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+        return photo
+
+    def photo(self, w, h, preview=False, box=None):
+        w = max(1, int(w)); h = max(1, int(h))
+        photo = self.cached(w, h, box)
+        if photo is not None:
+            return photo
+        if box is None:
+            src = self._source_for(w, h)
+            region = None
+        else:
+            # tamaño que tendría el mapa entero a esta escala, para elegir el nivel
+            full_w, full_h = self.pyramid[0].size
+            x0, y0, x1, y1 = box
+            src = self._source_for(w * full_w / max(1e-9, x1 - x0), h * full_h / max(1e-9, y1 - y0))
+            f = src.size[0] / full_w
+            region = (x0 * f, y0 * f, x1 * f, y1 * f)
+        if preview:
+            return ImageTk.PhotoImage(src.resize((w, h), Image.BILINEAR, box=region))
+        photo = ImageTk.PhotoImage(src.resize((w, h), Image.LANCZOS, box=region))
+        self._photos[(w, h, box)] = photo
+        while len(self._photos) > self.max_items:
+            self._photos.popitem(last=False)
+        return photo
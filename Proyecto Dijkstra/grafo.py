@@ -0,0 +1,402 @@
+import copy
+import heapq
+import math
+
+# -----------------------------
+# DATOS DEL MAPA
+# -----------------------------
+MODE_MULT = {
+    "pie": 1.5,
+    "paravela": 1.1,
+    "caballo": 0.8
+}
+
+FIXED_NODES = [
+    ("Torre 1", 236, 335),  ("Torre 2", 390, 230),  ("Torre 3", 430, 360),
+    ("Torre 4", 707, 275),  ("Torre 5", 840, 280), ("Torre 6", 1086, 107),("Torre 7", 650, 435),
+    ("Torre 8", 960, 285), ("Torre 9", 850, 430), ("Torre 10", 530, 483),
+    ("Torre 11", 230, 625),("Torre 12", 380, 693),("Torre 13", 550, 620),
+    ("Torre 14", 610, 750),("Torre 15", 720, 620),("Torre 16", 760, 780),
+    ("Torre 17", 900, 676),("Torre 18", 1005, 658)
+]
+
+BASE_EDGES = [
+    ("Torre 1","Torre 2",10),("Torre 1","Torre 3",12),("Torre 3","Torre 2",8),("Torre 3","Torre 4",18),("Torre 4","Torre 9",12),("Torre 9","Torre 5",8),
+    ("Torre 9","Torre 8",7),("Torre 8","Torre 6",9),("Torre 5","Torre 6",15),("Torre 4","Torre 7",9),("Torre 3","Torre 10",8),("Torre 11","Torre 1",25),
+    ("Torre 10","Torre 7",5),("Torre 10","Torre 13",6),("Torre 7","Torre 15",7),("Torre 13","Torre 15",8),("Torre 15","Torre 17",9),
+    ("Torre 17","Torre 18",5),("Torre 17","Torre 16",7),("Torre 14","Torre 16",6),("Torre 14","Torre 13",10),("Torre 15","Torre 16",7),("Torre 13","Torre 12",9),("Torre 12","Torre 11",15)
+]
+
+INF = float("inf")
+
+# -----------------------------
+# Grafo compacto (listas de adyacencia planas, estilo CSR)
+# -----------------------------
+class Graph:
+    """
+    Grafo no dirigido con los vecinos de cada nodo guardados en listas planas:
+    los vecinos del nodo i están en targets[offsets[i]:offsets[i+1]].
+    Los nodos se identifican por índice; labels/index traducen desde/hacia etiquetas.
+    """
+    def __init__(self, nodes, edges):
+        self.labels = [label for label, _, _ in nodes]
+        self.coords = [(ix, iy) for _, ix, iy in nodes]
+        self.index = {label: i for i, label in enumerate(self.labels)}
+
+        adj = [[] for _ in self.labels]
+        for u, v, w in edges:
+            a = self.index[u]; b = self.index[v]
+            adj[a].append((b, w))
+            adj[b].append((a, w))
+
+        self.offsets = [0]
+        self.targets = []
+        self.weights = []
+        for neigh in adj:
+            for b, w in neigh:
+                self.targets.append(b)
+                self.weights.append(w)
+            self.offsets.append(len(self.targets))
+
+        self._scaled = {}
+        self._cost_per_px = None
+
+    def __len__(self):
+        return len(self.labels)
+
+    def node_id(self, label):
+        try:
+            return self.index[label]
+        except KeyError:
+            raise ValueError(f"Nodo desconocido: {label}") from None
+
+    def edge_list(self):
+        """(etiqueta u, etiqueta v, peso) una vez por arista no dirigida."""
+        labels = self.labels
+        for u in range(len(self)):
+            for k in range(self.offsets[u], self.offsets[u + 1]):
+                v = self.targets[k]
+                if u < v:
+                    yield labels[u], labels[v], self.weights[k]
+
+    def set_weight(self, u, v, w):
+        """
+        Cambia el peso de la arista u–v (en ambos sentidos; INF = cerrada) y devuelve el
+        peso anterior. Si hay aristas paralelas se cambian todas.
+        """
+        a = self.node_id(u); b = self.node_id(v)
+        weights = self._writable_weights()
+        old = None
+        for x, y in ((a, b), (b, a)):
+            for k in range(self.offsets[x], self.offsets[x + 1]):
+                if self.targets[k] == y:
+                    old = weights[k] if old is None else min(old, weights[k])
+                    weights[k] = w
+        if old is None:
+            raise ValueError(f"No existe la arista {u} – {v}")
+        # los pesos escalados y la cota de A* dependen de los pesos
+        self._scaled.clear()
+        self._cost_per_px = None
+        return old
+
+    def _writable_weights(self):
+        return self.weights
+
+    def snapshot(self):
+        """
+        Copia con pesos propios (nodos y listas CSR compartidos): lo que se calcule sobre
+        ella en otro hilo no ve los cambios de peso que se hagan mientras tanto.
+        """
+        g = copy.copy(self)
+        g.weights = self.weights[:]  # en un mmap es una vista de solo lectura: no cambia
+        g._scaled = {}
+        g._cost_per_px = None
+        return g
+
+    def scaled_weights(self, mult):
+        # pesos multiplicados por el factor del modo, calculados una sola vez por factor
+        ws = self._scaled.get(mult)
+        if ws is None:
+            ws = [w * mult for w in self.weights]
+            self._scaled[mult] = ws
+        return ws
+
+    def cost_per_px(self):
+        """
+        Cota inferior calibrada de minutos por píxel: el menor peso/longitud de todas las
+        aristas. Con ella la distancia en línea recta nunca sobreestima el costo real.
+        """
+        if self._cost_per_px is None:
+            best = INF
+            coords = self.coords
+            for u in range(len(self)):
+                ux, uy = coords[u]
+                for k in range(self.offsets[u], self.offsets[u + 1]):
+                    vx, vy = coords[self.targets[k]]
+                    length = math.hypot(vx - ux, vy - uy)
+                    if length > 0:
+                        best = min(best, self.weights[k] / length)
+            self._cost_per_px = 0.0 if best == INF else best
+        return self._cost_per_px
+
+
+def dijkstra(graph, src, mult=1.0, dst=None, trace=None, stats=None):
+    """
+    Dijkstra con heapq desde la etiqueta src. Devuelve (dist, prev) como listas por índice.
+    Si se da dst la búsqueda termina al asentar el destino.
+    Si se da trace (traza.StepTrace) se graban en ella los eventos explore/relax.
+    Si se da stats (dict) se guarda en stats["settled"] el número de nodos asentados.
+    """
+    s = graph.node_id(src)
+    t = graph.node_id(dst) if dst is not None else -1
+    offsets = graph.offsets; targets = graph.targets
+    weights = graph.scaled_weights(mult)
+    n = len(graph)
+
+    dist = [INF] * n
+    prev = [-1] * n
+    done = [False] * n
+    settled = 0
+    dist[s] = 0
+    pq = [(0, s)]
+    while pq:
+        d, u = heapq.heappop(pq)
+        if done[u]:
+            continue
+        done[u] = True
+        settled += 1
+        if trace is not None:
+            trace.explore(u)
+        if u == t:
+            break
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd, v))
+                if trace is not None:
+                    trace.relax(u, v, nd)
+    if stats is not None:
+        stats["settled"] = settled
+    return dist, prev
+
+
+def astar(graph, src, dst, mult=1.0, trace=None, stats=None):
+    """
+    A* entre las etiquetas src y dst. La heurística es la distancia euclídea en la
+    imagen por graph.cost_per_px() y por el factor del modo: nunca sobreestima, así que
+    el resultado es el mismo que con Dijkstra. Devuelve (dist, prev) como dijkstra.
+    """
+    s = graph.node_id(src)
+    t = graph.node_id(dst)
+    offsets = graph.offsets; targets = graph.targets
+    weights = graph.scaled_weights(mult)
+    n = len(graph)
+    tx, ty = graph.coords[t]
+    k_px = graph.cost_per_px() * mult
+    coords = graph.coords
+
+    def h(v):
+        x, y = coords[v]
+        return k_px * math.hypot(tx - x, ty - y)
+
+    dist = [INF] * n
+    prev = [-1] * n
+    done = [False] * n
+    settled = 0
+    dist[s] = 0
+    pq = [(h(s), s)]
+    while pq:
+        _, u = heapq.heappop(pq)
+        if done[u]:
+            continue
+        done[u] = True
+        settled += 1
+        if trace is not None:
+            trace.explore(u)
+        if u == t:
+            break
+        d = dist[u]
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < dist[v]:
+                dist[v] = nd
+                prev[v] = u
+                heapq.heappush(pq, (nd + h(v), v))
+                if trace is not None:
+                    trace.relax(u, v, nd)
+    if stats is not None:
+        stats["settled"] = settled
+    return dist, prev
+
+
+def bidirectional_dijkstra(graph, src, dst, mult=1.0, trace=None, stats=None):
+    """
+    Dijkstra bidireccional: una búsqueda desde src y otra desde dst (el grafo es no
+    dirigido), avanzando siempre la de menor frente. Termina cuando la suma de ambos
+    frentes ya no puede mejorar el mejor encuentro. Devuelve (costo, camino de etiquetas),
+    o (inf, []) si no hay camino. En la traza, los relax de la búsqueda inversa llevan
+    la distancia hasta el destino (la traza debe crearse con src=(s, t)).
+    """
+    s = graph.node_id(src)
+    t = graph.node_id(dst)
+    offsets = graph.offsets; targets = graph.targets
+    weights = graph.scaled_weights(mult)
+    n = len(graph)
+
+    dist = ([INF] * n, [INF] * n)
+    prev = ([-1] * n, [-1] * n)
+    done = (bytearray(n), bytearray(n))
+    pq = ([(0, s)], [(0, t)])
+    dist[0][s] = 0
+    dist[1][t] = 0
+    best = INF if s != t else 0
+    meet = s if s == t else -1
+    settled = 0
+    while pq[0] and pq[1] and pq[0][0][0] + pq[1][0][0] < best:
+        side = 0 if pq[0][0][0] <= pq[1][0][0] else 1
+        d, u = heapq.heappop(pq[side])
+        D = dist[side]; P = prev[side]; other = dist[1 - side]
+        if done[side][u]:
+            continue
+        done[side][u] = True
+        settled += 1
+        if trace is not None:
+            trace.explore(u)
+        for k in range(offsets[u], offsets[u + 1]):
+            v = targets[k]
+            nd = d + weights[k]
+            if nd < D[v]:
+                D[v] = nd
+                P[v] = u
+                heapq.heappush(pq[side], (nd, v))
+                if trace is not None:
+                    trace.relax(u, v, nd)
+            if nd + other[v] < best:
+                best = nd + other[v]
+                meet = v
+    if stats is not None:
+        stats["settled"] = settled
+    if meet == -1:
+        return INF, []
+
+    path = []
+    cur = meet
+    while cur != -1:
+        path.append(graph.labels[cur])
+        cur = prev[0][cur]
+    path.reverse()
+    cur = prev[1][meet]
+    while cur != -1:
+        path.append(graph.labels[cur])
+        cur = prev[1][cur]
+    return best, path
+
+
+def build_path(graph, prev, dst):
+    """Reconstruye la lista de etiquetas desde el origen hasta dst usando prev."""
+    path = []
+    cur = graph.node_id(dst)
+    while cur != -1:
+        path.append(graph.labels[cur])
+        cur = prev[cur]
+    path.reverse()
+    return path
+
+
+ALGORITHMS = ("dijkstra", "astar", "bidireccional")
+
+def search(graph, src, dst, mult=1.0, algorithm="dijkstra", trace=None, stats=None):
+    """
+    Búsqueda punto a punto con el algoritmo elegido (uno de ALGORITHMS).
+    Devuelve (costo, camino de etiquetas); si no hay camino, (inf, []).
+    """
+    if algorithm == "bidireccional":
+        return bidirectional_dijkstra(graph, src, dst, mult, trace=trace, stats=stats)
+    if algorithm == "astar":
+        dist, prev = astar(graph, src, dst, mult, trace=trace, stats=stats)
+    elif algorithm == "dijkstra":
+        dist, prev = dijkstra(graph, src, mult, dst=dst, trace=trace, stats=stats)
+    else:
+        raise ValueError(f"Algoritmo desconocido: {algorithm}")
+    cost = dist[graph.node_id(dst)]
+    if cost == INF:
+        return INF, []
+    return cost, build_path(graph, prev, dst)
+
+
+# -----------------------------
+# API sin interfaz
+# -----------------------------
+_DEFAULT_GRAPH = None
+
+def default_graph():
+    """Grafo de Hyrule construido una sola vez desde FIXED_NODES/BASE_EDGES."""
+    global _DEFAULT_GRAPH
+    if _DEFAULT_GRAPH is None:
+        _DEFAULT_GRAPH = Graph(FIXED_NODES, BASE_EDGES)
+    return _DEFAULT_GRAPH
+
+
+def shortest_path(src, dst, mode="pie", graph=None, algorithm="dijkstra"):
+    """
+    Ruta más corta entre dos etiquetas para un modo de MODE_MULT.
+    Devuelve (costo, camino); si no hay camino, (inf, []).
+    """
+    if graph is None:
+        graph = default_graph()
+    return search(graph, src, dst, MODE_MULT.get(mode, 1.0), algorithm)
+
+
+def one_to_many(src, dsts=None, modes=None, graph=None):
+    """
+    Costos desde src hasta cada destino (todos los nodos si dsts es None) para cada modo.
+    Se hace un único árbol con los pesos base; cada modo solo lo escala.
+    Devuelve {modo: {destino: costo}} (inf si no hay camino).
+    """
+    if graph is None:
+        graph = default_graph()
+    dist, _ = dijkstra(graph, src)
+    dsts = graph.labels if dsts is None else dsts
+    ids = [(d, graph.node_id(d)) for d in dsts]
+    result = {}
+    for mode in (MODE_MULT if modes is None else modes):
+        mult = MODE_MULT.get(mode, 1.0)
+        result[mode] = {d: dist[i] * mult for d, i in ids}
+    return result
+
+
+def many_to_many(srcs, dsts=None, modes=None, graph=None):
+    """one_to_many para varios orígenes: {origen: {modo: {destino: costo}}}."""
+    if graph is None:
+        graph = default_graph()
+    return {src: one_to_many(src, dsts, modes, graph) for src in dict.fromkeys(srcs)}
+
+
+def shortest_paths(queries, graph=None):
+    """
+    Versión por lotes de shortest_path. queries es un iterable de (origen, destino, modo);
+    las consultas con el mismo origen y modo comparten un único árbol de búsqueda.
+    Devuelve la lista de (costo, camino) en el mismo orden.
+    """
+    if graph is None:
+        graph = default_graph()
+    queries = list(queries)
+    trees = {}
+    results = []
+    for src, dst, mode in queries:
+        key = (src, mode)
+        tree = trees.get(key)
+        if tree is None:
+            tree = dijkstra(graph, src, MODE_MULT.get(mode, 1.0))
+            trees[key] = tree
+        dist, prev = tree
+        cost = dist[graph.node_id(dst)]
+        if cost == INF:
+            results.append((INF, []))
+        else:
+            results.append((cost, build_path(graph, prev, dst)))
+    return results
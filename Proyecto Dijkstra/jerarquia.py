@@ -0,0 +1,294 @@
+import os
+import heapq
+import pickle
+import time
+from array import array
+
+from grafo import MODE_MULT, INF, Graph, dijkstra
+from tabla_rutas import graph_hash
+
+CH_VERSION = 1
+WITNESS_SETTLE_LIMIT = 60  # nodos máximos por búsqueda de testigo al contraer
+
+# -----------------------------
+# Jerarquía de contracción (para mapas grandes)
+# -----------------------------
+class ContractionHierarchy:
+    """
+    Preprocesado para consultas punto a punto rápidas en mapas grandes. Los nodos se
+    contraen de menos a más importante; al quitar un nodo se añaden atajos entre sus
+    vecinos cuando no hay otro camino igual de corto. Una consulta es un Dijkstra
+    bidireccional que solo sube de rango, y el camino se recupera desempaquetando los
+    atajos (cada uno recuerda su nodo intermedio).
+    Todo se guarda con los pesos base; como el modo solo escala los pesos, los caminos
+    son los mismos en todos los modos y el costo es el base * MODE_MULT.
+    up_targets[up_offsets[u]:up_offsets[u+1]] son los vecinos de rango mayor que u;
+    up_mid es el nodo intermedio de cada arista (-1 si es una arista original).
+    """
+    def __init__(self, graph, rank, up_offsets, up_targets, up_weights, up_mid):
+        self.graph = graph
+        self.rank = rank
+        self.up_offsets = up_offsets
+        self.up_targets = up_targets
+        self.up_weights = up_weights
+        self.up_mid = up_mid
+
+    @classmethod
+    def build(cls, graph):
+        n = len(graph)
+        adj = [dict() for _ in range(n)]
+        mid = {}
+        for u in range(n):
+            for k in range(graph.offsets[u], graph.offsets[u + 1]):
+                v = graph.targets[k]; w = graph.weights[k]
+                if v != u and w < adj[u].get(v, INF):
+                    adj[u][v] = w
+        contracted = bytearray(n)
+        deleted_neigh = [0] * n
+        level = [0] * n
+
+        def witness(src, skip, limit):
+            # Dijkstra acotado desde src sin pasar por skip; distancias <= limit
+            dist = {src: 0}
+            pq = [(0, src)]
+            settled = 0
+            while pq and settled < WITNESS_SETTLE_LIMIT:
+                d, u = heapq.heappop(pq)
+                if d > dist.get(u, INF) or d > limit:
+                    continue
+                settled += 1
+                for v, w in adj[u].items():
+                    if v == skip or contracted[v]:
+                        continue
+                    nd = d + w
+                    if nd < dist.get(v, INF):
+                        dist[v] = nd
+                        heapq.heappush(pq, (nd, v))
+            return dist
+
+        def shortcuts_for(v):
+            neigh = [(u, w) for u, w in adj[v].items() if not contracted[u]]
+            result = []
+            for i, (u, wu) in enumerate(neigh):
+                others = neigh[i + 1:]
+                if not others:
+                    continue
+                limit = wu + max(w for _, w in others)
+                dist = witness(u, v, limit)
+                for x, wx in others:
+                    via = wu + wx
+                    if dist.get(x, INF) > via:
+                        result.append((u, x, via))
+            return result, len(neigh)
+
+        def priority(v):
+            shortcuts, degree = shortcuts_for(v)
+            return 2 * (len(shortcuts) - degree) + deleted_neigh[v] + level[v]
+
+        pq = [(priority(v), v) for v in range(n)]
+        heapq.heapify(pq)
+        rank = array("i", [0]) * n
+        order = 0
+        while pq:
+            _, v = heapq.heappop(pq)
+            if contracted[v]:
+                continue
+            # actualización perezosa: si su prioridad empeoró, vuelve a la cola
+            p = priority(v)
+            if pq and p > pq[0][0]:
+                heapq.heappush(pq, (p, v))
+                continue
+            shortcuts, _ = shortcuts_for(v)
+            for u, x, w in shortcuts:
+                if w < adj[u].get(x, INF):
+                    adj[u][x] = w; adj[x][u] = w
+                    mid[(u, x)] = v; mid[(x, u)] = v
+            contracted[v] = 1
+            rank[v] = order
+            order += 1
+            for u in adj[v]:
+                if not contracted[u]:
+                    deleted_neigh[u] += 1
+                    level[u] = max(level[u], level[v] + 1)
+
+        up_offsets = array("i", [0])
+        up_targets = array("i"); up_weights = array("d"); up_mid = array("i")
+        for u in range(n):
+            for v, w in sorted(adj[u].items()):
+                if rank[v] > rank[u]:
+                    up_targets.append(v); up_weights.append(w); up_mid.append(mid.get((u, v), -1))
+            up_offsets.append(len(up_targets))
+        return cls(graph, rank, up_offsets, up_targets, up_weights, up_mid)
+
+    def query(self, src, dst):
+        """(costo base, lista de ids) entre dos etiquetas; (inf, []) si no hay camino."""
+        s = self.graph.node_id(src); t = self.graph.node_id(dst)
+        if s == t:
+            return 0.0, [s]
+        offsets = self.up_offsets; targets = self.up_targets; weights = self.up_weights
+        dist = ({s: 0.0}, {t: 0.0})
+        prev = ({}, {})
+        pq = ([(0.0, s)], [(0.0, t)])
+        best = INF; meet = -1
+        while True:
+            # se avanza el lado con menor frente; cada lado para cuando su frente >= best
+            top0 = pq[0][0][0] if pq[0] else INF
+            top1 = pq[1][0][0] if pq[1] else INF
+            if min(top0, top1) >= best:
+                break
+            side = 0 if top0 <= top1 else 1
+            D = dist[side]; P = prev[side]; other = dist[1 - side]
+            d, u = heapq.heappop(pq[side])
+            if d > D[u]:
+                continue
+            o = other.get(u)
+            if o is not None and d + o < best:
+                best = d + o; meet = u
+            # stall-on-demand: si se llega a u más barato bajando desde un vecino de mayor
+            # rango, u no está en ningún camino más corto de esta búsqueda
+            stalled = False
+            for k in range(offsets[u], offsets[u + 1]):
+                dv = D.get(targets[k])
+                if dv is not None and dv + weights[k] < d:
+                    stalled = True
+                    break
+            if stalled:
+                continue
+            for k in range(offsets[u], offsets[u + 1]):
+                v = targets[k]
+                nd = d + weights[k]
+                if nd < D.get(v, INF):
+                    D[v] = nd
+                    P[v] = (u, k)
+                    heapq.heappush(pq[side], (nd, v))
+        if meet == -1:
+            return INF, []
+        forward = self._unpack_chain(prev[0], meet)
+        backward = self._unpack_chain(prev[1], meet)
+        backward.reverse()
+        return best, forward + backward[1:]
+
+    def _unpack_chain(self, prev, node):
+        # camino desde la raíz de la búsqueda hasta node, con los atajos desempaquetados
+        path = [node]
+        while node in prev:
+            u, k = prev[node]
+            seg = self._unpack_edge(u, node, k)
+            path.extend(reversed(seg[:-1]))
+            node = u
+        path.reverse()
+        return path
+
+    def _unpack_edge(self, u, v, k=None):
+        """Nodos de la arista (u, v) de la jerarquía, de u a v, sin atajos."""
+        if k is None:
+            k = self._find_up(u, v)
+        m = self.up_mid[k]
+        if m < 0:
+            return [u, v]
+        left = self._unpack_edge(m, u)
+        left.reverse()
+        return left + self._unpack_edge(m, v)[1:]
+
+    def _find_up(self, a, b):
+        # la arista se guarda en el extremo de menor rango
+        lo, hi = (a, b) if self.rank[a] < self.rank[b] else (b, a)
+        best = -1
+        for k in range(self.up_offsets[lo], self.up_offsets[lo + 1]):
+            if self.up_targets[k] == hi and (best < 0 or self.up_weights[k] < self.up_weights[best]):
+                best = k
+        return best
+
+    def route(self, src, dst, mode="pie"):
+        """(costo, camino de etiquetas) igual que RouteTable.route; (inf, []) si no hay camino."""
+        cost, ids = self.query(src, dst)
+        if cost == INF:
+            return INF, []
+        return cost * MODE_MULT.get(mode, 1.0), [self.graph.labels[i] for i in ids]
+
+
+def load_hierarchy(graph, cache_dir):
+    """
+    Carga la jerarquía desde cache_dir si existe una para este grafo; si no, la construye
+    y la guarda. Los fallos de lectura/escritura no son fatales (best-effort).
+    """
+    key = graph_hash(graph)
+    path = os.path.join(cache_dir, f"jerarquia_{key}.ch")
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") == CH_VERSION and data.get("hash") == key:
+            return ContractionHierarchy(graph, data["rank"], data["up_offsets"], data["up_targets"],
+                                        data["up_weights"], data["up_mid"])
+    except Exception:
+        pass
+
+    ch = ContractionHierarchy.build(graph)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": CH_VERSION, "hash": key, "rank": ch.rank,
+                         "up_offsets": ch.up_offsets, "up_targets": ch.up_targets,
+                         "up_weights": ch.up_weights, "up_mid": ch.up_mid}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception:
+        pass
+    return ch
+
+
+# -----------------------------
+# Comparación con Dijkstra (python jerarquia.py [lado])
+# -----------------------------
+def grid_lists(side, seed=1):
+    """(nodos, aristas) de un mapa sintético de side x side cruces con calles de peso ~ longitud."""
+    import random
+    rnd = random.Random(seed)
+    nodes = [(f"{x},{y}", x * 40 + rnd.uniform(-8, 8), y * 40 + rnd.uniform(-8, 8))
+             for y in range(side) for x in range(side)]
+    edges = []
+    for y in range(side):
+        for x in range(side):
+            a = f"{x},{y}"
+            if x + 1 < side:
+                edges.append((a, f"{x + 1},{y}", rnd.uniform(1.0, 4.0)))
+            if y + 1 < side:
+                edges.append((a, f"{x},{y + 1}", rnd.uniform(1.0, 4.0)))
+    return nodes, edges
+
+
+def grid_graph(side, seed=1):
+    """Mapa sintético de side x side cruces (como los caminos reales)."""
+    return Graph(*grid_lists(side, seed))
+
+
+def benchmark(graph, queries=200, seed=2):
+    """Tiempos de preprocesado y de consulta (media en ms) frente a Dijkstra con heap."""
+    import random
+    rnd = random.Random(seed)
+    pairs = [(rnd.choice(graph.labels), rnd.choice(graph.labels)) for _ in range(queries)]
+
+    t0 = time.perf_counter()
+    ch = ContractionHierarchy.build(graph)
+    build_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    base = [dijkstra(graph, s, dst=t)[0][graph.node_id(t)] for s, t in pairs]
+    dijkstra_ms = (time.perf_counter() - t0) * 1000 / queries
+
+    t0 = time.perf_counter()
+    fast = [ch.query(s, t)[0] for s, t in pairs]
+    ch_ms = (time.perf_counter() - t0) * 1000 / queries
+
+    mismatches = sum(1 for a, b in zip(base, fast) if abs(a - b) > 1e-9 * max(1.0, a))
+    return {"nodes": len(graph), "shortcuts": len(ch.up_targets) - len(graph.targets) // 2,
+            "build_s": build_s, "dijkstra_ms": dijkstra_ms, "ch_ms": ch_ms, "mismatches": mismatches}
+
+
+if __name__ == "__main__":
+    import sys
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    r = benchmark(grid_graph(side))
+    print(f"nodos: {r['nodes']}  atajos: {r['shortcuts']}  preprocesado: {r['build_s']:.2f} s")
+    print(f"Dijkstra: {r['dijkstra_ms']:.2f} ms/consulta  CH: {r['ch_ms']:.3f} ms/consulta  "
+          f"(x{r['dijkstra_ms'] / max(1e-9, r['ch_ms']):.0f})  diferencias: {r['mismatches']}")
@@ -0,0 +1,254 @@
+import math
+from array import array
+from bisect import bisect_right
+
+from espacial import PackedGrid, NUMPY_AVAILABLE
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+NODE_CELL = 64    # px de imagen por celda en la rejilla de nodos
+EDGE_CELL = 128   # celda del primer nivel de aristas; cada nivel siguiente la duplica
+ENTRY_CACHE_LIMIT = 20000  # con más entradas guardadas se sueltan las que no están dibujadas
+
+# -----------------------------
+# Modelo de nodos/aristas dibujados en el canvas
+# -----------------------------
+class MapModel:
+    """
+    Nodos y aristas del canvas leídos directamente de las listas CSR del grafo
+    (offsets/targets/weights/coords): load() solo arma rejillas compactas de ids, y el
+    dict de cada elemento (con los ids de sus items) se crea recién cuando una consulta lo
+    devuelve. Así abrir un mapa grande no crea un objeto por nodo ni por arista.
+
+    Un nodo se identifica por su id en el grafo y una arista por la posición k de
+    targets con u < targets[k] (la primera, si hay paralelas). Cada arista se indexa por
+    su punto medio en el nivel cuya celda cubre su extensión; al consultar, el rectángulo
+    se agranda media celda por nivel y luego se prueba la caja exacta.
+    """
+    def __init__(self):
+        self.graph = None
+        self._nodes_grid = PackedGrid(NODE_CELL)
+        self._edge_levels = []
+        self.clear()
+
+    def clear(self):
+        self.graph = None
+        self._nodes_grid.clear()
+        self._edge_levels = []
+        self._nodes = {}         # id -> dict del nodo
+        self._arrays = None      # (xs, ys, offsets, targets) de numpy sobre el grafo
+        self._edges = {}         # k -> dict de la arista
+        self._edge_by_line = {}
+
+    def load(self, graph):
+        """Indexa los nodos y aristas de graph; no crea ninguna entrada."""
+        self.clear()
+        self.graph = graph
+        n = len(graph)
+        if not n:
+            return
+        if NUMPY_AVAILABLE:
+            self._load_numpy(graph, n)
+        else:
+            self._load_lists(graph, n)
+
+    def _load_numpy(self, graph, n):
+        # en un MappedGraph son vistas sobre el mmap, sin copiar
+        flat = getattr(graph.coords, "_flat", None)
+        xy = np.asarray(flat if flat is not None else graph.coords, dtype=np.float64).reshape(n, 2)
+        xs = xy[:, 0]; ys = xy[:, 1]
+        offsets = np.asarray(graph.offsets)
+        targets = np.asarray(graph.targets)
+        self._arrays = (xs, ys, offsets, targets)
+        self._nodes_grid.build(xs, ys, np.arange(n, dtype=np.int64))
+
+        src = np.repeat(np.arange(n, dtype=np.int64), np.diff(offsets))
+        ks = np.flatnonzero(src < targets)
+        # una sola entrada por par (u, v): la primera k de las paralelas
+        _, first = np.unique(src[ks] * n + targets[ks], return_index=True)
+        ks = ks[np.sort(first)]
+        u = src[ks]; v = targets[ks]
+        del src
+        extent = np.maximum(np.abs(xs[u] - xs[v]), np.abs(ys[u] - ys[v]))
+        level = np.ceil(np.log2(np.maximum(extent, EDGE_CELL) / EDGE_CELL)).astype(np.int64)
+        mx = (xs[u] + xs[v]) / 2; my = (ys[u] + ys[v]) / 2
+        for lv in range(int(level.max()) + 1 if len(ks) else 0):
+            sel = np.flatnonzero(level == lv)
+            if len(sel):
+                grid = PackedGrid(EDGE_CELL * 2 ** lv)
+                grid.build(mx[sel], my[sel], ks[sel])
+                self._edge_levels.append(grid)
+
+    def _load_lists(self, graph, n):
+        coords = graph.coords
+        self._nodes_grid.build((x for x, _ in coords), (y for _, y in coords), range(n))
+        offsets = graph.offsets; targets = graph.targets
+        by_level = {}
+        for a in range(n):
+            ax, ay = coords[a]
+            seen = set()
+            for k in range(offsets[a], offsets[a + 1]):
+                b = targets[k]
+                if b <= a or b in seen:
+                    continue
+                seen.add(b)
+                bx, by = coords[b]
+                extent = max(abs(ax - bx), abs(ay - by), EDGE_CELL)
+                lv = math.ceil(math.log2(extent / EDGE_CELL))
+                xs, ys, ks = by_level.setdefault(lv, (array("d"), array("d"), array("q")))
+                xs.append((ax + bx) / 2); ys.append((ay + by) / 2); ks.append(k)
+        for lv, (xs, ys, ks) in sorted(by_level.items()):
+            grid = PackedGrid(EDGE_CELL * 2 ** lv)
+            grid.build(xs, ys, ks)
+            self._edge_levels.append(grid)
+
+    # entradas (se crean al pedirlas)
+    def _node_entry(self, i):
+        n = self._nodes.get(i)
+        if n is None:
+            ix, iy = self.graph.coords[i]
+            n = {"id": i, "label": self.graph.labels[i], "ix": ix, "iy": iy, "oval": None, "text": None, "dist": None}
+            self._nodes[i] = n
+        return n
+
+    def _edge_entry(self, k):
+        e = self._edges.get(k)
+        if e is None:
+            g = self.graph
+            a = bisect_right(g.offsets, k) - 1
+            b = g.targets[k]
+            e = {"id": k, "ends": (a, b), "u": g.labels[a], "v": g.labels[b],
+                 "line": None, "weight": g.weights[k], "text_id": None}
+            self._edges[k] = e
+        return e
+
+    def _prune(self):
+        # las entradas sin items se pueden volver a crear desde el grafo
+        if len(self._nodes) > ENTRY_CACHE_LIMIT:
+            self._nodes = {i: n for i, n in self._nodes.items() if n["oval"] is not None}
+        if len(self._edges) > ENTRY_CACHE_LIMIT:
+            self._edges = {k: e for k, e in self._edges.items() if e["line"] is not None}
+
+    def set_line(self, edge, line):
+        """Cambia (o quita, con None) la línea dibujada de la arista."""
+        old = edge.get("line")
+        if old is not None:
+            self._edge_by_line.pop(old, None)
+        edge["line"] = line
+        if line is not None:
+            self._edge_by_line[line] = edge
+
+    def visible(self, x0, y0, x1, y1, limit=None):
+        """
+        (nodos, aristas) que tocan el rectángulo dado en coordenadas de imagen, o None si
+        entre los dos pasan de limit (así no se crean entradas que no se van a dibujar).
+        """
+        if self.graph is None:
+            return [], []
+        self._prune()
+        found = (self._visible_numpy if self._arrays is not None else self._visible_lists)(x0, y0, x1, y1, limit)
+        if found is None:
+            return None
+        nodes, edges = found
+        return [self._node_entry(i) for i in nodes], [self._edge_entry(k) for k in edges]
+
+    def _visible_numpy(self, x0, y0, x1, y1, limit):
+        # los candidatos de cada rejilla se filtran de una vez con la prueba exacta
+        xs, ys, offsets, targets = self._arrays
+        ids = _candidates(self._nodes_grid, x0, y0, x1, y1)
+        px = xs[ids]; py = ys[ids]
+        nodes = ids[(px >= x0) & (px <= x1) & (py >= y0) & (py <= y1)]
+        count = len(nodes)
+        if limit is not None and count > limit:
+            return None
+        edges = []
+        for grid in self._edge_levels:
+            pad = grid.cell / 2
+            ks = _candidates(grid, x0 - pad, y0 - pad, x1 + pad, y1 + pad)
+            if not len(ks):
+                continue
+            a = np.searchsorted(offsets, ks, side="right") - 1
+            b = targets[ks]
+            ax = xs[a]; bx = xs[b]; ay = ys[a]; by = ys[b]
+            ks = ks[(np.minimum(ax, bx) <= x1) & (np.maximum(ax, bx) >= x0)
+                    & (np.minimum(ay, by) <= y1) & (np.maximum(ay, by) >= y0)]
+            count += len(ks)
+            if limit is not None and count > limit:
+                return None
+            edges.append(ks)
+        return nodes.tolist(), [k for ks in edges for k in ks.tolist()]
+
+    def _visible_lists(self, x0, y0, x1, y1, limit):
+        coords = self.graph.coords
+        count = 0
+        nodes = []
+        for i in self._nodes_grid.in_rect(x0, y0, x1, y1):
+            ix, iy = coords[i]
+            if x0 <= ix <= x1 and y0 <= iy <= y1:
+                count += 1
+                if limit is not None and count > limit:
+                    return None
+                nodes.append(i)
+        offsets = self.graph.offsets; targets = self.graph.targets
+        edges = []
+        for grid in self._edge_levels:
+            pad = grid.cell / 2
+            for k in grid.in_rect(x0 - pad, y0 - pad, x1 + pad, y1 + pad):
+                ax, ay = coords[bisect_right(offsets, k) - 1]
+                bx, by = coords[targets[k]]
+                if min(ax, bx) <= x1 and max(ax, bx) >= x0 and min(ay, by) <= y1 and max(ay, by) >= y0:
+                    count += 1
+                    if limit is not None and count > limit:
+                        return None
+                    edges.append(k)
+        return nodes, edges
+
+    def node(self, label):
+        i = self.graph.index.get(label) if self.graph is not None else None
+        return None if i is None else self._node_entry(i)
+
+    def node_near(self, ix, iy, radius):
+        """Nodo más cercano a (ix, iy) en coordenadas de imagen dentro de radius, o None."""
+        if self.graph is None:
+            return None
+        coords = self.graph.coords
+        best = None
+        best_d2 = radius * radius
+        for i in self._nodes_grid.in_rect(ix - radius, iy - radius, ix + radius, iy + radius):
+            px, py = coords[i]
+            d2 = (px - ix) ** 2 + (py - iy) ** 2
+            if d2 <= best_d2:
+                best, best_d2 = i, d2
+        return None if best is None else self._node_entry(best)
+
+    def edge(self, u, v):
+        """Arista entre u y v en cualquier sentido, o None."""
+        if self.graph is None:
+            return None
+        index = self.graph.index
+        a = index.get(u); b = index.get(v)
+        if a is None or b is None:
+            return None
+        a, b = min(a, b), max(a, b)
+        g = self.graph
+        for k in range(g.offsets[a], g.offsets[a + 1]):
+            if g.targets[k] == b:
+                return self._edge_entry(k)
+        return None
+
+    def edge_by_line(self, line_id):
+        return self._edge_by_line.get(line_id)
+
+    def endpoints(self, edge):
+        a, b = edge["ends"]
+        return self._node_entry(a), self._node_entry(b)
+
+
+def _candidates(grid, x0, y0, x1, y1):
+    """Ids candidatos de la rejilla para el rectángulo, como array de numpy."""
+    spans = list(grid.ranges(x0, y0, x1, y1))
+    if not spans:
+        return np.zeros(0, dtype=np.int64)
+    order = np.frombuffer(grid.order, dtype=np.int64)
+    return np.concatenate([order[a:b] for a, b in spans])
@@ -0,0 +1,72 @@
+import math
+from collections import OrderedDict
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except Exception:
+    NUMPY_AVAILABLE = False
+
+# -----------------------------
+# Muestreo del recorrido del personaje
+# -----------------------------
+def ease_in_out_sine(u):
+    return 0.5 - 0.5 * math.cos(math.pi * u)
+
+
+class PathSampler:
+    """
+    Convierte la polilínea de un camino (coordenadas de imagen) en las posiciones de cada
+    fotograma del movimiento: una muestra cada ~step_px px de pantalla a lo largo del
+    camino completo (parametrizado por longitud de arco, con easing al salir y llegar).
+    Las muestras se devuelven en coordenadas de imagen, así que solo dependen del camino
+    y de la escala; se guardan en un LRU con esa clave.
+    """
+    def __init__(self, step_px, max_items=32):
+        self.step_px = step_px
+        self.max_items = max_items
+        self._cache = OrderedDict()
+
+    def sample(self, key, points, scale):
+        """(número de fotogramas, muestras) para el camino `key` con vértices `points`."""
+        cache_key = (key, round(scale, 6))
+        hit = self._cache.get(cache_key)
+        if hit is not None:
+            self._cache.move_to_end(cache_key)
+            return hit
+        result = self._sample(points, scale)
+        self._cache[cache_key] = result
+        while len(self._cache) > self.max_items:
+            self._cache.popitem(last=False)
+        return result
+
+    def _sample(self, points, scale):
+        if len(points) < 2:
+            return 0, []
+        if NUMPY_AVAILABLE:
+            pts = np.asarray(points, dtype=float)
+            seg = np.hypot(*np.diff(pts, axis=0).T)
+            cum = np.concatenate(([0.0], np.cumsum(seg)))
+            length = cum[-1]
+            count = max(1, int(length * scale / self.step_px))
+            u = np.arange(1, count + 1) / count
+            s = (0.5 - 0.5 * np.cos(np.pi * u)) * length
+            samples = np.column_stack((np.interp(s, cum, pts[:, 0]), np.interp(s, cum, pts[:, 1])))
+            return count, samples
+
+        cum = [0.0]
+        for (ax, ay), (bx, by) in zip(points[:-1], points[1:]):
+            cum.append(cum[-1] + math.hypot(bx - ax, by - ay))
+        length = cum[-1]
+        count = max(1, int(length * scale / self.step_px))
+        samples = []
+        j = 0
+        for i in range(1, count + 1):
+            s = ease_in_out_sine(i / count) * length
+            while j < len(cum) - 2 and cum[j + 1] < s:
+                j += 1
+            seg = cum[j + 1] - cum[j]
+            t = (s - cum[j]) / seg if seg > 0 else 1.0
+            (ax, ay), (bx, by) = points[j], points[j + 1]
+            samples.append((ax + (bx - ax) * t, ay + (by - ay) * t))
+        return count, samples
@@ -0,0 +1,168 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from functools import wraps
+
+_MISSING = object()
+FRAME_GAP_MS = 1000  # entre animaciones el reloj se detiene; esos huecos no son fotogramas
+
+# -----------------------------
+# Perfilado opcional (HUD de rendimiento)
+# -----------------------------
+class Profiler:
+    """
+    Mide los puntos calientes de la app sin tocar su código: watch*() solo registra qué
+    medir; enable() envuelve esos métodos (y after) y disable() deja los originales, así
+    que apagado no cuesta nada. Cada medición se acumula para el HUD y, si hay log_path,
+    se guarda como una línea JSON (se escriben en bloque en flush()).
+    """
+    def __init__(self, log_path=None, window=240):
+        self.log_path = log_path
+        self.enabled = False
+        self._watches = []   # (objeto, nombre del atributo, etiqueta, tipo)
+        self._patches = []   # (objeto, nombre, valor original o _MISSING)
+        self._lock = threading.Lock()
+        self._pending = []
+        self._stats = {}     # etiqueta -> [veces, total ms, máx ms] desde el último report()
+        self._frames = deque(maxlen=window)
+        self._late = deque(maxlen=window)
+        self._last_frame = None
+
+    # ---- qué medir ----
+    def watch(self, target, *names, prefix=""):
+        """Métodos de una instancia o de una clase (afecta a todas sus instancias)."""
+        for name in names:
+            self._watches.append((target, name, prefix + name, "method"))
+
+    def watch_frames(self, scheduler):
+        """Fotogramas del FrameScheduler: duración de cada tick y tiempo entre ticks."""
+        self._watches.append((scheduler, "_tick", "fotograma", "frame"))
+
+    def watch_after(self, cls):
+        """after() de una clase de widgets (tk.Misc = todos): retraso y duración de cada callback."""
+        self._watches.append((cls, "after", "after", "after"))
+
+    # ---- encendido / apagado ----
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self._last_frame = None
+        for target, name, label, kind in self._watches:
+            original = vars(target).get(name, _MISSING)
+            func = getattr(target, name)
+            if kind == "after":
+                wrapper = self._wrap_after(func)
+            else:
+                wrapper = self._wrap(func, label, kind == "frame")
+            setattr(target, name, wrapper)
+            self._patches.append((target, name, original))
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        for target, name, original in reversed(self._patches):
+            if original is _MISSING:
+                delattr(target, name)
+            else:
+                setattr(target, name, original)
+        self._patches.clear()
+        self.flush()
+
+    def toggle(self):
+        if self.enabled:
+            self.disable()
+        else:
+            self.enable()
+        return self.enabled
+
+    # ---- envoltorios ----
+    def _wrap(self, func, label, frame):
+        @wraps(func)
+        def timed(*args, **kwargs):
+            t0 = time.perf_counter()
+            if frame:
+                if self._last_frame is not None and (t0 - self._last_frame) * 1000.0 < FRAME_GAP_MS:
+                    self._frames.append((t0 - self._last_frame) * 1000.0)
+                self._last_frame = t0
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._add("frame" if frame else "method", label, (time.perf_counter() - t0) * 1000.0)
+        return timed
+
+    def _wrap_after(self, after):
+        profiler = self
+
+        @wraps(after)
+        def timed_after(widget, ms, func=None, *args):
+            if func is None:
+                return after(widget, ms)
+            due = time.perf_counter() + ms / 1000.0
+            name = "after:" + getattr(func, "__name__", "callback")
+
+            def callback(*a):
+                t0 = time.perf_counter()
+                late = (t0 - due) * 1000.0
+                try:
+                    return func(*a)
+                finally:
+                    profiler._late.append(late)
+                    profiler._add("after", name, (time.perf_counter() - t0) * 1000.0, late_ms=round(late, 3))
+            return after(widget, ms, callback, *args)
+        return timed_after
+
+    # ---- registro ----
+    def _add(self, kind, name, ms, **fields):
+        with self._lock:
+            s = self._stats.get(name)
+            if s is None:
+                self._stats[name] = [1, ms, ms]
+            else:
+                s[0] += 1; s[1] += ms
+                if ms > s[2]:
+                    s[2] = ms
+            if self.log_path:
+                self._pending.append(dict(t=round(time.time(), 4), kind=kind, name=name, ms=round(ms, 3), **fields))
+
+    def record(self, kind, name, **fields):
+        """Registro libre (p. ej. conteo de items del canvas); solo va al archivo."""
+        if self.enabled and self.log_path:
+            with self._lock:
+                self._pending.append(dict(t=round(time.time(), 4), kind=kind, name=name, **fields))
+
+    def flush(self):
+        """Escribe los registros pendientes (JSON Lines). Best-effort: un fallo no detiene la app."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending or not self.log_path:
+            return
+        try:
+            folder = os.path.dirname(self.log_path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in pending)
+        except OSError:
+            pass
+
+    def report(self, top=6):
+        """Resumen para el HUD (fotogramas, after y métodos más caros); reinicia los totales."""
+        with self._lock:
+            stats, self._stats = self._stats, {}
+        lines = []
+        if self._frames:
+            frames = sorted(self._frames)
+            avg = sum(frames) / len(frames)
+            p95 = frames[min(len(frames) - 1, int(len(frames) * 0.95))]
+            lines.append(f"fotograma: {avg:.1f} ms (p95 {p95:.1f}, {1000 / max(avg, 1e-9):.0f} fps)")
+        if self._late:
+            late = list(self._late)
+            lines.append(f"retraso after: {sum(late) / len(late):.1f} ms (máx {max(late):.1f})")
+        ranked = sorted(stats.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+        for name, (count, total, worst) in ranked:
+            lines.append(f"{name}: {total / count:.2f} ms x{count} (máx {worst:.1f})")
+        return "\n".join(lines)
@@ -0,0 +1,123 @@
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from PIL import Image
+
+# -----------------------------
+# Carga de recursos en paralelo
+# -----------------------------
+class AssetLoader:
+    """
+    Decodifica recursos en un pool de hilos. Cada recurso se pide con submit(nombre, fn)
+    y se recoge con get(nombre), que solo bloquea si aún no terminó. Guarda cuánto tardó
+    cada uno (en su hilo) para poder reportar los tiempos de arranque.
+    """
+    def __init__(self, max_workers=4):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="assets")
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.t0 = time.perf_counter()
+        self.timings = {}
+
+    def submit(self, name, fn, *args, daemon=False):
+        """
+        daemon=True corre fn en un hilo propio que no retiene el cierre del programa
+        (cálculos largos como la jerarquía, que guardan su caché de forma atómica).
+        """
+        def task():
+            start = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.timings[name] = time.perf_counter() - start
+        if daemon:
+            fut = Future()
+
+            def run():
+                if not fut.set_running_or_notify_cancel():
+                    return
+                try:
+                    fut.set_result(task())
+                except BaseException as e:
+                    fut.set_exception(e)
+            threading.Thread(target=run, daemon=True, name=f"assets-{name}").start()
+        else:
+            fut = self._pool.submit(task)
+        self._futures[name] = fut
+        return fut
+
+    def get(self, name, default=None):
+        """Resultado del recurso (espera si hace falta); default si falló o no existe."""
+        fut = self._futures.get(name)
+        if fut is None:
+            return default
+        try:
+            return fut.result()
+        except Exception:
+            return default
+
+    def done(self, name):
+        fut = self._futures.get(name)
+        return fut is not None and fut.done()
+
+    def all_done(self):
+        return all(f.done() for f in self._futures.values())
+
+    def mark(self, name):
+        """Registra un hito medido desde que se creó el loader (p. ej. 'menu')."""
+        with self._lock:
+            self.timings[name] = time.perf_counter() - self.t0
+
+    def report(self):
+        with self._lock:
+            items = sorted(self.timings.items(), key=lambda kv: -kv[1])
+        return "\n".join(f"  {name:<24} {secs * 1000:8.1f} ms" for name, secs in items)
+
+    def shutdown(self, cancel_futures=False):
+        self._pool.shutdown(wait=False, cancel_futures=cancel_futures)
+
+
+def import_cv2():
+    """Importa OpenCV bajo demanda; None si no está instalado."""
+    try:
+        import cv2
+        return cv2
+    except Exception:
+        return None
+
+
+def load_image(path):
+    return Image.open(path).convert("RGBA")
+
+
+def load_fitted_image(path, max_w, max_h):
+    """Imagen reducida (sin agrandar) para caber en max_w x max_h."""
+    img = Image.open(path).convert("RGBA")
+    iw, ih = img.size
+    scale = min(1.0, max_w / iw, max_h / ih)
+    return img.resize((int(iw * scale), int(ih * scale)), Image.LANCZOS)
+
+
+def load_sprite(path, size, cache_dir):
+    """
+    Sprite escalado a size. La versión escalada se guarda en cache_dir y se reutiliza
+    mientras sea más nueva que el archivo original.
+    """
+    w, h = size
+    name = os.path.splitext(os.path.basename(path))[0]
+    cached = os.path.join(cache_dir, f"{name}_{w}x{h}.png")
+    try:
+        if os.path.getmtime(cached) >= os.path.getmtime(path):
+            return Image.open(cached).convert("RGBA")
+    except OSError:
+        pass
+    img = Image.open(path).convert("RGBA").resize((w, h), Image.LANCZOS)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        img.save(cached)
+    except OSError:
+        pass
+    return img
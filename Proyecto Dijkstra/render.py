@@ -0,0 +1,48 @@
+# -----------------------------
+# Render incremental del canvas
+# -----------------------------
+class CanvasRenderer:
+    """
+    Recuerda el último estilo aplicado a cada item del canvas y solo llama a itemconfig
+    con las opciones que cambiaron. Guarda además el estado visual actual (nodo y arista
+    resaltados, camino, cursor de la traza o capa de distancias) para saber qué items hay
+    que repintar y qué estilo dar a los items que se crean al entrar en pantalla.
+    Las aristas se identifican por su par (u, v), no por el id de la línea.
+    """
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self._styles = {}
+        self.full = True  # el próximo fotograma repasa todos los items
+        self.current = None
+        self.highlight = None
+        self.path_nodes = frozenset()
+        self.path_edges = frozenset()
+        self.cursor = None
+        self.overlay = None
+
+    def itemconfig(self, item, **opts):
+        applied = self._styles.setdefault(item, {})
+        changed = {k: v for k, v in opts.items() if applied.get(k) != v}
+        if changed:
+            applied.update(changed)
+            self.canvas.itemconfig(item, **changed)
+        return bool(changed)
+
+    def forget(self, *items):
+        for item in items:
+            self._styles.pop(item, None)
+
+    def invalidate(self):
+        """Olvida lo resaltado y fuerza un repaso completo en el próximo fotograma."""
+        self.full = True
+        self.current = None
+        self.highlight = None
+        self.path_nodes = frozenset()
+        self.path_edges = frozenset()
+        self.cursor = None
+        self.overlay = None
+
+    def clear(self):
+        # los items se recrearon: ningún estilo guardado sigue siendo válido
+        self._styles.clear()
+        self.invalidate()
@@ -0,0 +1,440 @@
+import os
+import sys
+import csv
+import gc
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import tempfile
+import tracemalloc
+import itertools
+
+from grafo import MODE_MULT, ALGORITHMS, FIXED_NODES, BASE_EDGES, Graph, search, many_to_many
+from tabla_rutas import RouteTable
+from traza import StepTrace, TraceCursor
+from archivo_mapa import import_graph, open_graph
+from jerarquia import grid_lists
+from muestreo import PathSampler, NUMPY_AVAILABLE
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)  # aristas de los mapas sintéticos
+ALL_PAIRS_MAX_NODES = 2000  # como ROUTE_TABLE_MAX_NODES: más allá la tabla n² no se usa
+ALL_PAIRS_SOURCES = 20      # orígenes medidos por modo (el total se extrapola a n)
+CANVAS_FRAMES = 60          # fotogramas de pan medidos
+TRACE_STEPS = 2000          # pasos de la traza repintados
+REGRESSION_RATIO = 1.25     # --compare avisa si una métrica empeora más que esto
+MIN_ROUND_S = 0.05          # duración mínima de cada ronda al medir llamadas rápidas
+SLOW_CALL_S = 0.5           # las llamadas más lentas que esto se miden una sola vez
+DEFAULT_OUT = os.path.join("cache", "rendimiento.json")
+
+# -----------------------------
+# Banco de pruebas (python rendimiento.py [--max-edges N] [--out x.json] [--compare y.json])
+# -----------------------------
+# Sobre el mapa de Hyrule y mapas sintéticos (rejilla y aleatorio) de 1k a 1M aristas mide:
+# construcción del grafo (en memoria y con el importador binario), búsqueda punto a punto
+# por modo y algoritmo, todos los pares por modo, memoria de la traza de pasos, el muestreo
+# del movimiento (_prepare_move_frames) y el repintado del canvas sin ventana. Los
+# resultados van a un JSON; con --compare se marcan las métricas que empeoraron.
+
+# -----------------------------
+# Mapas de prueba (listas de nodos y aristas)
+# -----------------------------
+def random_lists(n_edges, seed=3):
+    """Mapa aleatorio con n_edges aristas (grado medio ~6): un camino que une todo y pares al azar."""
+    rnd = random.Random(seed)
+    n = max(2, n_edges // 3)
+    side = 40 * math.sqrt(n)
+    nodes = [(f"n{i}", rnd.uniform(0, side), rnd.uniform(0, side)) for i in range(n)]
+    order = list(range(n))
+    rnd.shuffle(order)
+    pairs = list(zip(order[:-1], order[1:]))
+    while len(pairs) < n_edges:
+        a = rnd.randrange(n); b = rnd.randrange(n)
+        if a != b:
+            pairs.append((a, b))
+    edges = []
+    for a, b in pairs:
+        (_, ax, ay), (_, bx, by) = nodes[a], nodes[b]
+        # peso ~ longitud, así la heurística de A* sigue siendo válida
+        edges.append((nodes[a][0], nodes[b][0], math.hypot(bx - ax, by - ay) / 40 * rnd.uniform(1.0, 1.5) + 0.1))
+    return nodes, edges
+
+
+def cases(max_edges):
+    """(nombre, generador de (nodos, aristas)) de cada mapa a medir, del más chico al más grande."""
+    yield "hyrule", lambda: (FIXED_NODES, BASE_EDGES)
+    for m in SIZES:
+        if m > max_edges:
+            break
+        side = max(2, round(math.sqrt(m / 2)))
+        yield f"rejilla-{m}", lambda side=side: grid_lists(side)
+        yield f"aleatorio-{m}", lambda m=m: random_lists(m)
+
+
+# -----------------------------
+# Canvas sin ventana
+# -----------------------------
+class NullCanvas:
+    """
+    Canvas que solo guarda los items en un dict: mide el trabajo del lado de Python
+    (modelo, recorte, estilos) cuando no hay pantalla para abrir Tk.
+    """
+    def __init__(self):
+        self.items = {}
+        self._ids = itertools.count(1)
+
+    def _new(self, kind, *coords, **opts):
+        i = next(self._ids)
+        self.items[i] = [kind, coords, opts]
+        return i
+
+    def create_oval(self, *c, **o): return self._new("oval", *c, **o)
+    def create_text(self, *c, **o): return self._new("text", *c, **o)
+    def create_line(self, *c, **o): return self._new("line", *c, **o)
+    def create_image(self, *c, **o): return self._new("image", *c, **o)
+
+    def coords(self, item, *coords):
+        self.items[item][1] = coords
+
+    def itemconfig(self, item, **opts):
+        self.items[item][2].update(opts)
+
+    def delete(self, *items):
+        for i in items:
+            self.items.pop(i, None)
+
+    def type(self, item):
+        return self.items[item][0] if item in self.items else None
+
+    def tag_lower(self, *args): pass
+    def tag_raise(self, *args): pass
+    def update_idletasks(self): pass
+    def winfo_exists(self): return True
+    def find_all(self): return tuple(self.items)
+
+
+class _Var:
+    def __init__(self): self.value = ""
+    def set(self, value): self.value = value
+    def get(self): return self.value
+
+
+def _open_canvas(w, h):
+    """Canvas real de Tk (ventana oculta) si hay pantalla; si no, NullCanvas."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+        canvas = tk.Canvas(root, width=w, height=h)
+        return canvas, root, "tk"
+    except Exception:
+        return NullCanvas(), None, "null"
+
+
+def _headless_app(graph, canvas, w, h):
+    # DijkstraApp sin ventana ni recursos: solo lo que usan el recorte y el repintado
+    import Main3
+    from modelo import MapModel
+    from render import CanvasRenderer
+    from dinamico import DynamicRoutes
+    app = Main3.DijkstraApp.__new__(Main3.DijkstraApp)
+    app.graph = graph
+    app.canvas = canvas
+    app.renderer = CanvasRenderer(canvas)
+    app.model = MapModel()
+    app.dynamic = DynamicRoutes(graph)
+    app.transform = Main3.Transform()
+    xs = [x for x, _ in graph.coords]; ys = [y for _, y in graph.coords]
+    app.img_w = max(1, int(max(xs)) + 40); app.img_h = max(1, int(max(ys)) + 40)
+    app.transform.fit(w, h, app.img_w, app.img_h)
+    app.custom_font_family = None
+    app._shown_nodes = {}; app._shown_edges = {}
+    app._show_labels = True; app._fonts = {}
+    app.char_canvas_id = None; app._char_img_pos = None
+    app.selected_mode = "pie"; app.algorithm = "dijkstra"
+    app._trace_cache = {}
+    app.info_var = _Var()
+    app.path_sampler = PathSampler(Main3.MOVE_STEP_PX)
+    app._move_frames = []
+    app._draw_background = lambda preview=False: None
+    return app
+
+
+# -----------------------------
+# Mediciones
+# -----------------------------
+def _ms(fn):
+    """
+    ms por llamada a fn. Lo lento se mide una vez; lo rápido se repite hasta llenar
+    ~MIN_ROUND_S y se toma la mejor de 3 rondas, para que el ruido no parezca una regresión.
+    """
+    enabled = gc.isenabled()
+    gc.disable()  # como timeit: una recolección en medio no es parte de lo medido
+    try:
+        t0 = time.perf_counter()
+        fn()
+        first = time.perf_counter() - t0
+        if first >= SLOW_CALL_S:
+            return first * 1000.0
+        number = max(1, int(MIN_ROUND_S / max(first, 1e-7)))
+        best = first
+        for _ in range(3):
+            t0 = time.perf_counter()
+            for _ in range(number):
+                fn()
+            best = min(best, (time.perf_counter() - t0) / number)
+        return best * 1000.0
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _queries(graph, seed):
+    # menos consultas cuanto más grande el mapa, para que la suite termine en minutos
+    rnd = random.Random(seed)
+    count = max(3, min(50, 200_000 // max(1, len(graph.targets))))
+    labels = graph.labels
+    n = len(graph)
+    return [(labels[rnd.randrange(n)], labels[rnd.randrange(n)]) for _ in range(count)]
+
+
+def bench_build(nodes, edges):
+    result = {"graph_build_ms": _ms(lambda: Graph(nodes, edges))}
+    with tempfile.TemporaryDirectory() as tmp:
+        nodes_path = os.path.join(tmp, "nodos.csv")
+        edges_path = os.path.join(tmp, "aristas.csv")
+        graph_path = os.path.join(tmp, "mapa.grafo")
+        for path, header, rows in ((nodes_path, ("label", "x", "y"), nodes), (edges_path, ("u", "v", "w"), edges)):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                writer = csv.writer(f)
+                writer.writerow(header)
+                writer.writerows(rows)
+        result["import_ms"] = _ms(lambda: import_graph(nodes_path, edges_path, graph_path))
+        t0 = time.perf_counter()
+        mapped = open_graph(graph_path)
+        result["open_mapped_ms"] = (time.perf_counter() - t0) * 1000.0
+        result["file_bytes"] = os.path.getsize(graph_path)
+        del mapped
+        gc.collect()
+    return result
+
+
+def bench_single_pair(graph, pairs):
+    result = {}
+    for mode, mult in MODE_MULT.items():
+        graph.scaled_weights(mult)  # los pesos escalados se calculan una vez por modo
+        result[mode] = {alg: _ms(lambda alg=alg: [search(graph, s, t, mult, alg) for s, t in pairs]) / len(pairs)
+                        for alg in ALGORITHMS}
+    return {"queries": len(pairs), "ms_per_query": result}
+
+
+def bench_all_pairs(graph, seed):
+    n = len(graph)
+    rnd = random.Random(seed)
+    sources = [graph.labels[rnd.randrange(n)] for _ in range(min(n, ALL_PAIRS_SOURCES))]
+    result = {"sources": len(sources), "per_mode": {}}
+    for mode in MODE_MULT:
+        ms = _ms(lambda: many_to_many(sources, modes=(mode,), graph=graph)) / len(sources)
+        result["per_mode"][mode] = {"per_source_ms": ms, "estimated_total_s": ms * n / 1000.0}
+    if n <= ALL_PAIRS_MAX_NODES:
+        result["route_table_s"] = _ms(lambda: RouteTable.build(graph)) / 1000.0
+    return result
+
+
+def _trace_bytes(trace):
+    arrays = (trace.kinds, trace.us, trace.vs, trace.ds)
+    size = sum(a.itemsize * len(a) for a in arrays)
+    size += sum(d.itemsize * len(d) + len(v) for d, v in trace.keyframes)
+    return size
+
+
+def _record_trace(graph, src, dst, mult, algorithm):
+    s = graph.node_id(src)
+    if algorithm == "bidireccional":
+        s = (s, graph.node_id(dst))
+    trace = StepTrace(graph.labels, s)
+    search(graph, src, dst, mult, algorithm, trace=trace)
+    trace.final(None)
+    return trace
+
+
+def bench_trace(graph, pair):
+    src, dst = pair
+    mult = MODE_MULT["pie"]
+    result = {}
+    for alg in ALGORITHMS:
+        record_ms = _ms(lambda alg=alg: _record_trace(graph, src, dst, mult, alg))
+        trace = _record_trace(graph, src, dst, mult, alg)
+        gc.collect()
+        tracemalloc.start()
+        _record_trace(graph, src, dst, mult, alg)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        events = len(trace)
+        result[alg] = {"events": events, "record_ms": record_ms, "bytes": _trace_bytes(trace),
+                       "bytes_per_event": _trace_bytes(trace) / max(1, events), "peak_alloc_bytes": peak}
+    return result
+
+
+def bench_sampling(app, path):
+    from Main3 import MOVE_STEP_PX
+    result = {"path_nodes": len(path), "numpy": NUMPY_AVAILABLE}
+    for zoom in (1.0, 4.0):
+        app.transform.zoom = zoom
+        app.transform.fit(app.transform.view_w, app.transform.view_h, app.img_w, app.img_h)
+        app.path_sampler = PathSampler(MOVE_STEP_PX, max_items=0)  # sin caché: siempre se muestrea
+        cold = _ms(lambda: app._prepare_move_frames(path))
+        app.path_sampler = PathSampler(MOVE_STEP_PX)
+        app._prepare_move_frames(path)
+        warm = _ms(lambda: app._prepare_move_frames(path))
+        result[f"zoom_{zoom:g}"] = {"samples": len(app._move_frames), "ms": cold, "cached_ms": warm}
+    app.transform.reset()
+    app.transform.fit(app.transform.view_w, app.transform.view_h, app.img_w, app.img_h)
+    return result
+
+
+def bench_canvas(app, trace, path):
+    result = {}
+    t0 = time.perf_counter()
+    app._create_nodes_and_edges()
+    result["create_ms"] = (time.perf_counter() - t0) * 1000.0
+    result["items_full_view"] = len(app.canvas.find_all())
+
+    # pan con zoom: cada fotograma recoloca, crea y borra items en los bordes
+    t = app.transform
+    t.zoom_at(4.0, t.view_w / 2, t.view_h / 2)
+    app._sync_viewport()
+    result["items_zoomed"] = len(app.canvas.find_all())
+    step = max(8, t.view_w // 20)
+    t0 = time.perf_counter()
+    for i in range(CANVAS_FRAMES):
+        t.pan(step if (i // 15) % 2 == 0 else -step, step // 2)
+        app._sync_viewport()
+    elapsed = time.perf_counter() - t0
+    result["pan_frame_ms"] = elapsed * 1000.0 / CANVAS_FRAMES
+    result["pan_frames_per_s"] = CANVAS_FRAMES / max(elapsed, 1e-9)
+
+    # animación de la traza (con el mismo zoom, así en los mapas grandes hay items
+    # dibujados): solo se repintan los que cambian
+    app.renderer.invalidate()
+    trace.path = path
+    cursor = TraceCursor(trace)
+    steps = min(len(trace), TRACE_STEPS)
+    t0 = time.perf_counter()
+    for i in range(steps):
+        app._show_step(cursor, i)
+    elapsed = time.perf_counter() - t0
+    result["trace_steps"] = steps
+    result["trace_step_ms"] = elapsed * 1000.0 / max(1, steps)
+    result["trace_steps_per_s"] = steps / max(elapsed, 1e-9)
+    return result
+
+
+def run_case(name, make_lists, seed=7, log=print):
+    log(f"== {name}")
+    nodes, edges = make_lists()
+    result = {"graph": name, "nodes": len(nodes), "edges": len(edges)}
+    result["build"] = bench_build(nodes, edges)
+    graph = Graph(nodes, edges)
+    del nodes, edges
+    pairs = _queries(graph, seed)
+    log("   búsqueda punto a punto")
+    result["single_pair"] = bench_single_pair(graph, pairs)
+    log("   todos los pares")
+    result["all_pairs"] = bench_all_pairs(graph, seed)
+
+    # la consulta más larga de la muestra se usa para la traza, el muestreo y el canvas
+    routes = [(search(graph, s, t)[1], (s, t)) for s, t in pairs[:10]]
+    path, pair = max(routes, key=lambda r: len(r[0]))
+    log("   traza")
+    result["trace"] = bench_trace(graph, pair)
+
+    canvas, root, backend = _open_canvas(1031, 768)
+    try:
+        app = _headless_app(graph, canvas, 1031, 768)
+        log("   canvas")
+        result["canvas"] = dict(backend=backend, **bench_canvas(app, _record_trace(graph, pair[0], pair[1], MODE_MULT["pie"], "dijkstra"), path))
+        if len(path) >= 2:
+            log("   muestreo")
+            result["sampling"] = bench_sampling(app, path)
+    finally:
+        if root is not None:
+            root.destroy()
+    return result
+
+
+# -----------------------------
+# Comparación entre corridas
+# -----------------------------
+def _metrics(results, prefix=""):
+    """{ruta: valor} de las métricas de tiempo (_ms, _s), memoria (bytes) y ritmo (_per_s)."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}/{key}" if prefix else key
+        if isinstance(value, dict):
+            flat.update(_metrics(value, path))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and (
+                key.endswith(("_ms", "_s", "bytes")) or key in ALGORITHMS):
+            flat[path] = float(value)
+    return flat
+
+
+def compare(old, new, ratio=REGRESSION_RATIO):
+    """Lista de (métrica, antes, ahora) que empeoraron más que ratio."""
+    before = {r["graph"]: _metrics(r) for r in old["results"]}
+    worse = []
+    for r in new["results"]:
+        prev = before.get(r["graph"])
+        if prev is None:
+            continue
+        for path, value in _metrics(r).items():
+            base = prev.get(path)
+            if not base or base <= 0:
+                continue
+            # en las de ritmo (por segundo) lo malo es bajar
+            bad = value < base / ratio if path.endswith("_per_s") else value > base * ratio
+            if bad:
+                worse.append((f"{r['graph']}/{path}", base, value))
+    return worse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento del proyecto Dijkstra")
+    parser.add_argument("--max-edges", type=int, default=SIZES[-1], help="tamaño máximo de los mapas sintéticos")
+    parser.add_argument("--out", default=DEFAULT_OUT, help="archivo JSON de resultados")
+    parser.add_argument("--compare", help="JSON de una corrida anterior para detectar regresiones")
+    parser.add_argument("--ratio", type=float, default=REGRESSION_RATIO, help="cuánto puede empeorar una métrica")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {"date": time.strftime("%Y-%m-%d %H:%M:%S"), "python": platform.python_version(),
+                 "platform": platform.platform(), "numpy": NUMPY_AVAILABLE, "max_edges": args.max_edges},
+        "results": [],
+    }
+    for name, make_lists in cases(args.max_edges):
+        report["results"].append(run_case(name, make_lists))
+        gc.collect()
+
+    folder = os.path.dirname(args.out)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Resultados en {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        worse = compare(old, report, args.ratio)
+        for path, base, value in worse:
+            print(f"REGRESIÓN {path}: {base:.3f} -> {value:.3f}")
+        if worse:
+            return 1
+        print("Sin regresiones")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
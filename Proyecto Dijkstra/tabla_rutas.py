@@ -0,0 +1,98 @@
+import os
+import hashlib
+import pickle
+from array import array
+
+from grafo import MODE_MULT, INF, dijkstra
+
+CACHE_VERSION = 1
+
+# -----------------------------
+# Tabla de rutas de todos los pares
+# -----------------------------
+class RouteTable:
+    """
+    Distancias y siguiente salto para todos los pares de nodos, calculados con los pesos
+    base. Como el modo solo multiplica todos los pesos por el mismo factor, los caminos
+    son iguales para todos los modos y la distancia de un modo es la base * MODE_MULT.
+    dist[s*n + t] es la distancia base y next_hop[s*n + t] el nodo que sigue a s camino a t.
+    """
+    def __init__(self, graph, dist, next_hop):
+        self.graph = graph
+        self.n = len(graph)
+        self.dist = dist
+        self.next_hop = next_hop
+
+    @classmethod
+    def build(cls, graph):
+        n = len(graph)
+        dist = array("d", [INF]) * (n * n)
+        next_hop = array("i", [-1]) * (n * n)
+        for t in range(n):
+            # grafo no dirigido: el padre de s en el árbol con raíz t es el siguiente salto s -> t
+            d, prev = dijkstra(graph, graph.labels[t])
+            for s in range(n):
+                dist[s * n + t] = d[s]
+                next_hop[s * n + t] = prev[s]
+        return cls(graph, dist, next_hop)
+
+    def distance(self, src, dst, mode="pie"):
+        s = self.graph.node_id(src); t = self.graph.node_id(dst)
+        return self.dist[s * self.n + t] * MODE_MULT.get(mode, 1.0)
+
+    def path(self, src, dst):
+        """Camino src -> dst siguiendo la tabla de siguiente salto, O(largo del camino)."""
+        s = self.graph.node_id(src); t = self.graph.node_id(dst)
+        if self.dist[s * self.n + t] == INF:
+            return []
+        path = [self.graph.labels[s]]
+        while s != t:
+            s = self.next_hop[s * self.n + t]
+            path.append(self.graph.labels[s])
+        return path
+
+    def route(self, src, dst, mode="pie"):
+        """(costo, camino) igual que grafo.shortest_path; (inf, []) si no hay camino."""
+        cost = self.distance(src, dst, mode)
+        if cost == INF:
+            return INF, []
+        return cost, self.path(src, dst)
+
+
+def graph_hash(graph):
+    """Huella del grafo (etiquetas y aristas con peso) para invalidar la caché al cambiar el mapa."""
+    h = hashlib.sha1()
+    for label in graph.labels:
+        h.update(label.encode("utf-8")); h.update(b"\0")
+    h.update(array("i", graph.offsets).tobytes())
+    h.update(array("i", graph.targets).tobytes())
+    h.update(array("d", graph.weights).tobytes())
+    return h.hexdigest()
+
+
+def load_route_table(graph, cache_dir):
+    """
+    Carga la tabla desde cache_dir si existe una para este grafo; si no, la calcula y la
+    guarda. Los fallos de lectura/escritura de la caché no son fatales (best-effort).
+    """
+    key = graph_hash(graph)
+    path = os.path.join(cache_dir, f"rutas_{key}.pkl")
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.get("version") == CACHE_VERSION and data.get("hash") == key:
+            return RouteTable(graph, data["dist"], data["next_hop"])
+    except Exception:
+        pass
+
+    table = RouteTable.build(graph)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": CACHE_VERSION, "hash": key,
+                         "dist": table.dist, "next_hop": table.next_hop}, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception:
+        pass
+    return table
@@ -0,0 +1,117 @@
+from array import array
+
+INF = float("inf")
+
+EXPLORE = 0
+RELAX = 1
+FINAL = 2
+
+KEYFRAME_MIN = 64  # eventos mínimos entre fotogramas clave
+KEYFRAME_NODES_PER_EVENT = 16  # con n nodos, un fotograma clave cada n/16 eventos (~150 bytes por evento)
+
+# -----------------------------
+# Traza compacta de pasos de Dijkstra
+# -----------------------------
+class StepTrace:
+    """
+    Traza de eventos codificada por deltas: cada evento guarda solo el nodo (y la
+    distancia nueva en los relax), nunca una copia de dist/visited.
+    Cada `keyframe_every` eventos se guarda un fotograma clave con el estado completo
+    para que TraceCursor pueda saltar a cualquier paso sin reproducir desde el inicio.
+    Por defecto el intervalo crece con el mapa: cada fotograma clave ocupa O(n), así la
+    memoria por evento queda acotada aunque el grafo tenga cientos de miles de nodos.
+    """
+    def __init__(self, labels, src, keyframe_every=None):
+        self.labels = labels
+        self.src = src
+        if keyframe_every is None:
+            keyframe_every = max(KEYFRAME_MIN, len(labels) // KEYFRAME_NODES_PER_EVENT)
+        self.keyframe_every = max(1, int(keyframe_every))
+        self.kinds = array("b")
+        self.us = array("i")
+        self.vs = array("i")
+        self.ds = array("d")
+        self.path = None
+        # estado acumulado mientras se graba (para generar los fotogramas clave)
+        self._dist = array("d", [INF]) * len(labels)
+        # src puede ser una tupla de ids si la búsqueda parte de varios nodos (bidireccional)
+        for s in (src if isinstance(src, tuple) else (src,)):
+            self._dist[s] = 0.0
+        self._visited = bytearray(len(labels))
+        self.keyframes = [(array("d", self._dist), bytes(self._visited))]
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def _push(self, kind, u, v, d):
+        self.kinds.append(kind); self.us.append(u); self.vs.append(v); self.ds.append(d)
+        if len(self.kinds) % self.keyframe_every == 0:
+            self.keyframes.append((array("d", self._dist), bytes(self._visited)))
+
+    def explore(self, u):
+        self._visited[u] = 1
+        self._push(EXPLORE, u, -1, 0.0)
+
+    def relax(self, u, v, d):
+        self._dist[v] = d
+        self._push(RELAX, u, v, d)
+
+    def final(self, path):
+        self.path = path
+        self._push(FINAL, -1, -1, 0.0)
+
+    def event(self, idx):
+        """(tipo, etiqueta u, etiqueta v) del evento idx; las etiquetas ausentes son None."""
+        u = self.us[idx]; v = self.vs[idx]
+        return (self.kinds[idx],
+                self.labels[u] if u >= 0 else None,
+                self.labels[v] if v >= 0 else None)
+
+
+class TraceCursor:
+    """
+    Reproduce una StepTrace. Tras seek(idx) el estado (dist/visited) es el que había
+    justo después del evento idx. Avanzar paso a paso cuesta O(1); los saltos hacia atrás
+    o largos parten del fotograma clave más cercano.
+    `changed` tiene los ids de nodo que cambiaron en el último seek (None = todos).
+    """
+    def __init__(self, trace):
+        self.trace = trace
+        self.dist = None
+        self.visited = None
+        self.pos = 0  # número de eventos ya aplicados
+        self.changed = None
+        self._restore(0)
+
+    def _restore(self, k):
+        dist, visited = self.trace.keyframes[k]
+        self.dist = array("d", dist)
+        self.visited = bytearray(visited)
+        self.pos = k * self.trace.keyframe_every
+        self.changed = None
+
+    def seek(self, idx):
+        tr = self.trace
+        target = min(len(tr), idx + 1)
+        self.changed = set()
+        if target < self.pos or target - self.pos > tr.keyframe_every:
+            self._restore(min(target // tr.keyframe_every, len(tr.keyframes) - 1))
+        kinds = tr.kinds; us = tr.us; vs = tr.vs; ds = tr.ds
+        dist = self.dist; visited = self.visited
+        changed = self.changed
+        for i in range(self.pos, target):
+            k = kinds[i]
+            if k == EXPLORE:
+                visited[us[i]] = 1
+                if changed is not None: changed.add(us[i])
+            elif k == RELAX:
+                dist[vs[i]] = ds[i]
+                if changed is not None: changed.add(vs[i])
+        self.pos = target
+        return tr.event(idx)
+
+    def distance(self, node_id):
+        return self.dist[node_id]
+
+    def is_visited(self, node_id):
+        return bool(self.visited[node_id])
@@ -0,0 +1,195 @@
+import threading
+from collections import deque
+
+from PIL import Image
+
+from recursos import import_cv2
+
+DEFAULT_FPS = 30.0
+
+# -----------------------------
+# Decodificador de video en segundo plano
+# -----------------------------
+class VideoDecoder:
+    """
+    Hilo que lee, convierte a RGB y escala los fotogramas por adelantado en un buffer
+    acotado de (índice, PIL.Image). El hilo de Tk pide el fotograma que toca según el
+    reloj (frame_at) y solo crea/intercambia el PhotoImage. Si la reproducción va por
+    delante del decodificador, los fotogramas atrasados se saltan con cap.grab() sin
+    decodificarlos, así el video no se desfasa de su FPS real.
+    """
+    def __init__(self, path, size, loop=False, buffer_size=6):
+        self.path = path
+        self.loop = loop
+        self.size = (max(1, int(size[0])), max(1, int(size[1])))
+        self.fps = DEFAULT_FPS
+        self.finished = False
+        self._buffer = deque()
+        self._buffer_size = max(1, buffer_size)
+        self._wanted = 0
+        self._cond = threading.Condition()
+        self._stop = False
+        self._eof = False
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def ready(self):
+        """True cuando el hilo abrió el archivo (y fps ya es el real) o no pudo abrirlo."""
+        return self._ready.is_set()
+
+    def set_size(self, w, h):
+        self.size = (max(1, int(w)), max(1, int(h)))
+
+    def stop(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+
+    def frame_at(self, index):
+        """
+        Último fotograma listo con índice <= index (descarta los anteriores), o None si aún
+        no hay ninguno. Avisa al decodificador de la posición para que salte lo atrasado.
+        """
+        with self._cond:
+            self._wanted = max(self._wanted, index)
+            frame = None
+            while self._buffer and self._buffer[0][0] <= index:
+                frame = self._buffer.popleft()[1]
+            self._cond.notify_all()
+            if frame is None and not self._buffer and self._eof:
+                self.finished = True
+            return frame
+
+    def _run(self):
+        # OpenCV se importa aquí, fuera del hilo de Tk y solo cuando se reproduce algo
+        cv2 = import_cv2()
+        cap = cv2.VideoCapture(self.path) if cv2 else None
+        try:
+            if cap is None or not cap.isOpened():
+                return
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            if fps and fps > 1:
+                self.fps = float(fps)
+            self._ready.set()
+            idx = 0
+            while True:
+                with self._cond:
+                    while not self._stop and len(self._buffer) >= self._buffer_size:
+                        self._cond.wait()
+                    if self._stop:
+                        return
+                    behind = idx < self._wanted
+                if behind:
+                    ok = cap.grab()
+                else:
+                    ok, frame = cap.read()
+                if not ok:
+                    if self.loop:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        ok, frame = cap.read()
+                        behind = False
+                    if not ok:
+                        return
+                if not behind:
+                    frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                    frame = cv2.resize(frame, self.size)
+                    img = Image.fromarray(frame)
+                    with self._cond:
+                        self._buffer.append((idx, img))
+                idx += 1
+        finally:
+            self._eof = True
+            self._ready.set()
+            if cap is not None:
+                cap.release()
+
+
+# -----------------------------
+# Clip precargado en memoria
+# -----------------------------
+class ClipCache:
+    """
+    Decodifica un clip entero una sola vez, en un hilo, a una lista de PIL.Image del
+    tamaño pedido. Si el clip completo no cabe en max_bytes a ese tamaño, los
+    fotogramas se reducen lo necesario para caber (se re-escalan al reproducir).
+    ready se activa al terminar; failed indica que no se pudo cachear.
+    """
+    def __init__(self, path, size, max_bytes):
+        self.path = path
+        self.size = (max(1, int(size[0])), max(1, int(size[1])))
+        self.max_bytes = max_bytes
+        self.fps = DEFAULT_FPS
+        self.frames = []
+        self.nbytes = 0
+        self.failed = False
+        self.ready = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def matches(self, path, size):
+        return self.path == path and self.size == size and not self.failed
+
+    def _run(self):
+        cv2 = import_cv2()
+        cap = cv2.VideoCapture(self.path) if cv2 else None
+        try:
+            if cap is None or not cap.isOpened():
+                self.failed = True
+                return
+            fps = cap.get(cv2.CAP_PROP_FPS)
+            if fps and fps > 1:
+                self.fps = float(fps)
+            w, h = self.size
+            count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+            if count > 0 and count * w * h * 3 > self.max_bytes:
+                scale = (self.max_bytes / (count * w * h * 3)) ** 0.5
+                w, h = max(1, int(w * scale)), max(1, int(h * scale))
+            while True:
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+                frame = cv2.resize(frame, (w, h), interpolation=cv2.INTER_AREA)
+                self.nbytes += frame.nbytes
+                if self.nbytes > self.max_bytes:
+                    # FRAME_COUNT no era fiable: mejor reproducir desde el archivo
+                    self.frames = []
+                    self.failed = True
+                    return
+                self.frames.append(Image.fromarray(frame))
+            self.failed = not self.frames
+        finally:
+            if cap is not None:
+                cap.release()
+            self.ready.set()
+
+
+class ClipPlayer:
+    """Reproduce un ClipCache listo con la misma interfaz que VideoDecoder."""
+    def __init__(self, clip):
+        self.clip = clip
+        self.fps = clip.fps
+        self.size = clip.size
+        self.finished = False
+        self.ready = True
+        self._last = -1
+
+    def set_size(self, w, h):
+        self.size = (max(1, int(w)), max(1, int(h)))
+
+    def stop(self):
+        pass
+
+    def frame_at(self, index):
+        frames = self.clip.frames
+        if index >= len(frames):
+            self.finished = True
+            return None
+        if index == self._last:
+            return None
+        self._last = index
+        img = frames[index]
+        if img.size != self.size:
+            img = img.resize(self.size, Image.BILINEAR)
+        return img
@@ -1,7 +1,17 @@
+import re
+import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
-import threading
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from motor_mcd import (ALGORITHMS, ALGORITHM_NAMES, gcd_trace, run_gcd, compare_all, head_tail, verify,
+                       gcd_many, lcm_many, extended_gcd)
+
+# se aceptan enteros de miles de dígitos (Python 3.11+ limita int <-> str por defecto)
+if hasattr(sys, "set_int_max_str_digits"):
+    sys.set_int_max_str_digits(0)
 
 # =========================
 # Config colores / estilos
@@ -14,6 +24,22 @@ ACCENT_B = "#9ecf83"
 ERROR = "#e06c75"
 TEXT = "#e6eef6"
 
+# pausa entre columnas al animar las tablas (ms)
+AUTO_STEP_MS = 350
+MANUAL_STEP_MS = 250
+THREE_PAUSE_MS = 600  # pausa entre las dos tablas de la opción de 3 valores
+# cálculos en hilos de trabajo; el hilo de Tk recoge sus resultados cada POLL_MS
+WORKER_THREADS = 2
+POLL_MS = 30
+DISPATCH_BUDGET_MS = 12  # tiempo máximo por ronda aplicando resultados
+COLUMNS_PER_BATCH = 8    # columnas por lote al dibujar sin animación
+# con más pasos que esto la tabla se resume: primeros y últimos SUMMARY_STEPS
+MAX_TABLE_COLUMNS = 40
+SUMMARY_STEPS = 8
+MAX_CELL_DIGITS = 14  # los números más largos se muestran abreviados
+# con listas largas el selector de pares muestra solo las primeras y últimas combinaciones
+MAX_PAIR_CHOICES = 200
+
 # =========================
 # Animación slide-in para frames
 # =========================
@@ -33,6 +59,203 @@ def slide_in_frame(container, new_frame, direction="right", step=30, delay=8):
         new_frame.after(delay, lambda: anim(x))
     anim(start_x)
 
+# =========================
+# Tabla de pasos (dibujada desde la traza del motor)
+# =========================
+def parse_ints(text):
+    """Enteros de un texto separado por comas, punto y coma, espacios, tabs o saltos de línea (p. ej. pegado de una hoja de cálculo)."""
+    return [int(p) for p in re.split(r"[\s,;]+", text.strip()) if p]
+
+
+def fmt_int(n, max_digits=MAX_CELL_DIGITS):
+    """
+    Entero para mostrar; los muy largos como 123456…789012 (N díg.). No se convierte el
+    número entero a texto (con miles de dígitos str() es cuadrático): solo sus extremos.
+    """
+    sign = "-" if n < 0 else ""
+    n = abs(n)
+    if n < 10 ** max_digits:
+        return sign + str(n)
+    digits = int((n.bit_length() - 1) * 0.30102999566398) + 1
+    if n >= 10 ** digits:
+        digits += 1
+    return f"{sign}{n // 10 ** (digits - 6)}…{n % 10 ** 6:06d} ({digits} díg.)"
+
+
+def trace_table(trace, coefficients=False):
+    """
+    Columnas a dibujar de una traza: (etiquetas, primeras, últimas, omitidas). Con
+    coefficients (solo trazas de Euclides/Lehmer) cada columna lleva una cuarta celda con
+    Bézout. Con más de MAX_TABLE_COLUMNS pasos solo quedan los primeros y últimos
+    SUMMARY_STEPS. Recorre toda la traza, así que se llama desde un hilo de trabajo.
+    """
+    coefficients = coefficients and hasattr(trace, "coefficients")
+    labels = trace.LABELS + ((trace.COEFF_LABEL,) if coefficients else ())
+    if len(trace) > MAX_TABLE_COLUMNS:
+        head, tail, omitted = head_tail(trace, SUMMARY_STEPS, coefficients)
+    else:
+        head, tail, omitted = list(trace.columns(coefficients=True) if coefficients else trace.columns()), [], 0
+    return labels, head, tail, omitted
+
+
+def paint_columns(canvas, table):
+    """
+    Generador que dibuja una columna de la tabla (de trace_table) por cada next(); así el
+    hilo de Tk la dibuja animada o por lotes con after() sin bloquearse.
+    """
+    labels, head, tail, omitted = table
+    colors = (ACCENT_B, "#e5c07b", "#d19a66", "#c678dd")
+    x = 60; colw = 140
+
+    def column(paso, left, cells):
+        # columna de tres celdas (cuatro con Bézout)
+        for i in range(len(cells)):
+            canvas.create_rectangle(x, 50 + i*45, x + colw, 95 + i*45, outline="#555", width=1)
+        canvas.create_text(x + colw/2, 30, text=f"Paso {paso}", font=("Segoe UI", 10, "italic"), fill=ACCENT_A)
+        canvas.create_text(x - 30, 50 + 45 + 22, text=fmt_int(left), font=("Segoe UI", 11, "bold"), fill=ACCENT_A)
+        for i, (label, value) in enumerate(zip(labels, cells)):
+            text = ", ".join(map(fmt_int, value)) if isinstance(value, tuple) else fmt_int(value)
+            canvas.create_text(x + colw/2, 50 + i*45 + 22, text=f"{label}: {text}",
+                               font=("Segoe UI", 11, "bold"), fill=colors[i], width=colw - 6)
+
+    def advance():
+        nonlocal x
+        x += colw + 40
+        canvas.configure(scrollregion=(0, 0, x, int(canvas.cget("height"))))
+
+    for col in head:
+        column(*col)
+        advance()
+        yield
+    if omitted:
+        canvas.create_text(x + colw/2, 50 + 45 + 22, text=f"… {omitted} pasos …",
+                           font=("Segoe UI", 11, "italic"), fill="#9aa8b6")
+        advance()
+        yield
+    for col in tail:
+        column(*col)
+        advance()
+        yield
+
+
+def table_canvas(frame, bg, height):
+    """Canvas de una tabla con su scroll horizontal (las tablas largas no caben en 860 px)."""
+    canvas = tk.Canvas(frame, bg=bg, height=height, width=860, highlightthickness=0)
+    scroll_x = ttk.Scrollbar(frame, orient="horizontal", command=canvas.xview)
+    canvas.configure(xscrollcommand=scroll_x.set)
+    return canvas, scroll_x
+
+# =========================
+# Trabajo en segundo plano
+# =========================
+class UiDispatcher:
+    """
+    Cálculos en un pool de hilos sin que estos toquen Tk: cada submit() guarda su future
+    en la cola de un canal y un after() periódico (hilo de Tk) aplica los terminados, en
+    orden de envío y con un tope de tiempo por ronda. cancel() descarta lo pendiente de
+    un canal (lo que ya corre termina, pero su resultado se ignora).
+    """
+    def __init__(self, root, workers=WORKER_THREADS):
+        self.root = root
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcd")
+        self.pending = {}  # canal -> deque de (future, ready, error)
+        self.root.after(POLL_MS, self._poll)
+
+    def submit(self, channel, work, ready, *args, error=None, replace=False):
+        """work(*args) en un hilo; ready(resultado) o error(excepción) luego en el hilo de Tk."""
+        if replace:
+            self.cancel(channel)
+        fut = self.executor.submit(work, *args)
+        self.pending.setdefault(channel, deque()).append((fut, ready, error))
+        return fut
+
+    def cancel(self, channel):
+        for fut, _, _ in self.pending.pop(channel, ()):
+            fut.cancel()
+
+    def shutdown(self):
+        self.pending.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        deadline = time.perf_counter() + DISPATCH_BUDGET_MS / 1000.0
+        try:
+            for channel, items in list(self.pending.items()):
+                # solo la cabeza de cada canal: los resultados se aplican en orden de envío
+                while items and items[0][0].done() and time.perf_counter() < deadline:
+                    fut, ready, error = items.popleft()
+                    try:
+                        value = fut.result()
+                    except Exception as e:
+                        if error is not None:
+                            error(e)
+                        else:
+                            print("Error en segundo plano:", e)
+                    else:
+                        ready(value)
+                    if self.pending.get(channel) is not items:
+                        break  # el callback canceló o reemplazó el canal
+                if not items and self.pending.get(channel) is items:
+                    del self.pending[channel]
+        finally:
+            self.root.after(POLL_MS, self._poll)
+
+
+_END = object()
+
+
+class TableQueue:
+    """
+    Tablas de un frame, dibujadas de a una (nunca se mezclan columnas de dos tablas):
+    con pausa entre columnas si se anima o por lotes si no. cancel() detiene la tabla
+    en curso y descarta las que esperaban.
+    """
+    def __init__(self, widget):
+        self.widget = widget
+        self.waiting = deque()
+        self.current = None  # (generador de columnas, pausa ms, al terminar)
+        self.job = None
+
+    def add(self, start, step_ms=0, done=None, wait_ms=0):
+        """start() crea la tabla en el hilo de Tk y devuelve su generador de columnas (paint_columns)."""
+        self.waiting.append((start, step_ms, done, wait_ms))
+        if self.current is None and self.job is None:
+            self._next()
+
+    def cancel(self):
+        if self.job is not None:
+            self.widget.after_cancel(self.job)
+        self.job = None
+        self.current = None
+        self.waiting.clear()
+
+    def _next(self):
+        self.job = None
+        if not self.waiting:
+            self.current = None
+            return
+        start, step_ms, done, wait_ms = self.waiting.popleft()
+        if wait_ms:
+            self.current = None
+            self.waiting.appendleft((start, step_ms, done, 0))
+            self.job = self.widget.after(wait_ms, self._next)
+            return
+        self.current = (start(), step_ms, done)
+        self._step()
+
+    def _step(self):
+        self.job = None
+        columns, step_ms, done = self.current
+        for _ in range(1 if step_ms else COLUMNS_PER_BATCH):
+            if next(columns, _END) is _END:
+                self.current = None
+                if done is not None:
+                    done()
+                if self.current is None and self.job is None:
+                    self._next()
+                return
+        self.job = self.widget.after(step_ms or 1, self._step)
+
 # =========================
 # App base
 # =========================
@@ -43,6 +266,9 @@ class MainApp(tk.Tk):
         self.geometry("980x640")
         self.configure(bg=BG_MAIN)
         self.resizable(False, False)
+        # los cálculos van a hilos de trabajo; solo este hilo toca los widgets
+        self.dispatcher = UiDispatcher(self)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         # Contenedor principal
         self.container = tk.Frame(self, bg=BG_MAIN)
@@ -58,6 +284,10 @@ class MainApp(tk.Tk):
         self.current = None
         self.show_frame(MainMenu, animate=False)
 
+    def _on_close(self):
+        self.dispatcher.shutdown()
+        self.destroy()
+
     def show_frame(self, cls, animate=True, direction="right"):
         frame = self.frames[cls]
         if animate and self.current is not None:
@@ -85,7 +315,7 @@ class MainMenu(tk.Frame):
         tk.Button(self, text="⚙️ Método de Euclides", bg="#282c34", fg=ACCENT_A,
                   command=lambda: controller.show_frame(SubMenuEuclides), **btn_style).pack(pady=12)
         tk.Button(self, text="🚪 Salir", bg=ERROR, fg="white",
-                  command=controller.destroy, **btn_style).pack(pady=12)
+                  command=controller._on_close, **btn_style).pack(pady=12)
 
 # =========================
 # Submenu: elegir Automático / Manual
@@ -146,10 +376,25 @@ class EuclidesAutomaticFrame(tk.Frame):
             e.grid(row=i, column=1, padx=6, pady=6)
             self.entries.append(e)
 
-        tk.Label(self.scrollable, text="(Puedes poner los 3 valores separados por comas o espacios)",
+        tk.Label(self.scrollable, text="(Puedes pegar una lista de valores separados por comas, espacios o saltos de línea)",
                  font=("Segoe UI", 9), fg="#9aa8b6", bg=BG_PANEL).pack()
 
-        # area donde aparecerán los botones de opción para 3 valores
+        # algoritmo de las tablas: Euclides clásico, binario (Stein) o Lehmer (números enormes)
+        self.algorithm_var = tk.StringVar(value="euclides")
+        algo_frame = tk.Frame(self.scrollable, bg=BG_PANEL)
+        algo_frame.pack(pady=(6,0))
+        for key in ALGORITHMS:
+            tk.Radiobutton(algo_frame, text=ALGORITHM_NAMES[key], variable=self.algorithm_var, value=key,
+                           bg=BG_PANEL, fg=TEXT, selectcolor=BG_CANVAS, activebackground=BG_PANEL,
+                           activeforeground=TEXT, font=("Segoe UI", 10)).pack(side="left", padx=6)
+
+        # sin animación las tablas se dibujan de una vez (el cálculo nunca espera)
+        self.animate_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(self.scrollable, text="Animar pasos", variable=self.animate_var, bg=BG_PANEL, fg=TEXT,
+                       selectcolor=BG_CANVAS, activebackground=BG_PANEL, activeforeground=TEXT,
+                       font=("Segoe UI", 10)).pack()
+
+        # area donde aparecerán los botones de opción para 3 valores (o el selector de pares para listas)
         self.opts_frame = tk.Frame(self.scrollable, bg=BG_PANEL)
         self.opts_frame.pack()
 
@@ -157,35 +402,56 @@ class EuclidesAutomaticFrame(tk.Frame):
                   font=("Segoe UI", 12, "bold"), command=self.calcular).pack(pady=8)
         tk.Button(self.scrollable, text="🗑 Limpiar", bg=ERROR, fg="white", bd=0,
                   font=("Segoe UI", 12, "bold"), command=self.limpiar).pack(pady=4)
+        tk.Button(self.scrollable, text="⏹ Detener", bg="#4e5663", fg="white", bd=0,
+                  font=("Segoe UI", 10, "bold"), command=self.detener).pack(pady=2)
 
         self.info_lbl = tk.Label(self.scrollable, text="", fg=ERROR, bg=BG_PANEL, font=("Segoe UI", 12))
         self.info_lbl.pack(pady=6)
+        # pasos y tiempo de cada algoritmo para la última operación
+        self.stats_lbl = tk.Label(self.scrollable, text="", fg="#9aa8b6", bg=BG_PANEL, font=("Segoe UI", 9), justify="left")
+        self.stats_lbl.pack()
 
         self.tables = []
+        self.pairs = []  # pares (x, y, mcd) que ofrece el selector de listas
+        self.dispatcher = controller.dispatcher
+        self.table_queue = TableQueue(self)
+
+    def _cancel(self):
+        # descarta cálculos pendientes y detiene la tabla que se está dibujando
+        self.dispatcher.cancel("auto")
+        self.table_queue.cancel()
+
+    def detener(self):
+        self._cancel()
+        self.info_lbl.config(text="Cálculo detenido.", fg=TEXT)
+
+    def _on_error(self, error):
+        self.info_lbl.config(text=f"⚠ {error}", fg=ERROR)
 
     def limpiar(self):
+        self._cancel()
         for e in self.entries:
             e.delete(0, tk.END)
         for t in self.tables:
             t.destroy()
         self.tables.clear()
         self.info_lbl.config(text="")
+        self.stats_lbl.config(text="")
         for w in self.opts_frame.winfo_children():
             w.destroy()
 
     def calcular(self):
+        # una nueva operación reemplaza a la anterior (si seguía calculando o dibujando)
+        self._cancel()
         # limpiar botones previos de opciones si hay
         for w in self.opts_frame.winfo_children():
             w.destroy()
 
-        # parse inputs up to 3 numbers
+        # parse inputs (cualquier cantidad de números)
         try:
-            parts = []
+            nums = []
             for e in self.entries:
-                v = e.get().strip()
-                if v:
-                    parts.extend(v.replace(",", " ").split())
-            nums = [int(p) for p in parts][:3]
+                nums.extend(parse_ints(e.get()))
         except Exception:
             self.info_lbl.config(text="⚠ Solo se permiten números enteros.")
             return
@@ -195,7 +461,11 @@ class EuclidesAutomaticFrame(tk.Frame):
 
         if len(nums) == 2:
             # comportamiento directo con 2 valores
-            threading.Thread(target=self._run_direct, args=(nums[0], nums[1])).start()
+            self._run_direct(nums[0], nums[1])
+        elif len(nums) > 3:
+            # listas: MCD y MCM de todo, y luego se elige qué par de la reducción dibujar
+            self.info_lbl.config(text=f"Calculando MCD y MCM de {len(nums)} valores...", fg=ACCENT_A)
+            self.dispatcher.submit("auto", self._compute_many, self._show_many, nums, error=self._on_error)
         else:
             # si hay 3 valores, mostrar tres botones justo debajo del Calcular con los valores numericos
             a, b, c = nums
@@ -205,55 +475,120 @@ class EuclidesAutomaticFrame(tk.Frame):
             opts = [ (f"{a} y {b}", (a,b,c)), (f"{a} y {c}", (a,c,b)), (f"{b} y {c}", (b,c,a)) ]
             for txt, data in opts:
                 btn = tk.Button(self.opts_frame, text=txt, bg="#4e5663", fg="white", bd=0, width=18, cursor="hand2",
-                                command=lambda d=data: threading.Thread(target=self._start_three, args=(d,)).start())
+                                command=lambda d=data: self._start_three(d))
                 btn.pack(pady=4)
             self.info_lbl.config(text="Selecciona una opción para que el modo automático opere automáticamente.", fg=TEXT)
 
     def _run_direct(self, a, b):
-        self.info_lbl.config(text=f"Calculando MCD({a}, {b})...")
-        m = self._draw_table(a, b)
-        self.info_lbl.config(text=f"🏁 MCD = {m}", fg=ACCENT_B)
+        self.info_lbl.config(text=f"Calculando MCD({fmt_int(a)}, {fmt_int(b)})...", fg=ACCENT_A)
+        self._draw_table(a, b, done=lambda m: self.info_lbl.config(text=f"🏁 MCD = {fmt_int(m)}", fg=ACCENT_B))
 
     def _start_three(self, data):
         # data is (a,b,c) where a and b are to be used first, c remaining
+        self._cancel()
+        a, b, c = data
+        self.info_lbl.config(text=f"Calculando MCD({fmt_int(a)}, {fmt_int(b)})...", fg=ACCENT_A)
+        self.dispatcher.submit("auto", self._compute_three, self._show_three, data, self.algorithm_var.get(),
+                               error=self._on_error)
+
+    def _compute_three(self, data, algorithm):
+        # hilo de trabajo: las dos tablas de una vez (la segunda usa el MCD de la primera)
         a, b, c = data
-        self.info_lbl.config(text=f"Calculando MCD({a}, {b})...", fg=ACCENT_A)
-        m1 = self._draw_table(a, b)
-        time.sleep(0.6)
-        self.info_lbl.config(text=f"Calculando MCD({m1}, {c})...", fg=ACCENT_A)
-        m2 = self._draw_table(m1, c)
-        self.info_lbl.config(text=f"🏁 MCD Final = {m2}", fg=ACCENT_B)
-
-    def _draw_table(self, a, b):
+        first = self._compute_table(a, b, algorithm)
+        return first, self._compute_table(first[3].gcd, c, algorithm)
+
+    def _show_three(self, jobs):
+        first, second = jobs
+        m1 = first[3].gcd
+        self._add_table(first, done=lambda: self.info_lbl.config(
+            text=f"Calculando MCD({fmt_int(m1)}, {fmt_int(second[1])})...", fg=ACCENT_A))
+        self._add_table(second, done=lambda: self.info_lbl.config(
+            text=f"🏁 MCD Final = {fmt_int(second[3].gcd)}", fg=ACCENT_B), wait_ms=THREE_PAUSE_MS)
+
+    def _compute_many(self, nums):
+        return nums, gcd_many(nums), lcm_many(nums)
+
+    def _show_many(self, job):
+        nums, result, lcm = job
+        self.info_lbl.config(text=f"🏁 MCD de {len(nums)} valores = {fmt_int(result.gcd)} · MCM = {fmt_int(lcm)}", fg=ACCENT_B)
+        note = " (se detuvo al llegar a 1)" if result.early_exit else ""
+        self.stats_lbl.config(text=f"{result.combined} de {result.total} combinaciones en {result.elapsed * 1000:.2f} ms{note}")
+        self._show_pairs(result.pairs)
+
+    def _show_pairs(self, pairs):
+        # selector con los pares combinados; con muchos, los primeros y los últimos (los más altos del árbol)
+        if len(pairs) > MAX_PAIR_CHOICES:
+            half = MAX_PAIR_CHOICES // 2
+            pairs = pairs[:half] + pairs[-half:]
+        self.pairs = pairs
+        tk.Label(self.opts_frame, text="Elige el par cuya tabla quieres ver:", fg=ACCENT_B, bg=BG_PANEL,
+                 font=("Segoe UI", 11, "bold")).pack(pady=(6,2))
+        choice = ttk.Combobox(self.opts_frame, state="readonly", width=48,
+                              values=[f"MCD({fmt_int(x)}, {fmt_int(y)}) = {fmt_int(g)}" for x, y, g in pairs])
+        choice.current(len(pairs) - 1)
+        choice.pack(pady=4)
+
+        def show():
+            x, y, _ = self.pairs[choice.current()]
+            self._run_direct(x, y)
+        tk.Button(self.opts_frame, text="Ver tabla", bg="#4e5663", fg="white", bd=0, width=18, cursor="hand2",
+                  command=show).pack(pady=4)
+
+    def _show_stats(self, a, b, runs):
+        # los tres algoritmos sin traza: solo pasos y tiempo, para comparar
+        parts = [f"{ALGORITHM_NAMES[r.algorithm]}: {r.steps} pasos ({r.elapsed * 1000:.2f} ms)" for r in runs]
+        self.stats_lbl.config(text=f"MCD({fmt_int(a)}, {fmt_int(b)}) — " + " · ".join(parts))
+
+    @staticmethod
+    def _compute_table(a, b, algorithm):
+        """
+        Hilo de trabajo: traza (comprobada), Bézout, columnas a dibujar y comparación de
+        algoritmos. No toca widgets; _add_table dibuja el resultado en el hilo de Tk.
+        """
+        result = run_gcd(a, b, algorithm)
+        trace = result.trace
+        if not verify(trace):
+            raise ValueError(f"Traza inconsistente para MCD({a}, {b})")
+        coefficients = algorithm != "binario"
+        bezout = extended_gcd(a, b, trace) if coefficients else None
+        return a, b, algorithm, result, bezout, trace_table(trace, coefficients), compare_all(a, b)
+
+    def _draw_table(self, a, b, done=None):
         """
         Dibuja tabla exactamente como se requiere para el modo Automático.
-        Esta función está diseñada para ser llamada desde otras partes del programa.
+        Esta función está diseñada para ser llamada desde otras partes del programa (solo
+        desde el hilo de Tk): calcula en segundo plano y encola la tabla detrás de las que
+        ya se están dibujando. done(mcd) se llama al terminar de dibujarla.
         """
-        frame = tk.Frame(self.scrollable, bg=BG_PANEL)
-        frame.pack(pady=14, fill="x")
-        self.tables.append(frame)
-        tk.Label(frame, text=f"Operación: MCD({a}, {b})", fg=ACCENT_A, bg=BG_PANEL, font=("Segoe UI", 12, "bold")).pack(anchor="w", padx=10)
-        canvas = tk.Canvas(frame, bg=BG_CANVAS, height=220, width=860, highlightthickness=0)
-        canvas.pack(fill="x", padx=12, pady=6)
-        paso = 0; x = 60; colw = 140
-        # Dibujar mientras b != 0; cada iteración dibuja la columna correspondiente (incluye el paso que produce residuo 0)
-        while b != 0:
-            paso += 1
-            q = a // b
-            r = a % b
-            # three-cell column
-            for i in range(3):
-                canvas.create_rectangle(x, 50 + i*45, x + colw, 95 + i*45, outline="#555", width=1)
-            canvas.create_text(x + colw/2, 30, text=f"Paso {paso}", font=("Segoe UI", 10, "italic"), fill=ACCENT_A)
-            canvas.create_text(x - 30, 50 + 45 + 22, text=str(a), font=("Segoe UI", 11, "bold"), fill=ACCENT_A)
-            canvas.create_text(x + colw/2, 50 + 22, text=f"Cociente: {q}", font=("Segoe UI", 11, "bold"), fill=ACCENT_B)
-            canvas.create_text(x + colw/2, 50 + 45 + 22, text=f"Divisor: {b}", font=("Segoe UI", 11, "bold"), fill="#e5c07b")
-            canvas.create_text(x + colw/2, 50 + 90 + 22, text=f"Residuo: {r}", font=("Segoe UI", 11, "bold"), fill="#d19a66")
-            a, b = b, r
-            canvas.update()
-            time.sleep(0.35)
-            x += colw + 40
-        return a
+        def ready(job):
+            self._add_table(job, done=(lambda: done(job[3].gcd)) if done else None)
+        self.dispatcher.submit("auto", self._compute_table, ready, a, b, self.algorithm_var.get(), error=self._on_error)
+
+    def _add_table(self, job, done=None, wait_ms=0):
+        a, b, algorithm, result, bezout, table, runs = job
+
+        def start():
+            frame = tk.Frame(self.scrollable, bg=BG_PANEL)
+            frame.pack(pady=14, fill="x")
+            self.tables.append(frame)
+            tk.Label(frame, text=f"Operación: MCD({fmt_int(a)}, {fmt_int(b)}) — {ALGORITHM_NAMES[algorithm]}: "
+                                 f"{result.steps} pasos en {result.elapsed * 1000:.2f} ms",
+                     fg=ACCENT_A, bg=BG_PANEL, font=("Segoe UI", 12, "bold")).pack(anchor="w", padx=10)
+            if bezout is not None:
+                # Bézout sale de los mismos cocientes; cada celda cumple residuo = s*|a| + t*|b|
+                g, x, y = bezout
+                tk.Label(frame, text=f"Bézout: ({fmt_int(x)})·{fmt_int(a)} + ({fmt_int(y)})·{fmt_int(b)} = {fmt_int(g)}",
+                         fg="#c678dd", bg=BG_PANEL, font=("Segoe UI", 10)).pack(anchor="w", padx=10)
+            if table[3]:
+                tk.Label(frame, text=f"Tabla resumida: primeros y últimos {SUMMARY_STEPS} de {len(result.trace)} pasos",
+                         fg="#9aa8b6", bg=BG_PANEL, font=("Segoe UI", 9)).pack(anchor="w", padx=10)
+            canvas, scroll_x = table_canvas(frame, BG_CANVAS, 265 if bezout is not None else 220)
+            canvas.pack(fill="x", padx=12, pady=(6,0))
+            scroll_x.pack(fill="x", padx=12, pady=(0,6))
+            self._show_stats(a, b, runs)
+            # una columna por paso (en Euclides incluye el paso que produce residuo 0)
+            return paint_columns(canvas, table)
+        self.table_queue.add(start, AUTO_STEP_MS if self.animate_var.get() else 0, done, wait_ms)
 
 # =========================
 # Euclides Manual Frame
@@ -327,19 +662,18 @@ class EuclidesManualFrame(tk.Frame):
 
         # internal state
         self.steps = []  # lista de (D,S,q,r)
+        self.dispatcher = controller.dispatcher
+        self.table_queue = TableQueue(self)
 
     def check_and_go_automatic(self):
         """
         Valida entradas A/B/(C opcional). Si A y B (al menos) están bien,
         rellena las entradas del frame Automático y navega a él.
         """
-        parts = []
-        for e in (self.e_a, self.e_b, self.e_c):
-            v = e.get().strip()
-            if v:
-                parts.extend(v.replace(",", " ").split())
         try:
-            nums = [int(p) for p in parts]
+            nums = []
+            for e in (self.e_a, self.e_b, self.e_c):
+                nums.extend(parse_ints(e.get()))
         except Exception:
             messagebox.showwarning("Entrada inválida", "Solo se permiten enteros en A,B,C.")
             return
@@ -348,22 +682,18 @@ class EuclidesManualFrame(tk.Frame):
             messagebox.showwarning("Datos insuficientes", "Debes ingresar al menos A y B para comprobar en modo automático.")
             return
 
-        # prefill Automatic frame entries (0..2)
         auto_frame = self.controller.frames[EuclidesAutomaticFrame]
-        # clear previous
-        for e in auto_frame.entries:
-            e.delete(0, tk.END)
-        # insert values (up to 3)
-        for i, val in enumerate(nums[:3]):
-            if i < len(auto_frame.entries):
-                auto_frame.entries[i].insert(0, str(val))
-
-        # ensure any previous option buttons in automatic are removed
+        # remove previous tables/option buttons (also clears the entries)
         try:
             auto_frame.limpiar()
         except Exception:
             pass
 
+        # prefill Automatic frame entries: A, B and the rest of the list in C
+        auto_frame.entries[0].insert(0, str(nums[0]))
+        auto_frame.entries[1].insert(0, str(nums[1]))
+        auto_frame.entries[2].insert(0, ", ".join(map(str, nums[2:])))
+
         # show automatic frame
         self.controller.show_frame(EuclidesAutomaticFrame, animate=True, direction="right")
 
@@ -404,42 +734,33 @@ class EuclidesManualFrame(tk.Frame):
             pass
 
     def _create_table_visual(self, a, b, add_import_button=False, import_target=None):
-        frame = tk.Frame(self.steps_container, bg=BG_CANVAS)
-        frame.pack(pady=10, fill="x")
-        tk.Label(frame, text=f"Operación: MCD({a}, {b})", fg=ACCENT_A, bg=BG_CANVAS, font=("Segoe UI", 12, "bold")).pack(anchor="w", padx=6)
-        canvas = tk.Canvas(frame, bg=BG_CANVAS, height=200, width=860, highlightthickness=0)
-        canvas.pack(fill="x", padx=6, pady=6)
-        paso = 0; x = 60; colw = 140
-        while b != 0:
-            paso += 1
-            q = a // b
-            r = a % b
-            for i in range(3):
-                canvas.create_rectangle(x, 50 + i*45, x + colw, 95 + i*45, outline="#555", width=1)
-            canvas.create_text(x + colw/2, 30, text=f"Paso {paso}", font=("Segoe UI", 10, "italic"), fill=ACCENT_A)
-            canvas.create_text(x - 30, 50 + 45 + 22, text=str(a), font=("Segoe UI", 11, "bold"), fill=ACCENT_A)
-            canvas.create_text(x + colw/2, 50 + 22, text=f"Cociente: {q}", font=("Segoe UI", 11, "bold"), fill=ACCENT_B)
-            canvas.create_text(x + colw/2, 50 + 45 + 22, text=f"Divisor: {b}", font=("Segoe UI", 11, "bold"), fill="#e5c07b")
-            canvas.create_text(x + colw/2, 50 + 90 + 22, text=f"Residuo: {r}", font=("Segoe UI", 11, "bold"), fill="#d19a66")
-            a, b = b, r
-            canvas.update()
-            time.sleep(0.25)
-            x += colw + 40
-        m = a
-        # add import button if requested (bottom-right of the table frame)
-        if add_import_button and import_target is not None:
-            m_val, next_c = import_target
-            def do_import():
-                try:
-                    app = self.controller
-                    auto_frame = app.frames[EuclidesAutomaticFrame]
-                    threading.Thread(target=lambda: auto_frame._draw_table(m_val, next_c)).start()
-                except Exception as e:
-                    print("Error importando desde manual:", e)
-            btn = tk.Button(frame, text="Importar esta", bg=ACCENT_B, fg="#242830", bd=0, cursor="hand2",
-                            font=("Segoe UI", 10, "bold"), command=do_import)
-            btn.pack(side="right", padx=10, pady=6)
-        return m
+        # la traza se calcula en un hilo de trabajo; la tabla se dibuja después en el hilo de Tk
+        self.dispatcher.submit("manual", lambda: trace_table(gcd_trace(a, b)),
+                               lambda table: self._add_table_visual(a, b, table, add_import_button, import_target))
+
+    def _add_table_visual(self, a, b, table, add_import_button, import_target):
+        def start():
+            frame = tk.Frame(self.steps_container, bg=BG_CANVAS)
+            frame.pack(pady=10, fill="x")
+            tk.Label(frame, text=f"Operación: MCD({fmt_int(a)}, {fmt_int(b)})", fg=ACCENT_A, bg=BG_CANVAS, font=("Segoe UI", 12, "bold")).pack(anchor="w", padx=6)
+            canvas, scroll_x = table_canvas(frame, BG_CANVAS, 200)
+            canvas.pack(fill="x", padx=6, pady=(6,0))
+            scroll_x.pack(fill="x", padx=6, pady=(0,6))
+            # add import button if requested (bottom-right of the table frame)
+            if add_import_button and import_target is not None:
+                m_val, next_c = import_target
+                def do_import():
+                    try:
+                        app = self.controller
+                        auto_frame = app.frames[EuclidesAutomaticFrame]
+                        auto_frame._draw_table(m_val, next_c)
+                    except Exception as e:
+                        print("Error importando desde manual:", e)
+                btn = tk.Button(frame, text="Importar esta", bg=ACCENT_B, fg="#242830", bd=0, cursor="hand2",
+                                font=("Segoe UI", 10, "bold"), command=do_import)
+                btn.pack(side="right", padx=10, pady=6)
+            return paint_columns(canvas, table)
+        self.table_queue.add(start, MANUAL_STEP_MS)
 
     def go_to_automatic(self):
         self.controller.show_frame(EuclidesAutomaticFrame, animate=True, direction="right")
@@ -459,6 +780,8 @@ class EuclidesManualFrame(tk.Frame):
             self.msg_label.config(text="❌ Hay errores en los pasos.", fg=ERROR)
 
     def clear_all(self):
+        self.dispatcher.cancel("manual")
+        self.table_queue.cancel()
         self.e_a.delete(0, tk.END)
         self.e_b.delete(0, tk.END)
         self.e_c.delete(0, tk.END)
@@ -730,9 +1053,9 @@ class SpecialCasitaPopup(tk.Toplevel):
                 except:
                     ctxt = None
                 if ctxt is not None:
-                    threading.Thread(target=lambda: self._import_mcd_final(S, ctxt)).start()
+                    self._import_mcd_final(S, ctxt)
                     return
-            threading.Thread(target=lambda: self._import_to_automatic(D, S, q, r)).start()
+            self._import_to_automatic(D, S, q, r)
 
         btn = tk.Button(self.result_frame, text="📥 Importar", bg=ACCENT_B, fg="#242830", bd=0,
                         font=("Segoe UI", 10, "bold"), cursor="hand2", command=import_action)
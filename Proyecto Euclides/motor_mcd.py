@@ -0,0 +1,486 @@
+import os
+import math
+import multiprocessing
+import time
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+ALGORITHMS = ("euclides", "binario", "lehmer")
+ALGORITHM_NAMES = {"euclides": "Euclides", "binario": "Binario (Stein)", "lehmer": "Lehmer"}
+LEHMER_WORD_BITS = 62  # bits de los "dígitos" iniciales con los que Lehmer adivina cocientes
+# listas a partir de las cuales la reducción N-aria se reparte entre procesos
+PARALLEL_MIN_VALUES = 4096
+PARALLEL_MIN_BITS = 1 << 21
+CHUNKS_PER_WORKER = 4
+
+# =========================
+# Motor del MCD (sin interfaz)
+# =========================
+class EuclidTrace:
+    """
+    Traza del algoritmo de Euclides para MCD(a, b). Solo se guardan los cocientes:
+    dividendo, divisor y residuo de cada paso se reconstruyen al recorrerla
+    (r = D - S*q), así la traza ocupa poco aunque los números sean enormes.
+    El MCD se calcula sobre los valores absolutos. Los coeficientes de Bézout también
+    salen de los cocientes (Euclides extendido), sin repetir las divisiones.
+    """
+    __slots__ = ("a", "b", "quotients", "gcd")
+    LABELS = ("Cociente", "Divisor", "Residuo")
+    COEFF_LABEL = "Bézout (s, t)"
+
+    def __init__(self, a, b, quotients, gcd):
+        self.a = a
+        self.b = b
+        self.quotients = quotients
+        self.gcd = gcd
+
+    def __len__(self):
+        return len(self.quotients)
+
+    def steps(self):
+        """(paso, dividendo, divisor, cociente, residuo) de cada división, en orden."""
+        a, b = self.a, self.b
+        for i, q in enumerate(self.quotients, 1):
+            r = a - b * q
+            yield i, a, b, q, r
+            a, b = b, r
+
+    def coefficients(self):
+        """(s, t) del residuo de cada paso: r = s*a + t*b."""
+        s0, t0, s1, t1 = 1, 0, 0, 1
+        for q in self.quotients:
+            s0, t0, s1, t1 = s1, t1, s0 - q * s1, t0 - q * t1
+            yield s1, t1
+
+    def bezout(self):
+        """(x, y) con a*x + b*y = MCD: los coeficientes del último residuo no nulo."""
+        s0, t0, s1, t1 = 1, 0, 0, 1
+        for q in self.quotients:
+            s0, t0, s1, t1 = s1, t1, s0 - q * s1, t0 - q * t1
+        return s0, t0
+
+    def columns(self, coefficients=False):
+        """
+        (paso, número de la izquierda, celdas según LABELS) para dibujar la tabla; con
+        coefficients se añade una cuarta celda con los (s, t) del residuo.
+        """
+        if coefficients:
+            for (i, a, b, q, r), st in zip(self.steps(), self.coefficients()):
+                yield i, a, (q, b, r, st)
+        else:
+            for i, a, b, q, r in self.steps():
+                yield i, a, (q, b, r)
+
+
+class SteinTrace:
+    """
+    Traza del MCD binario (Stein). Tras quitar el factor 2^shift común y los doses de u,
+    cada paso quita los doses de v, deja en u el menor y resta: v = v - u. Se guarda
+    por paso solo cuántos doses se quitaron y si hubo intercambio (en un array).
+    """
+    __slots__ = ("a", "b", "shift", "u", "v", "ops", "gcd")
+    LABELS = ("Doses quitados", "Menor", "Diferencia")
+
+    def __init__(self, a, b, shift, u, v, ops, gcd):
+        self.a = a
+        self.b = b
+        self.shift = shift
+        self.u = u
+        self.v = v
+        self.ops = ops  # 2*k + (1 si hubo intercambio)
+        self.gcd = gcd
+
+    def __len__(self):
+        return len(self.ops)
+
+    def columns(self):
+        u, v = self.u, self.v
+        for i, op in enumerate(self.ops, 1):
+            k, swapped = op >> 1, op & 1
+            v >>= k
+            if swapped:
+                u, v = v, u
+            left = v
+            v -= u
+            yield i, left, (k, u, v)
+
+
+class GcdRun:
+    """Resultado de una corrida: MCD, pasos del algoritmo, tiempo (s) y traza (o None)."""
+    __slots__ = ("algorithm", "gcd", "steps", "elapsed", "trace")
+
+    def __init__(self, algorithm, gcd, steps, elapsed, trace):
+        self.algorithm = algorithm
+        self.gcd = gcd
+        self.steps = steps
+        self.elapsed = elapsed
+        self.trace = trace
+
+
+def gcd_trace(a, b):
+    """EuclidTrace de MCD(a, b): una división por paso hasta que el residuo es 0."""
+    a, b = abs(a), abs(b)
+    quotients = []
+    x, y = a, b
+    while y:
+        q, r = divmod(x, y)
+        quotients.append(q)
+        x, y = y, r
+    return EuclidTrace(a, b, quotients, x)
+
+
+def gcd(a, b):
+    """Camino rápido: solo el resultado, sin traza."""
+    return math.gcd(a, b)
+
+
+def extended_gcd(a, b, trace=None):
+    """(MCD, x, y) con a*x + b*y = MCD respetando los signos; reutiliza la traza si se pasa."""
+    if trace is None:
+        trace = gcd_trace(a, b)
+    x, y = trace.bezout()
+    return trace.gcd, (-x if a < 0 else x), (-y if b < 0 else y)
+
+
+def stein_trace(a, b, record=True):
+    """(SteinTrace o None, pasos, MCD) del algoritmo binario."""
+    a, b = abs(a), abs(b)
+    if a == 0 or b == 0:
+        g = a | b
+        return (SteinTrace(a, b, 0, g, 0, array("L"), g) if record else None), 0, g
+    both = a | b
+    shift = (both & -both).bit_length() - 1
+    u = a >> shift
+    v = b >> shift
+    u >>= (u & -u).bit_length() - 1
+    start = (u, v)
+    ops = array("L") if record else None
+    steps = 0
+    while v:
+        k = (v & -v).bit_length() - 1
+        v >>= k
+        swapped = u > v
+        if swapped:
+            u, v = v, u
+        v -= u
+        steps += 1
+        if record:
+            ops.append(2 * k + swapped)
+    g = u << shift
+    trace = SteinTrace(a, b, shift, start[0], start[1], ops, g) if record else None
+    return trace, steps, g
+
+
+def lehmer_trace(a, b, record=True):
+    """
+    (EuclidTrace o None, pasos, MCD) con el método de Lehmer; cada paso es una
+    actualización multiprecisión (o una división de la fase final, ya con números chicos):
+    los cocientes se adivinan con los primeros LEHMER_WORD_BITS bits de a y b y solo se
+    aceptan si ambos extremos del intervalo dan el mismo (Knuth, algoritmo L); así varias
+    divisiones se aplican de una vez con una combinación lineal. Los cocientes son los
+    mismos que los de Euclides, así que la traza es una EuclidTrace.
+    """
+    a, b = abs(a), abs(b)
+    orig = (a, b)
+    quotients = [] if record else None
+    updates = 0
+    if a < b:
+        # Euclides también empieza con un paso de cociente 0 que solo intercambia
+        if record:
+            quotients.append(0)
+        a, b = b, a
+        updates += 1
+    while b.bit_length() > LEHMER_WORD_BITS:
+        shift = a.bit_length() - LEHMER_WORD_BITS
+        x = a >> shift
+        y = b >> shift
+        A, B, C, D = 1, 0, 0, 1
+        guessed = []
+        while y + C != 0 and y + D != 0:
+            q = (x + A) // (y + C)
+            if q != (x + B) // (y + D):
+                break
+            guessed.append(q)
+            A, C = C, A - q * C
+            B, D = D, B - q * D
+            x, y = y, x - q * y
+        if B == 0:
+            # no se pudo adivinar ningún cociente: una división multiprecisión normal
+            q, r = divmod(a, b)
+            guessed = [q]
+            a, b = b, r
+        else:
+            a, b = A * a + B * b, C * a + D * b
+        if record:
+            quotients.extend(guessed)
+        updates += 1
+    # lo que queda cabe en una palabra: Euclides normal
+    while b:
+        q, r = divmod(a, b)
+        if record:
+            quotients.append(q)
+        a, b = b, r
+        updates += 1
+    trace = EuclidTrace(orig[0], orig[1], quotients, a) if record else None
+    return trace, updates, a
+
+
+def run_gcd(a, b, algorithm="euclides", record=True):
+    """GcdRun de MCD(a, b) con el algoritmo elegido (uno de ALGORITHMS)."""
+    t0 = time.perf_counter()
+    if algorithm == "euclides":
+        if record:
+            trace = gcd_trace(a, b)
+            steps, g = len(trace), trace.gcd
+        else:
+            trace = None
+            steps = 0
+            x, y = abs(a), abs(b)
+            while y:
+                x, y = y, x % y
+                steps += 1
+            g = x
+    elif algorithm == "binario":
+        trace, steps, g = stein_trace(a, b, record)
+    elif algorithm == "lehmer":
+        trace, steps, g = lehmer_trace(a, b, record)
+    else:
+        raise ValueError(f"Algoritmo desconocido: {algorithm}")
+    return GcdRun(algorithm, g, steps, time.perf_counter() - t0, trace)
+
+
+def compare_all(a, b):
+    """GcdRun de cada algoritmo sin traza (pasos y tiempo, para comparar)."""
+    return [run_gcd(a, b, alg, record=False) for alg in ALGORITHMS]
+
+
+def head_tail(trace, n, coefficients=False):
+    """(primeras n columnas, últimas n, columnas omitidas entre ambas) de la traza."""
+    total = len(trace)
+    columns = trace.columns(coefficients=True) if coefficients else trace.columns()
+    if total <= 2 * n:
+        return list(columns), [], 0
+    head = []
+    tail = deque(maxlen=n)
+    for col in columns:
+        if len(head) < n:
+            head.append(col)
+        else:
+            tail.append(col)
+    return head, list(tail), total - 2 * n
+
+
+def verify(trace):
+    """
+    True si la traza es coherente y el MCD divide a ambos números. Euclides: cada paso
+    cumple D = S*q + r con 0 <= r < S. Binario: las restas nunca son negativas y la
+    última deja 0 con el MCD (sin el factor 2^shift) como menor.
+    """
+    g = trace.gcd
+    if isinstance(trace, SteinTrace):
+        u = trace.u
+        diff = trace.v
+        for _, _, (_, u, diff) in trace.columns():
+            if diff < 0:
+                return False
+        if diff != 0 or (u << trace.shift) != g:
+            return False
+        return (trace.a == 0 and trace.b == 0) or (g > 0 and trace.a % g == 0 and trace.b % g == 0)
+    last = trace.a
+    for _, D, S, q, r in trace.steps():
+        if D != S * q + r or not 0 <= r < S:
+            return False
+        last = S
+    if last != g:
+        return False
+    return (trace.a == 0 and trace.b == 0) or (g > 0 and trace.a % g == 0 and trace.b % g == 0)
+
+
+# =========================
+# Inversos modulares
+# =========================
+def mod_inverse(a, m):
+    """Inverso de a módulo m (m > 1) con los coeficientes de Bézout; ValueError si MCD(a, m) != 1."""
+    if m <= 1:
+        raise ValueError("El módulo debe ser mayor que 1")
+    trace = gcd_trace(a % m, m)
+    if trace.gcd != 1:
+        raise ValueError(f"{a} no tiene inverso módulo {m} (MCD = {trace.gcd})")
+    x, _ = trace.bezout()
+    return x % m
+
+
+def _prefix_products(values, m):
+    prefix = []
+    acc = 1
+    for v in values:
+        acc = acc * v % m
+        prefix.append(acc)
+    return prefix
+
+
+def mod_inverse_many(values, m):
+    """
+    Inversos de muchos valores con el mismo módulo (truco de Montgomery): productos
+    acumulados, un solo inverso con Euclides extendido y vuelta atrás multiplicando,
+    en vez de un Euclides por valor. Los valores sin inverso quedan como None.
+    """
+    if m <= 1:
+        raise ValueError("El módulo debe ser mayor que 1")
+    values = [v % m for v in values]
+    inverses = [None] * len(values)
+    index = list(range(len(values)))
+    prefix = _prefix_products(values, m)
+    if prefix and math.gcd(prefix[-1], m) != 1:
+        # algún valor comparte factor con m: se invierten solo los demás
+        index = [i for i, v in enumerate(values) if math.gcd(v, m) == 1]
+        prefix = _prefix_products([values[i] for i in index], m)
+    if not index:
+        return inverses
+    inv = mod_inverse(prefix[-1], m)  # inverso del producto de todos
+    for k in range(len(index) - 1, 0, -1):
+        i = index[k]
+        inverses[i] = inv * prefix[k - 1] % m
+        inv = inv * values[i] % m
+    inverses[index[0]] = inv
+    return inverses
+
+
+# =========================
+# MCD / MCM de listas (reducción en árbol)
+# =========================
+class NaryResult:
+    """
+    MCD de una lista: valor, pares combinados (x, y, mcd) en el orden de la reducción
+    (None si no se pidieron), combinaciones hechas de las N-1 posibles, si se cortó al
+    llegar a 1 y tiempo (s).
+    """
+    __slots__ = ("gcd", "pairs", "combined", "total", "early_exit", "elapsed")
+
+    def __init__(self, gcd, pairs, combined, total, early_exit, elapsed):
+        self.gcd = gcd
+        self.pairs = pairs
+        self.combined = combined
+        self.total = total
+        self.early_exit = early_exit
+        self.elapsed = elapsed
+
+
+def _tree_gcd(values, record):
+    # árbol balanceado: se combinan vecinos nivel a nivel; un mcd de 1 corta todo
+    pairs = [] if record else None
+    combined = 0
+    level = [abs(v) for v in values]
+    while len(level) > 1:
+        nxt = []
+        for i in range(0, len(level) - 1, 2):
+            x, y = level[i], level[i + 1]
+            g = math.gcd(x, y)
+            combined += 1
+            if record:
+                pairs.append((x, y, g))
+            if g == 1:
+                return 1, pairs, combined, True
+            nxt.append(g)
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return (level[0] if level else 0), pairs, combined, False
+
+
+def _tree_lcm(values):
+    level = [abs(v) for v in values]
+    if 0 in level:
+        return 0
+    while len(level) > 1:
+        nxt = [x // math.gcd(x, y) * y for x, y in zip(level[0::2], level[1::2])]
+        if len(level) % 2:
+            nxt.append(level[-1])
+        level = nxt
+    return level[0] if level else 1
+
+
+def _pool_size(values, workers):
+    # el pool solo compensa con listas grandes (arrancar procesos y copiar los números cuesta)
+    if workers is None:
+        workers = os.cpu_count() or 1
+        if len(values) < PARALLEL_MIN_VALUES and sum(v.bit_length() for v in values) < PARALLEL_MIN_BITS:
+            return 0
+    return workers if workers > 1 else 0
+
+
+def _process_pool(workers):
+    # spawn: se llama desde hilos de una app Tk viva y fork copiaría ese estado a medias
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def _stop_pool(pool):
+    # sin esperar ni dejar trabajando a los tramos que ya corren (3.11 no tiene terminate_workers)
+    processes = list((getattr(pool, "_processes", None) or {}).values())
+    pool.shutdown(wait=False, cancel_futures=True)
+    for proc in processes:
+        proc.terminate()
+
+
+def _chunks(values, workers):
+    size = max(1, -(-len(values) // (workers * CHUNKS_PER_WORKER)))
+    return [values[i:i + size] for i in range(0, len(values), size)]
+
+
+def gcd_many(values, record=True, workers=None):
+    """
+    NaryResult del MCD de toda la lista. Con listas grandes cada proceso reduce un
+    tramo y los resultados se combinan con el mismo árbol; en cuanto un tramo llega a 1
+    se cancelan los demás. workers=0 fuerza el cálculo en este proceso.
+    """
+    values = list(values)
+    total = max(0, len(values) - 1)
+    t0 = time.perf_counter()
+    workers = _pool_size(values, workers)
+    if workers:
+        try:
+            partials = {}
+            pairs = [] if record else None
+            combined = 0
+            pool = _process_pool(workers)
+            try:
+                futures = {pool.submit(_tree_gcd, chunk, record): i for i, chunk in enumerate(_chunks(values, workers))}
+                for fut in as_completed(futures):
+                    g, chunk_pairs, count, early = fut.result()
+                    partials[futures[fut]] = (g, chunk_pairs)
+                    combined += count
+                    if early:
+                        # los tramos que siguen corriendo ya no importan
+                        _stop_pool(pool)
+                        if record:
+                            pairs.extend(chunk_pairs)
+                        return NaryResult(1, pairs, combined, total, True, time.perf_counter() - t0)
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
+            ordered = [partials[i] for i in sorted(partials)]
+            if record:
+                for _, chunk_pairs in ordered:
+                    pairs.extend(chunk_pairs)
+            g, top_pairs, count, early = _tree_gcd([g for g, _ in ordered], record)
+            if record:
+                pairs.extend(top_pairs)
+            return NaryResult(g, pairs, combined + count, total, early, time.perf_counter() - t0)
+        except (OSError, RuntimeError):
+            pass  # sin procesos disponibles: se calcula aquí
+    g, pairs, combined, early = _tree_gcd(values, record)
+    return NaryResult(g, pairs, combined, total, early, time.perf_counter() - t0)
+
+
+def lcm_many(values, workers=None):
+    """MCM de toda la lista (0 si alguno es 0), con el mismo reparto entre procesos."""
+    values = list(values)
+    workers = _pool_size(values, workers)
+    if workers and 0 not in values:
+        try:
+            with _process_pool(workers) as pool:
+                partials = list(pool.map(_tree_lcm, _chunks(values, workers)))
+            return _tree_lcm(partials)
+        except (OSError, RuntimeError):
+            pass
+    return _tree_lcm(values)